@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Company, Candidate, JobOffer, Application
+from .models import Company, Candidate, JobOffer, Application, ExpirySweep, CompanyStats, Notification, IndexVersion
 
 @admin.register(Company)
 class CompanyAdmin(admin.ModelAdmin):
@@ -21,4 +21,23 @@ class JobOfferAdmin(admin.ModelAdmin):
 class ApplicationAdmin(admin.ModelAdmin):
     list_display = ['candidate', 'job_offer', 'application_date', 'status']
     list_filter = ['status', 'application_date']
-    search_fields = ['candidate__user__first_name', 'job_offer__title']
\ No newline at end of file
+    search_fields = ['candidate__user__first_name', 'job_offer__title']
+
+@admin.register(ExpirySweep)
+class ExpirySweepAdmin(admin.ModelAdmin):
+    list_display = ['swept_through', 'expired', 'started_at', 'finished_at']
+
+@admin.register(CompanyStats)
+class CompanyStatsAdmin(admin.ModelAdmin):
+    list_display = ['company', 'total_offers', 'active_offers', 'total_applications', 'reconciled_at']
+    search_fields = ['company__name']
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ['kind', 'application', 'state', 'attempts', 'created_at', 'sent_at']
+    list_filter = ['kind', 'state']
+    list_select_related = ['application__candidate__user', 'application__job_offer']
+
+@admin.register(IndexVersion)
+class IndexVersionAdmin(admin.ModelAdmin):
+    list_display = ['name', 'version']
@@ -0,0 +1,88 @@
+from django.db import IntegrityError, connections, transaction
+from django.db.models.signals import post_save
+from django.utils import timezone
+
+from . import resumes
+from .models import Application, Candidate, JobOffer
+
+# Postulación en un solo viaje a la base de datos.
+# En lugar de comprobar antes (¿ya se postuló?, ¿la oferta sigue abierta?) y
+# validar el modelo dos veces, apply() lanza un único
+#     INSERT INTO core_application (...)
+#     SELECT ... FROM core_joboffer WHERE id = ? AND is_active AND deadline >= hoy
+#     RETURNING id, resume_id
+# La restricción única (candidate, job_offer) rechaza los duplicados aunque
+# lleguen dos envíos a la vez, y si la oferta no está abierta no se inserta
+# nada. Solo cuando falla se consulta el motivo. Como no pasa por
+# Application.save, envía post_save a mano para que contadores e índices se
+# actualicen igual que con cualquier otra postulación.
+
+APPLIED = 'applied'
+DUPLICATE = 'duplicate'
+CLOSED = 'closed'
+NOT_FOUND = 'not_found'
+
+
+def _insert_sql(connection, with_current_resume):
+    quote = connection.ops.quote_name
+    applications = quote(Application._meta.db_table)
+    offers = quote(JobOffer._meta.db_table)
+    candidates = quote(Candidate._meta.db_table)
+    # El CV actual del candidato, salvo que venga uno nuevo con la postulación
+    resume = f'(SELECT resume_id FROM {candidates} WHERE id = %s)' if with_current_resume else 'NULL'
+    return (
+        f'INSERT INTO {applications} '
+        f'(candidate_id, job_offer_id, application_date, status, cover_letter, notes, resume_id) '
+        f"SELECT %s, id, %s, %s, %s, '', {resume} FROM {offers} "
+        f'WHERE id = %s AND is_active = %s AND deadline >= %s '
+        f'RETURNING id, resume_id'
+    )
+
+
+def apply(candidate_id, offer_id, cover_letter, uploaded=None, using='default'):
+    # Devuelve (APPLIED, postulación) o (DUPLICATE | CLOSED | NOT_FOUND, None)
+    connection = connections[using]
+    now = timezone.now()
+    status = Application._meta.get_field('status').default
+    params = [
+        candidate_id,
+        Application._meta.get_field('application_date').get_db_prep_value(now, connection),
+        status,
+        cover_letter,
+    ]
+    if uploaded is None:
+        params.append(candidate_id)
+    params += [offer_id, True, connection.ops.adapt_datefield_value(now.date())]
+
+    with transaction.atomic(using=using):
+        try:
+            with transaction.atomic(using=using), connection.cursor() as cursor:
+                cursor.execute(_insert_sql(connection, uploaded is None), params)
+                row = cursor.fetchone()
+        except IntegrityError:
+            if Application.objects.using(using).filter(candidate_id=candidate_id, job_offer_id=offer_id).exists():
+                return DUPLICATE, None
+            raise
+        if row is None:
+            if JobOffer.objects.using(using).filter(pk=offer_id).exists():
+                return CLOSED, None
+            return NOT_FOUND, None
+
+        pk, resume_id = row
+        application = Application(
+            pk=pk, candidate_id=candidate_id, job_offer_id=offer_id, application_date=now,
+            status=status, cover_letter=cover_letter, resume_id=resume_id,
+        )
+        application._state.adding = False
+        application._state.db = using
+        if uploaded is None:
+            if resume_id is not None:
+                resumes.acquire(resume_id)
+        else:
+            application.candidate = Candidate.objects.using(using).get(pk=candidate_id)
+            resumes.attach(application, uploaded)
+            Application.objects.using(using).filter(pk=pk).update(resume=application.resume)
+        post_save.send(
+            sender=Application, instance=application, created=True, update_fields=None, raw=False, using=using,
+        )
+    return APPLIED, application
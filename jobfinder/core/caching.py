@@ -0,0 +1,98 @@
+import hashlib
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.contrib import messages
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+# Peticiones condicionales (ETag / Last-Modified) y caché de fragmentos de las
+# páginas de ofertas.
+#
+# Cada ámbito (el conjunto de listados o una oferta concreta) tiene una marca
+# de tiempo en la caché que se actualiza cuando cambian sus datos. Junto con
+# los campos updated_at de la oferta y de la empresa forman la fecha de última
+# modificación de la página; el ETag añade lo que depende del usuario (su id y
+# si ya se postuló). Los fragmentos renderizados solo dependen del rol (ver core/profiles.py), así que
+# se comparten entre todos los usuarios con el mismo rol.
+
+STAMP_KEY = 'core:stamp:{}'
+FRAGMENT_TIMEOUT = 300
+
+LISTINGS = 'listings'
+
+
+def offer_scope(pk):
+    return f'offer:{pk}'
+
+
+def _stamp_from(value):
+    return datetime.fromtimestamp(value, tz=dt_timezone.utc)
+
+
+def stamp(scope):
+    key = STAMP_KEY.format(scope)
+    value = cache.get(key)
+    if value is None:
+        # Sin marca (caché vacía o expulsada): considerar que cambió ahora
+        cache.add(key, time.time(), None)
+        value = cache.get(key, time.time())
+    return _stamp_from(value)
+
+
+def _set_stamps(scopes):
+    now = time.time()
+    cache.set_many({STAMP_KEY.format(scope): now for scope in scopes}, None)
+
+
+def touch(*scopes, using='default'):
+    # Se marca ahora y otra vez al confirmar la transacción: lo que se cachee
+    # entre ambas con datos aún sin confirmar queda invalidado por la segunda.
+    _set_stamps(scopes)
+    transaction.on_commit(lambda: _set_stamps(scopes), using=using)
+
+
+def last_modified(*stamps):
+    return max(value for value in stamps if value is not None)
+
+
+def make_etag(*parts):
+    digest = hashlib.md5('|'.join(str(part) for part in parts).encode(), usedforsecurity=False)
+    return quote_etag(digest.hexdigest())
+
+
+def cache_version(modified):
+    # Versión para las claves de fragmentos; incluye el día porque las ofertas
+    # vencen a medianoche sin que se escriba nada
+    return f'{modified.timestamp()}:{timezone.now().date().isoformat()}'
+
+
+def fragment_context(modified, role, **extra):
+    return {
+        'cache_timeout': FRAGMENT_TIMEOUT,
+        'cache_version': cache_version(modified),
+        'role': role,
+        **extra,
+    }
+
+
+def not_modified(request, etag, modified):
+    # Respuesta 304 si el cliente ya tiene esta versión, o None.
+    # Si hay mensajes pendientes la página debe renderizarse para mostrarlos.
+    if request.method not in ('GET', 'HEAD') or len(messages.get_messages(request)):
+        return None
+    response = get_conditional_response(request, etag=etag, last_modified=int(modified.timestamp()))
+    if response is not None:
+        set_validators(response, etag, modified)
+    return response
+
+
+def set_validators(response, etag, modified):
+    response.headers['ETag'] = etag
+    response.headers['Last-Modified'] = http_date(int(modified.timestamp()))
+    # Contenido por usuario: solo en la caché del navegador y revalidando siempre
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
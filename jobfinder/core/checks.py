@@ -0,0 +1,23 @@
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Tags, Warning, register
+
+# Comprobaciones de despliegue (manage.py check --deploy).
+# Las marcas de caching.touch, la caché de fragmentos y los límites de
+# ratelimit viven en la caché por defecto. Con LocMemCache cada proceso tiene
+# la suya: lo que invalida un proceso (o el comando expire_offers, desde cron)
+# no llega a los demás, que siguen sirviendo páginas antiguas hasta que caducan.
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    if isinstance(caches['default'], LocMemCache):
+        return [Warning(
+            'La caché por defecto es local de cada proceso.',
+            hint=(
+                'Con varios procesos (gunicorn, cron) configura en CACHES una caché compartida '
+                '(Memcached o Redis); si no, las invalidaciones solo llegan al proceso que las hace.'
+            ),
+            id='core.W001',
+        )]
+    return []
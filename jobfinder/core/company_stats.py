@@ -0,0 +1,189 @@
+from collections import Counter
+
+from django.apps import apps as global_apps
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import CompanyStats
+
+# Estadísticas del panel de empresa.
+# Cada empresa tiene una fila CompanyStats con sus totales de ofertas y de
+# postulaciones por estado, y cada oferta su contador application_count. Las
+# señales los actualizan con UPDATE ... SET campo = campo ± 1 dentro de la
+# misma transacción que la escritura (JobOffer.save y Application.save son
+# atómicos, y los borrados ya lo eran), así el panel solo lee una fila.
+# reconcile() los recalcula desde las tablas: se ejecuta a diario con
+# reconcile_company_stats, tras el barrido de ofertas vencidas y tras las
+# importaciones masivas, que no emiten señales.
+
+# Marca para instancias cargadas sin los campos necesarios (p. ej. con only())
+UNKNOWN = object()
+
+STATUS_FIELDS = CompanyStats.STATUS_FIELDS
+
+
+def offer_snapshot(offer):
+    values = offer.__dict__
+    if not {'is_active', 'deadline'} <= values.keys():
+        return UNKNOWN
+    deadline = values['deadline']
+    if deadline is not None and not hasattr(deadline, 'year'):
+        deadline = offer._meta.get_field('deadline').to_python(deadline)
+    return bool(values['is_active']) and deadline is not None and deadline >= timezone.now().date()
+
+
+def application_snapshot(application):
+    return application.__dict__.get('status', UNKNOWN)
+
+
+def _changes(deltas):
+    return {field: F(field) + delta for field, delta in deltas.items() if delta}
+
+
+def _update_company(company_id, using, **deltas):
+    changes = _changes(deltas)
+    if changes and not CompanyStats.objects.using(using).filter(pk=company_id).update(**changes):
+        transaction.on_commit(lambda: reconcile([company_id], using=using), using=using)
+
+
+def _update_offer_company(offer_id, using, **deltas):
+    # Sin cargar la oferta: UPDATE ... WHERE company_id IN (SELECT company_id ...)
+    changes = _changes(deltas)
+    if changes and not CompanyStats.objects.using(using).filter(company__joboffer=offer_id).update(**changes):
+        offer_model = global_apps.get_model('core', 'JobOffer')
+        company_ids = list(offer_model.objects.using(using).filter(pk=offer_id).values_list('company_id', flat=True))
+        if company_ids:
+            transaction.on_commit(lambda: reconcile(company_ids, using=using), using=using)
+
+
+def company_created(company, using='default'):
+    CompanyStats.objects.using(using).get_or_create(company=company)
+
+
+def offer_saved(offer, created, using='default'):
+    old = False if created else offer._counted_active
+    new = offer_snapshot(offer)
+    if old is UNKNOWN or new is UNKNOWN:
+        _update_company(offer.company_id, using, total_offers=int(created))
+        transaction.on_commit(lambda: reconcile([offer.company_id], using=using), using=using)
+        return
+    _update_company(offer.company_id, using, total_offers=int(created), active_offers=int(new) - int(old))
+
+
+def offer_deleted(offer, using='default'):
+    was_active = offer._counted_active
+    if was_active is UNKNOWN:
+        transaction.on_commit(lambda: reconcile([offer.company_id], using=using), using=using)
+        was_active = False
+    _update_company(offer.company_id, using, total_offers=-1, active_offers=-int(was_active))
+
+
+def application_saved(application, created, using='default'):
+    offer_model = global_apps.get_model('core', 'JobOffer')
+    new = application.status
+    if created:
+        offer_model.objects.using(using).filter(pk=application.job_offer_id).update(
+            application_count=F('application_count') + 1
+        )
+        _update_offer_company(application.job_offer_id, using, total_applications=1, **{STATUS_FIELDS[new]: 1})
+        return
+    old = application._counted_status
+    if old is UNKNOWN:
+        _update_offer_company(application.job_offer_id, using)
+        transaction.on_commit(lambda: reconcile_offer(application.job_offer_id, using=using), using=using)
+    elif old != new:
+        _update_offer_company(application.job_offer_id, using, **{STATUS_FIELDS[old]: -1, STATUS_FIELDS[new]: 1})
+
+
+def application_deleted(application, using='default'):
+    offer_model = global_apps.get_model('core', 'JobOffer')
+    status = application._counted_status
+    offer_model.objects.using(using).filter(pk=application.job_offer_id).update(
+        application_count=F('application_count') - 1
+    )
+    if status is UNKNOWN:
+        transaction.on_commit(lambda: reconcile_offer(application.job_offer_id, using=using), using=using)
+        _update_offer_company(application.job_offer_id, using, total_applications=-1)
+    else:
+        _update_offer_company(application.job_offer_id, using, total_applications=-1, **{STATUS_FIELDS[status]: -1})
+
+
+def statuses_changed(company_id, transitions, status, using='default'):
+    # Cambio masivo de estado (core/triage.py): transitions es {estado anterior: n}
+    deltas = Counter()
+    for old, count in transitions.items():
+        deltas[STATUS_FIELDS[old]] -= count
+        deltas[STATUS_FIELDS[status]] += count
+    _update_company(company_id, using, **deltas)
+
+
+def reconcile_offer(offer_id, using='default'):
+    offer_model = global_apps.get_model('core', 'JobOffer')
+    company_ids = list(offer_model.objects.using(using).filter(pk=offer_id).values_list('company_id', flat=True))
+    if company_ids:
+        reconcile(company_ids, using=using)
+
+
+def reconcile(company_ids=None, using='default', apps=global_apps):
+    # Recalcula desde cero las estadísticas de las empresas indicadas (o de
+    # todas). `apps` permite usarla desde una migración con modelos históricos.
+    Company = apps.get_model('core', 'Company')
+    CompanyStatsModel = apps.get_model('core', 'CompanyStats')
+    JobOffer = apps.get_model('core', 'JobOffer')
+    Application = apps.get_model('core', 'Application')
+
+    companies = Company.objects.using(using)
+    offers = JobOffer.objects.using(using)
+    applications = Application.objects.using(using)
+    if company_ids is not None:
+        companies = companies.filter(pk__in=company_ids)
+        offers = offers.filter(company__in=company_ids)
+        applications = applications.filter(job_offer__company__in=company_ids)
+
+    with transaction.atomic(using=using):
+        per_offer = (
+            Application.objects.using(using).filter(job_offer=OuterRef('pk'))
+            .order_by().values('job_offer').annotate(count=Count('pk')).values('count')
+        )
+        offers.update(application_count=Coalesce(Subquery(per_offer), Value(0)))
+
+        stats = {pk: CompanyStatsModel(company_id=pk) for pk in companies.values_list('pk', flat=True)}
+        today = timezone.now().date()
+        for row in offers.order_by().values('company').annotate(
+            total=Count('pk'),
+            active=Count('pk', filter=Q(is_active=True, deadline__gte=today)),
+        ):
+            if row['company'] in stats:
+                stats[row['company']].total_offers = row['total']
+                stats[row['company']].active_offers = row['active']
+        for row in applications.order_by().values('job_offer__company', 'status').annotate(count=Count('pk')):
+            company_stats = stats.get(row['job_offer__company'])
+            if company_stats is not None and row['status'] in STATUS_FIELDS:
+                company_stats.total_applications += row['count']
+                setattr(company_stats, STATUS_FIELDS[row['status']], row['count'])
+
+        now = timezone.now()
+        for company_stats in stats.values():
+            company_stats.reconciled_at = now
+        existing = set(
+            CompanyStatsModel.objects.using(using).filter(pk__in=list(stats)).values_list('pk', flat=True)
+        )
+        fields = [
+            'total_offers', 'active_offers', 'total_applications', *STATUS_FIELDS.values(), 'reconciled_at',
+        ]
+        CompanyStatsModel.objects.using(using).bulk_update(
+            [company_stats for pk, company_stats in stats.items() if pk in existing], fields, batch_size=500
+        )
+        CompanyStatsModel.objects.using(using).bulk_create(
+            [company_stats for pk, company_stats in stats.items() if pk not in existing], batch_size=500
+        )
+    return stats
+
+
+def for_company(company):
+    try:
+        return CompanyStats.objects.get(company=company)
+    except CompanyStats.DoesNotExist:
+        return reconcile([company.pk])[company.pk]
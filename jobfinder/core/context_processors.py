@@ -0,0 +1,12 @@
+from django.contrib.auth.models import AnonymousUser
+
+from .profiles import ANONYMOUS, Profile
+
+
+def profile(request):
+    # Perfil del usuario en las plantillas, como `user` en el de auth
+    profile = getattr(request, 'profile', None)
+    if profile is None:
+        # Peticiones que no pasaron por ProfileMiddleware
+        profile = Profile(AnonymousUser(), ANONYMOUS)
+    return {'profile': profile}
@@ -0,0 +1,90 @@
+import time
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import caching, company_stats, facets, matching, stats, suggest
+from .models import ExpirySweep, JobOffer
+
+# Barrido de ofertas vencidas.
+# Desactiva con UPDATE por lotes las ofertas activas cuya fecha límite ya pasó
+# y deja constancia de la ejecución en ExpirySweep. El comando se ejecuta desde
+# cron, en otro proceso que los servidores web, así que estos no ven nada de
+# su memoria: al empezar cada petición check_sweep() consulta la última fila de
+# ExpirySweep, como mucho cada SWEPT_RECHECK segundos y solo hasta que conste
+# que hoy ya se barrió. Mientras conste, JobOffer.objects.active() filtra solo
+# por is_active (los índices parciales); si no, sigue comprobando la fecha
+# límite. active() no consulta nada: se llama también desde las vistas
+# asíncronas.
+# Los contadores por categoría y las versiones de los índices en memoria se
+# invalidan en la base de datos; las marcas de caching.touch pasan por la
+# caché, así que con varios procesos la caché tiene que ser compartida (ver
+# core/checks.py).
+
+BATCH_SIZE = 1000
+SWEPT_RECHECK = 60
+
+_swept = {'through': None, 'checked': None}
+
+
+def swept_today():
+    return _swept['through'] == timezone.now().date()
+
+
+def check_sweep(force=False):
+    if swept_today():
+        return
+    now = time.monotonic()
+    if force or _swept['checked'] is None or now - _swept['checked'] >= SWEPT_RECHECK:
+        _swept['through'] = ExpirySweep.objects.values_list('swept_through', flat=True).first()
+        _swept['checked'] = now
+
+
+def forget():
+    # Olvida lo que este proceso sabe del último barrido (pruebas)
+    _swept.update(through=None, checked=None)
+
+
+def _expired_offers(today, batch_size):
+    return list(
+        JobOffer.objects.filter(is_active=True, deadline__lt=today)
+        .order_by('deadline', 'id')
+        .values_list('pk', 'company_id')[:batch_size]
+    )
+
+
+def expire_offers(batch_size=BATCH_SIZE, progress=None):
+    # Devuelve el registro ExpirySweep de esta ejecución
+    started_at = timezone.now()
+    today = started_at.date()
+    expired = 0
+    companies = set()
+    while True:
+        rows = _expired_offers(today, batch_size)
+        if not rows:
+            break
+        ids = [pk for pk, _ in rows]
+        companies.update(company_id for _, company_id in rows)
+        with transaction.atomic():
+            expired += JobOffer.objects.filter(pk__in=ids, is_active=True).update(
+                is_active=False, updated_at=timezone.now()
+            )
+        if progress:
+            progress(expired)
+
+    sweep = ExpirySweep.objects.create(
+        started_at=started_at,
+        finished_at=timezone.now(),
+        swept_through=today,
+        expired=expired,
+    )
+    if expired:
+        # update() no emite señales
+        stats.invalidate_category_counts()
+        suggest.invalidate()
+        matching.invalidate()
+        facets.invalidate()
+        caching.touch(caching.LISTINGS)
+        company_stats.reconcile(companies)
+    _swept.update(through=today, checked=time.monotonic())
+    return sweep
@@ -0,0 +1,60 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+# Exportación de postulaciones en streaming: las filas se leen con
+# values_list().iterator() y se escriben a medida que llegan, así la memoria no
+# crece con el tamaño de la exportación.
+# En el CSV, los textos que empiezan por un carácter de fórmula (nombre,
+# teléfono, ciudad... los escribe el candidato) llevan delante una comilla
+# simple para que la hoja de cálculo los muestre como texto y no los ejecute.
+
+CHUNK_SIZE = 2000
+
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+COLUMNS = [
+    ('id', 'id'),
+    ('offer_id', 'job_offer_id'),
+    ('offer_title', 'job_offer__title'),
+    ('first_name', 'candidate__user__first_name'),
+    ('last_name', 'candidate__user__last_name'),
+    ('email', 'candidate__user__email'),
+    ('phone', 'candidate__phone'),
+    ('location', 'candidate__location'),
+    ('status', 'status'),
+    ('application_date', 'application_date'),
+]
+
+
+class Echo:
+    # Pseudo-buffer para csv.writer: devuelve la línea en lugar de guardarla
+    def write(self, value):
+        return value
+
+
+def export_rows(applications):
+    return applications.order_by('pk').values_list(
+        *[lookup for _, lookup in COLUMNS]
+    ).iterator(chunk_size=CHUNK_SIZE)
+
+
+def csv_cell(value):
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def stream_csv(applications):
+    writer = csv.writer(Echo())
+    # La cabecera se envía antes de lanzar la consulta
+    yield writer.writerow([name for name, _ in COLUMNS])
+    for row in export_rows(applications):
+        yield writer.writerow([csv_cell(value) for value in row])
+
+
+def stream_jsonl(applications):
+    names = [name for name, _ in COLUMNS]
+    for row in export_rows(applications):
+        yield json.dumps(dict(zip(names, row)), cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
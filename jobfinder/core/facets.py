@@ -0,0 +1,307 @@
+from collections import namedtuple
+from datetime import timedelta
+
+from django.utils import timezone
+
+from . import geo
+from .indexes import SharedIndex
+from .models import JobOffer
+from .pagination import CURSOR_PARAM
+
+# Filtros combinables del listado de ofertas con el número de ofertas de cada
+# opción (búsqueda facetada).
+# Cada faceta (categoría, ciudad, banda de salario y "vence esta semana") guarda
+# en memoria, por cada valor, un mapa de bits de las ofertas activas. Cada
+# oferta activa ocupa una posición (0, 1, 2...; las que quedan libres al
+# desactivar una oferta se reutilizan) y el bit de su posición está a 1 si
+# tiene ese valor: los mapas ocupan según el número de ofertas activas, no
+# según el id más alto. Un filtro es la intersección
+# (AND) de los mapas elegidos, y el número de ofertas de cada opción es el
+# número de bits de su mapa AND el resto de filtros; con enteros de Python cada
+# operación recorre memoria contigua y no se consulta la base de datos.
+# El filtro de remoto y el de distancia también son mapas (sin contadores): uno
+# con las ofertas en remoto y uno por punto del nomenclátor (geohash y
+# coordenadas); el radio es el OR de los puntos que caen dentro (geo.near()).
+# Solo la búsqueda de texto restringe con una lista de ids, que ya viene
+# limitada a search.MAX_RESULTS.
+# La página de resultados sigue saliendo de la base de datos (filter_offers()
+# traduce la selección a filtros sobre los índices de JobOffer); el total y los
+# contadores salen de aquí.
+#
+# Cada proceso tiene su índice y lo actualiza al confirmar cada escritura; los
+# cambios de otros procesos se recogen en segundo plano (ver core/indexes.py).
+# También se reconstruye cada día (cambian las ofertas vencidas y las que
+# vencen esta semana), lo que de paso vuelve a dejar las posiciones seguidas.
+
+EXPIRING_DAYS = 7
+MAX_CITIES = 10
+
+FACETS = ('category', 'city', 'salary', 'expiring')
+# Mapas que solo filtran: remoto (valor True) y punto ((geohash, latitud, longitud))
+FILTERS = ('remote', 'point')
+FACET_LABELS = {
+    'category': 'Categoría',
+    'city': 'Ciudad',
+    'salary': 'Salario',
+    'expiring': 'Plazo',
+}
+
+SalaryBand = namedtuple('SalaryBand', ['key', 'label', 'low', 'high'])
+SALARY_BANDS = (
+    SalaryBand('none', 'Sin indicar', None, None),
+    SalaryBand('0-24000', 'Menos de 24.000', None, 24000),
+    SalaryBand('24000-36000', '24.000 - 36.000', 24000, 36000),
+    SalaryBand('36000-48000', '36.000 - 48.000', 36000, 48000),
+    SalaryBand('48000-', '48.000 o más', 48000, None),
+)
+EXPIRING_WEEK = 'week'
+
+FacetResult = namedtuple('FacetResult', ['total', 'counts'])
+
+
+def expiring_until(today=None):
+    # Último día de plazo de las ofertas que vencen esta semana
+    return (today or timezone.now().date()) + timedelta(days=EXPIRING_DAYS)
+
+
+def salary_band(salary):
+    if salary is not None:
+        for band in SALARY_BANDS[1:]:
+            if (band.low is None or salary >= band.low) and (band.high is None or salary < band.high):
+                return band.key
+    return SALARY_BANDS[0].key
+
+
+def offer_values(category, location, salary, deadline, today):
+    # {faceta: valor} de una oferta
+    values = {'category': category, 'salary': salary_band(salary)}
+    place, remote = geo.locate(location or '')
+    if place is not None:
+        values['city'] = place.name
+        values['point'] = (geo.encode(place.latitude, place.longitude), place.latitude, place.longitude)
+    if remote:
+        values['remote'] = True
+    if deadline <= expiring_until(today):
+        values['expiring'] = EXPIRING_WEEK
+    return values
+
+
+def bitmap(positions):
+    # Mapa de bits (entero) con las posiciones dadas
+    positions = list(positions)
+    if not positions:
+        return 0
+    bits = bytearray(max(positions) // 8 + 1)
+    for position in positions:
+        bits[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(bits, 'little')
+
+
+class FacetIndex(SharedIndex):
+    def __init__(self):
+        super().__init__('facets')
+        self._bitmaps = {facet: {} for facet in FACETS + FILTERS}
+        # {id de oferta: (posición, {faceta: valor})}
+        self._offers = {}
+        self._free = []
+        self._all = 0
+
+    def __len__(self):
+        return len(self._offers)
+
+    def _add(self, pk, values):
+        self._remove(pk)
+        position = self._free.pop() if self._free else len(self._offers)
+        bit = 1 << position
+        self._all |= bit
+        for facet, value in values.items():
+            bitmaps = self._bitmaps[facet]
+            bitmaps[value] = bitmaps.get(value, 0) | bit
+        self._offers[pk] = (position, values)
+
+    def _remove(self, pk):
+        position, values = self._offers.pop(pk, (None, None))
+        if position is None:
+            return
+        self._free.append(position)
+        mask = ~(1 << position)
+        self._all &= mask
+        for facet, value in values.items():
+            bitmaps = self._bitmaps[facet]
+            remaining = bitmaps[value] & mask
+            if remaining:
+                bitmaps[value] = remaining
+            else:
+                del bitmaps[value]
+
+    def load(self):
+        today = timezone.now().date()
+        rows = JobOffer.objects.active().values_list(
+            'pk', 'category', 'location', 'salary', 'deadline'
+        ).iterator(chunk_size=2000)
+        offers = {}
+        postings = {facet: {} for facet in FACETS + FILTERS}
+        for position, (pk, category, location, salary, deadline) in enumerate(rows):
+            values = offer_values(category, location, salary, deadline, today)
+            offers[pk] = (position, values)
+            for facet, value in values.items():
+                postings[facet].setdefault(value, []).append(position)
+        bitmaps = {
+            facet: {value: bitmap(positions) for value, positions in values.items()}
+            for facet, values in postings.items()
+        }
+        return bitmaps, offers, (1 << len(offers)) - 1
+
+    def install(self, state):
+        self._bitmaps, self._offers, self._all = state
+        self._free = []
+
+    def update_offer(self, offer, using='default'):
+        if offer.is_active and not offer.is_expired:
+            values = offer_values(offer.category, offer.location, offer.salary, offer.deadline, timezone.now().date())
+            self.changed(lambda: self._add(offer.pk, values), using=using)
+        else:
+            self.remove_offer(offer.pk, using=using)
+
+    def remove_offer(self, offer_id, using='default'):
+        self.changed(lambda: self._remove(offer_id), using=using)
+
+    def count(self, selected, within_ids=None, remote=False, near=None):
+        # Total de ofertas que cumplen la selección ({faceta: valor}) y, por
+        # cada faceta, cuántas habría con cada uno de sus valores manteniendo
+        # los filtros de las demás. `within_ids` restringe a esas ofertas (las
+        # que cumplen la búsqueda de texto), `remote` a las de remoto y `near`
+        # ((latitud, longitud, km)) a las que están a esa distancia.
+        with self._lock:
+            chosen = {facet: self._bitmaps[facet].get(value, 0) for facet, value in selected.items()}
+            if within_ids is None:
+                base = self._all
+            else:
+                base = bitmap(self._offers[pk][0] for pk in within_ids if pk in self._offers)
+            if remote:
+                base &= self._bitmaps['remote'].get(True, 0)
+            if near is not None:
+                points = self._bitmaps['point']
+                nearby = 0
+                for point in geo.near(points, *near):
+                    nearby |= points[point]
+                base &= nearby
+            counts = {}
+            for facet in FACETS:
+                others = base
+                for other, bits in chosen.items():
+                    if other != facet:
+                        others &= bits
+                counts[facet] = {
+                    value: (bits & others).bit_count() for value, bits in self._bitmaps[facet].items()
+                }
+            matches = base
+            for bits in chosen.values():
+                matches &= bits
+            return FacetResult(matches.bit_count(), counts)
+
+
+index = FacetIndex()
+
+
+def count(selected, within_ids=None, remote=False, near=None):
+    index.ensure_fresh()
+    return index.count(selected, within_ids, remote, near)
+
+
+def selection(params):
+    # {faceta: valor} de los parámetros GET; se ignoran los valores desconocidos
+    allowed = {
+        'category': {choice for choice, _ in JobOffer.CATEGORY_CHOICES},
+        'salary': {band.key for band in SALARY_BANDS},
+        'expiring': {EXPIRING_WEEK},
+    }
+    selected = {}
+    for facet in FACETS:
+        value = params.get(facet)
+        if not value:
+            continue
+        if facet == 'city':
+            place = geo.locate(value).place
+            if place is not None and place.name == value:
+                selected[facet] = value
+        elif value in allowed[facet]:
+            selected[facet] = value
+    return selected
+
+
+def filter_offers(offers, selected):
+    # La misma selección como filtros de la base de datos, para la página
+    for facet, value in selected.items():
+        if facet == 'category':
+            offers = offers.filter(category=value)
+        elif facet == 'city':
+            place = geo.locate(value).place
+            # Todas las ofertas de una ciudad tienen el geohash de su centro
+            offers = offers.filter(geohash=geo.encode(place.latitude, place.longitude))
+        elif facet == 'salary':
+            band = next(band for band in SALARY_BANDS if band.key == value)
+            if band.low is None and band.high is None:
+                offers = offers.filter(salary__isnull=True)
+            else:
+                if band.low is not None:
+                    offers = offers.filter(salary__gte=band.low)
+                if band.high is not None:
+                    offers = offers.filter(salary__lt=band.high)
+        elif facet == 'expiring':
+            offers = offers.filter(deadline__lte=expiring_until())
+    return offers
+
+
+def options(result, selected, params):
+    # Facetas para la plantilla: [{name, label, options: [{value, label,
+    # count, selected, query}]}]; query es la URL con la opción puesta o quitada
+    labels = {
+        'category': dict(JobOffer.CATEGORY_CHOICES),
+        'salary': {band.key: band.label for band in SALARY_BANDS},
+        'expiring': {EXPIRING_WEEK: f'Vence en {EXPIRING_DAYS} días'},
+    }
+    order = {
+        'category': [choice for choice, _ in JobOffer.CATEGORY_CHOICES],
+        'salary': [band.key for band in SALARY_BANDS],
+        'expiring': [EXPIRING_WEEK],
+    }
+    facets = []
+    for facet in FACETS:
+        counts = result.counts[facet]
+        if facet == 'city':
+            values = sorted(counts, key=lambda value: (-counts[value], value))[:MAX_CITIES]
+            if selected.get(facet) and selected[facet] not in values:
+                values.append(selected[facet])
+        else:
+            values = order[facet]
+        choices = []
+        for value in values:
+            query = params.copy()
+            query.pop(CURSOR_PARAM, None)
+            if selected.get(facet) == value:
+                query.pop(facet, None)
+            else:
+                query[facet] = value
+            choices.append({
+                'value': value,
+                'label': labels.get(facet, {}).get(value, value),
+                'count': counts.get(value, 0),
+                'selected': selected.get(facet) == value,
+                'query': query.urlencode(),
+            })
+        facets.append({'name': facet, 'label': FACET_LABELS[facet], 'options': choices})
+    return facets
+
+
+def offer_saved(offer, using='default'):
+    index.update_offer(offer, using=using)
+
+
+def offer_deleted(offer_id, using='default'):
+    index.remove_offer(offer_id, using=using)
+
+
+def invalidate(using='default'):
+    # Fuerza una reconstrucción en todos los procesos (escrituras masivas)
+    index.invalidate(using=using)
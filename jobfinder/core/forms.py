@@ -2,6 +2,9 @@ from django import forms
 from .models import JobOffer, Application, Company, Candidate
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm
+from . import geo
+from .resumes import ALLOWED_EXTENSIONS
+from .triage import MAX_APPLICATIONS
 
 class UserRegisterForm(UserCreationForm):
     email = forms.EmailField(required=True, widget=forms.EmailInput(attrs={
@@ -96,10 +99,83 @@ class ApplicationForm(forms.ModelForm):
             }),
         }
 
+    # No es un campo del modelo: el fichero se guarda en el almacén de CVs
+    resume = forms.FileField(required=False, widget=forms.ClearableFileInput(attrs={
+        'class': 'form-control',
+        'accept': ','.join(ALLOWED_EXTENSIONS),
+    }))
+
+    def clean_resume(self):
+        from django.conf import settings
+        from django.template.defaultfilters import filesizeformat
+        resume = self.cleaned_data.get('resume')
+        if resume:
+            if not resume.name.lower().endswith(ALLOWED_EXTENSIONS):
+                raise forms.ValidationError('Formato no admitido. Sube un PDF o un documento de texto.')
+            if resume.size > settings.RESUME_MAX_SIZE:
+                raise forms.ValidationError(f'El CV no puede superar {filesizeformat(settings.RESUME_MAX_SIZE)}.')
+        return resume
+
 class ApplicationStatusForm(forms.ModelForm):
     class Meta:
         model = Application
         fields = ['status']
         widgets = {
             'status': forms.Select(attrs={'class': 'form-select'})
-        }
\ No newline at end of file
+        }
+
+class IdListField(forms.Field):
+    # Lista de ids, repetidos en el formulario (applications=1&applications=2),
+    # separados por comas (applications=1,2) o como lista en JSON
+    widget = forms.MultipleHiddenInput
+
+    def __init__(self, *, max_ids=None, **kwargs):
+        self.max_ids = max_ids
+        super().__init__(**kwargs)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return []
+        if not isinstance(value, (list, tuple)):
+            value = [value]
+        ids = []
+        for item in value:
+            for part in str(item).split(','):
+                part = part.strip()
+                if not part:
+                    continue
+                try:
+                    ids.append(int(part))
+                except ValueError:
+                    raise forms.ValidationError('Identificadores no válidos.')
+        return list(dict.fromkeys(ids))
+
+    def validate(self, value):
+        super().validate(value)
+        if self.max_ids is not None and len(value) > self.max_ids:
+            raise forms.ValidationError(f'Como máximo {self.max_ids} postulaciones a la vez.')
+
+class BulkApplicationStatusForm(forms.Form):
+    applications = IdListField(max_ids=MAX_APPLICATIONS)
+    status = forms.ChoiceField(choices=Application.STATUS_CHOICES, widget=forms.Select(attrs={'class': 'form-select'}))
+    # Oferta a la que volver tras el cambio
+    offer = forms.IntegerField(required=False, widget=forms.HiddenInput)
+
+
+class OfferLocationFilterForm(forms.Form):
+    # Filtros de ubicación del listado de ofertas (core/geo.py)
+    RADIUS_CHOICES = [(10, '10 km'), (25, '25 km'), (50, '50 km'), (100, '100 km'), (250, '250 km')]
+    
+    near = forms.CharField(required=False, max_length=100)
+    km = forms.TypedChoiceField(choices=RADIUS_CHOICES, coerce=int, required=False, empty_value=50)
+    remote = forms.BooleanField(required=False)
+    
+    def clean_near(self):
+        # Devuelve el lugar del nomenclátor (o None si no se indicó)
+        text = self.cleaned_data['near'].strip()
+        if not text:
+            return None
+        place = geo.locate(text).place
+        if place is None:
+            raise forms.ValidationError('Ubicación desconocida. Prueba con una ciudad cercana.')
+        return place
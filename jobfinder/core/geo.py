@@ -0,0 +1,222 @@
+import csv
+import math
+import os
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+from django.db.models import ExpressionWrapper, F, FloatField
+from django.db.models.functions import Sqrt
+
+from .search import normalize
+
+# Geolocalización de las ofertas sin servicios externos.
+# JobOffer.location es texto libre ("Madrid, España o Remoto"). locate() lo
+# normaliza contra un nomenclátor incluido en el paquete (data/gazetteer.csv:
+# ciudades con sus nombres alternativos y coordenadas) y detecta si admite
+# trabajo en remoto. Al guardar cada oferta se rellenan latitude, longitude,
+# is_remote y geohash, una cadena cuyos prefijos son celdas de una rejilla:
+# las ofertas de una misma celda comparten prefijo y quedan contiguas en el
+# índice joboffer_active_geohash_idx.
+# within() responde "a menos de X km de" sin recorrer la tabla: cubre con
+# celdas el rectángulo que contiene el círculo y consulta un rango del índice
+# por cada tramo de celdas contiguas; después descarta lo que queda fuera del
+# rectángulo y del círculo (distancia equirectangular, precisa de sobra para
+# unos cientos de km).
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(__file__), 'data', 'gazetteer.csv')
+
+GEOHASH_PRECISION = 9
+# Máximo de celdas (rangos del índice) con que se cubre un rectángulo
+MAX_CELLS = 16
+KM_PER_DEGREE = 111.32
+
+OFFER_FIELDS = ('latitude', 'longitude', 'geohash', 'is_remote')
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+_TOKEN_RE = re.compile(r'\w+')
+
+REMOTE_TERMS = frozenset((
+    ('remoto',), ('remota',), ('remote',), ('teletrabajo',), ('a', 'distancia'), ('home', 'office'),
+))
+
+Place = namedtuple('Place', ['name', 'latitude', 'longitude'])
+Location = namedtuple('Location', ['place', 'remote'])
+
+
+def _tokens(text):
+    return tuple(_TOKEN_RE.findall(normalize(text)))
+
+
+@lru_cache(maxsize=None)
+def gazetteer():
+    # {nombre normalizado en tokens: Place}
+    places = {}
+    with open(GAZETTEER_PATH, newline='', encoding='utf-8') as source:
+        for row in csv.DictReader(source):
+            place = Place(row['name'], float(row['latitude']), float(row['longitude']))
+            for name in [row['name'], *filter(None, row['aliases'].split('|'))]:
+                places.setdefault(_tokens(name), place)
+    return places
+
+
+@lru_cache(maxsize=4096)
+def locate(text):
+    # Primera ciudad conocida del texto (la mención más larga en cada posición)
+    places = gazetteer()
+    longest = max(map(len, places))
+    tokens = _tokens(text)
+    remote = any(
+        tokens[start:start + len(term)] == term for term in REMOTE_TERMS for start in range(len(tokens))
+    )
+    for start in range(len(tokens)):
+        for size in range(min(longest, len(tokens) - start), 0, -1):
+            place = places.get(tokens[start:start + size])
+            if place is not None:
+                return Location(place, remote)
+    return Location(None, remote)
+
+
+def encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    value = bits = 0
+    even = True
+    while len(chars) < precision:
+        bounds, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (bounds[0] + bounds[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            value = bits = 0
+    return ''.join(chars)
+
+
+def geocode(offer):
+    # Rellena los campos de OFFER_FIELDS a partir de offer.location
+    place, remote = locate(offer.location or '')
+    offer.is_remote = remote
+    if place is None:
+        offer.latitude = offer.longitude = None
+        offer.geohash = ''
+    else:
+        offer.latitude = place.latitude
+        offer.longitude = place.longitude
+        offer.geohash = encode(place.latitude, place.longitude)
+
+
+def geocode_all(queryset, batch_size=1000):
+    # Recalcula todas las ofertas de `queryset`; devuelve cuántas cambiaron.
+    # Se usa en la migración y en geocode_offers (tras cambiar el nomenclátor).
+    changed = []
+    count = 0
+    for offer in queryset.only('location', *OFFER_FIELDS).iterator(chunk_size=batch_size):
+        before = tuple(getattr(offer, field) for field in OFFER_FIELDS)
+        geocode(offer)
+        if tuple(getattr(offer, field) for field in OFFER_FIELDS) != before:
+            changed.append(offer)
+        if len(changed) >= batch_size:
+            queryset.model._base_manager.using(queryset.db).bulk_update(changed, OFFER_FIELDS)
+            count += len(changed)
+            changed = []
+    if changed:
+        queryset.model._base_manager.using(queryset.db).bulk_update(changed, OFFER_FIELDS)
+        count += len(changed)
+    return count
+
+
+def bounding_box(latitude, longitude, km):
+    # (lat mín., lat máx., lon mín., lon máx.) del rectángulo que contiene el círculo
+    delta_lat = km / KM_PER_DEGREE
+    delta_lon = km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+    return (
+        max(latitude - delta_lat, -90.0), min(latitude + delta_lat, 90.0),
+        max(longitude - delta_lon, -180.0), min(longitude + delta_lon, 180.0),
+    )
+
+
+def cover(min_lat, max_lat, min_lon, max_lon):
+    # Prefijos de geohash que cubren el rectángulo: las celdas más pequeñas
+    # con las que bastan MAX_CELLS
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_bits = 5 * precision // 2
+        lat_step = 180 / 2 ** lat_bits
+        lon_step = 360 / 2 ** (5 * precision - lat_bits)
+        rows = range(math.floor((min_lat + 90) / lat_step), math.floor((max_lat + 90) / lat_step) + 1)
+        columns = range(math.floor((min_lon + 180) / lon_step), math.floor((max_lon + 180) / lon_step) + 1)
+        if len(rows) * len(columns) <= MAX_CELLS:
+            return sorted({
+                encode(
+                    min(-90 + (row + 0.5) * lat_step, 90.0),
+                    min(-180 + (column + 0.5) * lon_step, 180.0),
+                    precision,
+                )
+                for row in rows for column in columns
+            })
+    return ['']
+
+
+def ranges(cells):
+    # Celdas consecutivas del mismo padre -> un solo rango [desde, hasta) del índice
+    spans = []
+    for cell in sorted(cells):
+        if spans:
+            low, last = spans[-1]
+            if (
+                len(cell) == len(last) > 0 and cell[:-1] == last[:-1]
+                and _BASE32.index(cell[-1]) == _BASE32.index(last[-1]) + 1
+            ):
+                spans[-1] = (low, cell)
+                continue
+        spans.append((cell, cell))
+    # '~' va detrás de todos los caracteres de un geohash
+    return [(low, last + '~') for low, last in spans]
+
+
+def near(points, latitude, longitude, km):
+    # Los puntos (geohash, latitud, longitud) a menos de `km`, con las mismas
+    # celdas, rectángulo y distancia que within() pero sin consultar la base de datos
+    min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, km)
+    prefixes = tuple(cover(min_lat, max_lat, min_lon, max_lon))
+    scale = math.cos(math.radians(latitude))
+    for point in points:
+        cell, point_lat, point_lon = point
+        if not cell.startswith(prefixes):
+            continue
+        if not (min_lat <= point_lat <= max_lat and min_lon <= point_lon <= max_lon):
+            continue
+        north = point_lat - latitude
+        east = (point_lon - longitude) * scale
+        if (north * north + east * east) * KM_PER_DEGREE ** 2 <= km * km:
+            yield point
+
+
+def within(offers, latitude, longitude, km):
+    # Ofertas a menos de `km` del punto, anotadas con distance_km
+    min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, km)
+    # Un SELECT por rango unidos con UNION ALL: con un OR de rangos SQLite
+    # recorre entero otro índice de las ofertas activas
+    manager = offers.model._base_manager.using(offers.db)
+    parts = [
+        manager.filter(geohash__gte=low, geohash__lt=high, is_active=True).order_by().values('pk')
+        for low, high in ranges(cover(min_lat, max_lat, min_lon, max_lon))
+    ]
+    nearby = parts[0].union(*parts[1:], all=True) if len(parts) > 1 else parts[0]
+    scale = math.cos(math.radians(latitude))
+    north = F('latitude') - latitude
+    east = (F('longitude') - longitude) * scale
+    distance2 = ExpressionWrapper((north * north + east * east) * KM_PER_DEGREE ** 2, output_field=FloatField())
+    return (
+        offers.filter(pk__in=nearby, latitude__range=(min_lat, max_lat), longitude__range=(min_lon, max_lon))
+        .alias(distance2=distance2)
+        .filter(distance2__lte=km * km)
+        .annotate(distance_km=Sqrt('distance2'))
+    )
@@ -0,0 +1,155 @@
+import logging
+import threading
+import time
+import weakref
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .models import IndexVersion
+
+# Índices en memoria del proceso (emparejamiento, autocompletado, facetas) que
+# se mantienen al día con las escrituras de todos los procesos.
+# Cada índice tiene una fila en IndexVersion con un número de versión. Cada
+# escritura que le afecta lo incrementa dentro de su propia transacción (si la
+# transacción falla, el incremento se deshace con ella) y, al confirmar,
+# aplica el cambio al índice del proceso que escribió; si la versión era la
+# siguiente a la suya, ese proceso sigue al día sin reconstruir nada.
+# Los demás procesos se enteran al comparar su versión con la de la tabla.
+# Las peticiones no reconstruyen un índice ya construido: ensure_fresh(), como
+# mucho cada INDEX_REFRESH_SECONDS, lanza en un hilo aparte la comprobación
+# (una consulta) y, si la versión o el día han cambiado, la reconstrucción;
+# mientras tanto se sigue respondiendo con el índice que había. Solo el primer
+# uso en cada proceso construye el índice dentro de la petición.
+# Con INDEX_REFRESH_BACKGROUND = False (pruebas) la comprobación se hace en la
+# propia petición.
+
+REFRESH_SECONDS = 30
+
+logger = logging.getLogger(__name__)
+
+_indexes = weakref.WeakSet()
+
+
+def current_version(name):
+    return IndexVersion.objects.filter(name=name).values_list('version', flat=True).first() or 0
+
+
+def bump(name, using='default'):
+    # Incrementa la versión en la transacción en curso y devuelve la nueva
+    connection = connections[using]
+    table = connection.ops.quote_name(IndexVersion._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} (name, version) VALUES (%s, 1) '
+            f'ON CONFLICT (name) DO UPDATE SET version = {table}.version + 1 '
+            f'RETURNING version',
+            [name],
+        )
+        return cursor.fetchone()[0]
+
+
+class SharedIndex:
+    # Las subclases implementan load(), que lee de la base de datos el contenido
+    # nuevo sin tocar el índice, e install(state), que lo pone en uso (se llama
+    # con self._lock tomado).
+    def __init__(self, name, daily=True):
+        self.name = name
+        # daily: reconstruir también al cambiar el día (ofertas vencidas, idf)
+        self.daily = daily
+        self._lock = threading.Lock()
+        self._refreshing = threading.Lock()
+        self.version = None
+        self.built_on = None
+        self.checked_at = None
+        _indexes.add(self)
+
+    def load(self):
+        raise NotImplementedError
+
+    def install(self, state):
+        raise NotImplementedError
+
+    def rebuild(self, version=None):
+        # La versión se lee antes que los datos: una escritura que se confirme
+        # mientras tanto deja la tabla por delante y se reconstruye otra vez
+        version = current_version(self.name) if version is None else version
+        state = self.load()
+        with self._lock:
+            self.install(state)
+            self.version = version
+            self.built_on = timezone.now().date()
+        self.checked_at = time.monotonic()
+
+    def rebuild_everywhere(self):
+        # Reconstruye este índice e invalida el de los demás procesos
+        self.rebuild(bump(self.name))
+
+    def stale(self, version):
+        return version != self.version or (self.daily and self.built_on != timezone.now().date())
+
+    def refresh(self):
+        # Reconstruye si otro proceso ha cambiado los datos o ha cambiado el día
+        version = current_version(self.name)
+        if self.stale(version):
+            self.rebuild(version)
+            return True
+        self.checked_at = time.monotonic()
+        return False
+
+    def ensure_fresh(self):
+        if self.version is None:
+            with self._refreshing:
+                if self.version is None:
+                    self.rebuild()
+            return
+        interval = getattr(settings, 'INDEX_REFRESH_SECONDS', REFRESH_SECONDS)
+        if time.monotonic() - self.checked_at < interval:
+            return
+        # Si ya hay una comprobación en marcha, basta con esa
+        if not self._refreshing.acquire(blocking=False):
+            return
+        self.checked_at = time.monotonic()
+        if getattr(settings, 'INDEX_REFRESH_BACKGROUND', True):
+            threading.Thread(target=self._refresh_in_background, name=f'refresh-{self.name}', daemon=True).start()
+        else:
+            try:
+                self.refresh()
+            finally:
+                self._refreshing.release()
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh()
+        except Exception:
+            logger.exception('No se pudo actualizar el índice %s', self.name)
+        finally:
+            # Las conexiones son por hilo: que no queden abiertas
+            connections.close_all()
+            self._refreshing.release()
+
+    def changed(self, apply, using='default'):
+        # Registra un cambio de la transacción en curso; apply() lo aplica al
+        # índice del proceso (con self._lock tomado) cuando se confirma
+        version = bump(self.name, using)
+        transaction.on_commit(lambda: self._apply(apply, version), using=using)
+
+    def _apply(self, apply, version):
+        with self._lock:
+            if self.version is None:
+                return
+            apply()
+            # Solo seguimos al día si nadie más había cambiado la versión
+            if version == self.version + 1:
+                self.version = version
+
+    def invalidate(self, using='default'):
+        # Fuerza una reconstrucción en todos los procesos (p. ej. tras cargas masivas)
+        bump(self.name, using)
+
+
+def forget():
+    # Los índices se reconstruyen en el siguiente uso (pruebas)
+    for index in list(_indexes):
+        index.version = None
@@ -0,0 +1,90 @@
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.exceptions import ValidationError
+from django.db import connections, transaction
+
+from core import applying, resumes
+from core.models import Application, Candidate, JobOffer
+
+from ._profiling import QueryLog
+
+# Postulaciones (bench_apply): el camino de applying.apply frente al anterior
+# (comprobar duplicados y plazo, validar y guardar) en consultas y tiempo por
+# postulación, y qué pasa cuando llegan a la vez varios envíos del mismo
+# formulario.
+
+def apply_with_checks(candidate_id, offer_id, cover_letter):
+    # Camino anterior a applying.apply, como referencia
+    offer = JobOffer.objects.for_detail().get(pk=offer_id)
+    if Application.objects.filter(candidate_id=candidate_id, job_offer=offer).exists():
+        return applying.DUPLICATE
+    if offer.is_expired:
+        return applying.CLOSED
+    application = Application(
+        candidate=Candidate.objects.get(pk=candidate_id), job_offer=offer, cover_letter=cover_letter,
+    )
+    try:
+        application.full_clean()
+        with transaction.atomic():
+            resumes.attach(application)
+            application.save()
+    except ValidationError:
+        return applying.DUPLICATE
+    return applying.APPLIED
+
+
+def apply_with_insert(candidate_id, offer_id, cover_letter):
+    return applying.apply(candidate_id, offer_id, cover_letter)[0]
+
+
+def measure_applies(apply, pairs, cover_letter='Carta de presentación generada en la prueba.'):
+    # Consultas y milisegundos por postulación para cada (candidato, oferta)
+    log = QueryLog()
+    outcomes = Counter()
+    start = time.perf_counter()
+    with connections['default'].execute_wrapper(log):
+        for candidate_id, offer_id in pairs:
+            outcomes[apply(candidate_id, offer_id, cover_letter)] += 1
+    elapsed = time.perf_counter() - start
+    count = max(len(pairs), 1)
+    return {
+        'applies': len(pairs),
+        'queries': len(log.queries) / count,
+        'ms': elapsed * 1000 / count,
+        'outcomes': dict(outcomes),
+    }
+
+
+def race(apply, pairs, threads=4, cover_letter='Carta de presentación enviada dos veces.'):
+    # Cada (candidato, oferta) se envía desde `threads` hilos a la vez.
+    # Devuelve cuántas veces salió cada resultado (o excepción) y cuántas
+    # postulaciones sobran (más de una por candidato y oferta).
+    outcomes = Counter()
+    lock = threading.Lock()
+
+    def submit(barrier, candidate_id, offer_id):
+        barrier.wait()
+        try:
+            outcome = apply(candidate_id, offer_id, cover_letter)
+        except Exception as exc:
+            outcome = type(exc).__name__
+        finally:
+            connections.close_all()
+        with lock:
+            outcomes[outcome] += 1
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for candidate_id, offer_id in pairs:
+            barrier = threading.Barrier(threads)
+            futures = [pool.submit(submit, barrier, candidate_id, offer_id) for _ in range(threads)]
+            for future in futures:
+                future.result()
+
+    created = sum(
+        Application.objects.filter(candidate_id=candidate_id, job_offer_id=offer_id).count()
+        for candidate_id, offer_id in pairs
+    )
+    return {'submits': len(pairs) * threads, 'outcomes': dict(outcomes), 'extra': created - len(pairs)}
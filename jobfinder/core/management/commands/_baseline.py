@@ -0,0 +1,33 @@
+import json
+
+from django.utils import timezone
+
+# Referencias de los comandos bench_*: se guardan en JSON con --save y se
+# comparan con --compare para ver la variación de una ejecución a otra.
+
+def save_baseline(path, report, options):
+    with open(path, 'w', encoding='utf-8') as baseline:
+        json.dump({'created': timezone.now().isoformat(), 'options': options, 'results': report}, baseline, indent=2)
+
+
+def load_baseline(path):
+    with open(path, encoding='utf-8') as baseline:
+        return json.load(baseline)
+
+
+def compare(baseline, report):
+    # {paso: (variación % de req/s, variación % de p95)} respecto a la referencia
+    changes = {}
+    for step, result in report.items():
+        previous = baseline.get(step)
+        if not previous:
+            continue
+        changes[step] = (
+            change(previous['rps'], result['rps']),
+            change(previous['p95_ms'], result['p95_ms']),
+        )
+    return changes
+
+
+def change(before, after):
+    return (after - before) / before * 100 if before else 0.0
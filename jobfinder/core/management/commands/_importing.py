@@ -0,0 +1,158 @@
+import csv
+import json
+import os
+import time
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+# Base común de import_offers e import_applications.
+# Lee el fichero (CSV o JSONL) fila a fila, valida y resuelve las claves
+# naturales por lotes, y escribe cada lote con bulk_create en su propia
+# transacción. Tras cada lote guarda un punto de control con el número de
+# filas procesadas para poder reanudar con --resume.
+# Las filas con errores, también las líneas de JSONL que no son un objeto,
+# van al fichero de errores con su número y la importación sigue.
+
+
+class MalformedRow:
+    # Línea de JSONL que no se puede leer como fila: se guarda el texto tal cual
+    def __init__(self, text, error):
+        self.text = text
+        self.error = error
+
+
+class BaseImportCommand(BaseCommand):
+    model = None
+    required_columns = ()
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Fichero CSV o JSONL')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Por defecto, según la extensión')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--errors', help='Fichero JSONL para las filas con errores (por defecto <path>.errors.jsonl)')
+        parser.add_argument('--checkpoint', help='Fichero de punto de control (por defecto <path>.checkpoint)')
+        parser.add_argument('--resume', action='store_true', help='Continuar desde el último punto de control')
+
+    # Subclases
+
+    def resolve(self, rows):
+        # Devuelve las búsquedas necesarias para todo el lote (una consulta por clave)
+        return {}
+
+    def build(self, row, lookups):
+        raise NotImplementedError
+
+    def after_import(self, objects):
+        pass
+
+    # Lectura
+
+    def read_rows(self, path, fmt):
+        with open(path, newline='', encoding='utf-8') as source:
+            if fmt == 'csv':
+                for row in csv.DictReader(source):
+                    yield row
+            else:
+                for line in source:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        row = json.loads(line)
+                    except json.JSONDecodeError as e:
+                        yield MalformedRow(line, f'JSON no válido: {e}')
+                        continue
+                    if isinstance(row, dict):
+                        yield row
+                    else:
+                        yield MalformedRow(line, 'La línea no es un objeto JSON.')
+
+    def batches(self, rows, size):
+        while True:
+            batch = list(islice(rows, size))
+            if not batch:
+                return
+            yield batch
+
+    # Puntos de control
+
+    def load_checkpoint(self, path):
+        try:
+            with open(path, encoding='utf-8') as checkpoint:
+                return json.load(checkpoint)['rows']
+        except FileNotFoundError:
+            return 0
+
+    def save_checkpoint(self, path, rows):
+        tmp = f'{path}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as checkpoint:
+            json.dump({'rows': rows}, checkpoint)
+        os.replace(tmp, path)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'No existe el fichero {path}')
+        fmt = options['format'] or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+        batch_size = options['batch_size']
+        checkpoint_path = options['checkpoint'] or f'{path}.checkpoint'
+        errors_path = options['errors'] or f'{path}.errors.jsonl'
+
+        skip = self.load_checkpoint(checkpoint_path) if options['resume'] else 0
+        rows = enumerate(self.read_rows(path, fmt), start=1)
+        if skip:
+            rows = islice(rows, skip, None)
+            self.stdout.write(f'Reanudando después de {skip} filas.')
+
+        processed, created, failed = skip, 0, 0
+        start = time.monotonic()
+        with open(errors_path, 'a' if options['resume'] else 'w', encoding='utf-8') as errors_file:
+            for batch in self.batches(rows, batch_size):
+                valid, errors = self.validate(batch)
+                with transaction.atomic():
+                    objects = self.model.objects.bulk_create(valid, batch_size=batch_size)
+                    self.after_import(objects)
+                for line, row, error in errors:
+                    errors_file.write(json.dumps({'line': line, 'row': row, 'errors': error}, ensure_ascii=False) + '\n')
+                errors_file.flush()
+
+                processed += len(batch)
+                created += len(objects)
+                failed += len(errors)
+                self.save_checkpoint(checkpoint_path, processed)
+
+                elapsed = time.monotonic() - start
+                rate = (processed - skip) / elapsed if elapsed else 0
+                self.stdout.write(
+                    f'{processed} filas procesadas: {created} creadas, {failed} con errores '
+                    f'({rate:.0f} filas/s)'
+                )
+
+        os.remove(checkpoint_path)
+        self.stdout.write(self.style.SUCCESS(
+            f'Importación terminada: {created} creadas, {failed} con errores.'
+        ))
+        if failed:
+            self.stdout.write(f'Filas con errores en {errors_path}')
+
+    def validate(self, batch):
+        valid, errors = [], []
+        for line, row in batch:
+            if isinstance(row, MalformedRow):
+                errors.append((line, row.text, {'__all__': [row.error]}))
+        batch = [(line, row) for line, row in batch if not isinstance(row, MalformedRow)]
+        lookups = self.resolve([row for _, row in batch])
+        for line, row in batch:
+            missing = [column for column in self.required_columns if not row.get(column)]
+            if missing:
+                errors.append((line, row, {column: ['Este campo es obligatorio.'] for column in missing}))
+                continue
+            try:
+                valid.append(self.build(row, lookups))
+            except ValidationError as e:
+                errors.append((line, row, e.message_dict if hasattr(e, 'error_dict') else {'__all__': e.messages}))
+        errors.sort(key=lambda error: error[0])
+        return valid, errors
@@ -0,0 +1,224 @@
+import asyncio
+import io
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils.crypto import get_random_string
+
+# Generación de carga contra los manejadores WSGI y ASGI en el mismo proceso,
+# sin servidor HTTP: peticiones sueltas a una lista de URL (bench_asgi) o
+# usuarios simulados que repiten un flujo (buscar, ver una oferta y
+# postularse, o revisar el panel de empresa) cada uno en su hilo
+# (bench_load). Devuelve req/s y percentiles de latencia.
+
+def summarize(latencies, elapsed, errors=0):
+    latencies = sorted(latencies)
+    if not latencies:
+        return {'requests': 0, 'errors': errors, 'rps': 0, 'p50_ms': 0, 'p95_ms': 0, 'p99_ms': 0}
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(round(p / 100 * (len(latencies) - 1))))] * 1000
+
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': len(latencies) / elapsed if elapsed else 0,
+        'mean_ms': statistics.fmean(latencies) * 1000,
+        'p50_ms': percentile(50),
+        'p95_ms': percentile(95),
+        'p99_ms': percentile(99),
+    }
+
+
+def _split(url):
+    parts = urlsplit(url)
+    return parts.path, parts.query
+
+
+def wsgi_request(application, url, cookie='', method='GET', body=b'', content_type='', remote_addr='127.0.0.1'):
+    path, query = _split(url)
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'SCRIPT_NAME': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost',
+        'HTTP_COOKIE': cookie,
+        'CONTENT_TYPE': content_type,
+        'CONTENT_LENGTH': str(len(body)),
+        'REMOTE_ADDR': remote_addr,
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    status = []
+
+    def start_response(value, headers, exc_info=None):
+        status.append(int(value.split()[0]))
+
+    result = application(environ, start_response)
+    try:
+        for _ in result:
+            pass
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    return status[0]
+
+
+async def asgi_request(application, url, cookie='', method='GET', body=b'', content_type=''):
+    path, query = _split(url)
+    headers = [(b'host', b'localhost'), (b'cookie', cookie.encode())]
+    if content_type:
+        headers.append((b'content-type', content_type.encode()))
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': headers,
+        'client': ('127.0.0.1', 0),
+        'server': ('localhost', 80),
+    }
+    done = asyncio.Event()
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    status = []
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await done.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+        elif message['type'] == 'http.response.body' and not message.get('more_body'):
+            done.set()
+
+    await application(scope, receive, send)
+    done.set()
+    return status[0]
+
+
+def run_wsgi_load(application, urls, cookie='', concurrency=10):
+    latencies, errors = [], 0
+
+    def fetch(url):
+        start = time.perf_counter()
+        status = wsgi_request(application, url, cookie)
+        return time.perf_counter() - start, status
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for latency, status in pool.map(fetch, urls):
+            latencies.append(latency)
+            errors += status >= 400
+    return summarize(latencies, time.perf_counter() - start, errors)
+
+
+def run_asgi_load(application, urls, cookie='', concurrency=10):
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(url):
+            async with semaphore:
+                start = time.perf_counter()
+                status = await asgi_request(application, url, cookie)
+                return time.perf_counter() - start, status
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(fetch(url) for url in urls))
+        return results, time.perf_counter() - start
+
+    results, elapsed = asyncio.run(main())
+    return summarize([latency for latency, _ in results], elapsed, sum(status >= 400 for _, status in results))
+
+
+# Flujos: cada usuario simulado repite los pasos del suyo en su propio hilo
+
+SEARCH_TERMS = ['desarrollador', 'diseñador', 'marketing', 'python', 'react', 'seo', 'remoto', 'contenidos']
+
+
+def csrf_token():
+    # Secreto CSRF sin enmascarar: vale igual en la cookie y en el formulario
+    return get_random_string(32)
+
+
+def candidate_flow(rng, offer_ids):
+    offer = rng.choice(offer_ids)
+    return [
+        ('job_offers', 'GET', reverse('job_offers') + '?' + urlencode({'search': rng.choice(SEARCH_TERMS)}), None),
+        ('job_offer_detail', 'GET', reverse('job_offer_detail', args=[offer]), None),
+        ('apply_to_offer', 'POST', reverse('apply_to_offer', args=[offer]), {
+            'cover_letter': 'Carta de presentación generada en la prueba de carga.',
+        }),
+    ]
+
+
+def company_flow(rng, offer_ids):
+    return [('company_dashboard', 'GET', reverse('company_dashboard'), None)]
+
+
+def run_flows(application, users, iterations=10, random_seed=0):
+    # users: [(flujo, cookie de sesión, ids de oferta)], un hilo por usuario.
+    # Devuelve el resumen de cada paso y el total.
+    timings = {}
+    lock = threading.Lock()
+
+    def simulate(index, flow, cookie, offer_ids):
+        rng = random.Random(random_seed + index)
+        token = csrf_token()
+        # Una IP por usuario, como en producción (los límites de core/ratelimit.py van por IP)
+        address = f'10.0.{index // 250}.{index % 250 + 1}'
+        cookie = f'{cookie}; {settings.CSRF_COOKIE_NAME}={token}'
+        results = []
+        for _ in range(iterations):
+            for step, method, url, data in flow(rng, offer_ids):
+                body = b''
+                content_type = ''
+                if data is not None:
+                    body = urlencode({**data, 'csrfmiddlewaretoken': token}).encode()
+                    content_type = 'application/x-www-form-urlencoded'
+                start = time.perf_counter()
+                status = wsgi_request(application, url, cookie, method, body, content_type, address)
+                results.append((step, time.perf_counter() - start, status))
+        with lock:
+            for step, latency, status in results:
+                latencies, errors = timings.setdefault(step, ([], [0]))
+                latencies.append(latency)
+                errors[0] += status >= 400
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(users)) as pool:
+        futures = [pool.submit(simulate, index, *user) for index, user in enumerate(users)]
+        for future in futures:
+            future.result()
+    elapsed = time.perf_counter() - start
+
+    report = {step: summarize(latencies, elapsed, errors[0]) for step, (latencies, errors) in sorted(timings.items())}
+    report['total'] = summarize(
+        [latency for latencies, _ in timings.values() for latency in latencies],
+        elapsed,
+        sum(errors[0] for _, errors in timings.values()),
+    )
+    return report
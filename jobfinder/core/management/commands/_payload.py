@@ -0,0 +1,50 @@
+import gzip
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+
+# Peso de las páginas (bench_payload): bytes de HTML que se descargan en cada
+# visita (con y sin gzip), cuántos son CSS/JS en línea y cuánto pesan los
+# ficheros estáticos propios que enlazan, que el navegador guarda en caché
+# tras la primera visita.
+
+_INLINE_RE = re.compile(r'<(style|script)\b(?![^>]*\bsrc=)[^>]*>(.*?)</\1>', re.S | re.I)
+_STATIC_RE = re.compile(r'(?:href|src)="([^"]+)"')
+
+
+def static_size(url):
+    # Tamaño de un fichero estático propio a partir de su URL (o None)
+    if not url.startswith(settings.STATIC_URL):
+        return None
+    name = url[len(settings.STATIC_URL):].split('?')[0]
+    path = finders.find(name)
+    if path is None:
+        from django.contrib.staticfiles.storage import staticfiles_storage
+
+        try:
+            path = staticfiles_storage.path(name)
+        except NotImplementedError:
+            return None
+    return os.path.getsize(path) if path and os.path.exists(path) else None
+
+
+def page_payload(client, path):
+    response = client.get(path)
+    html = response.content
+    text = html.decode(response.charset or 'utf-8')
+    assets = {}
+    for url in _STATIC_RE.findall(text):
+        size = static_size(url)
+        if size is not None:
+            assets[url] = size
+    return {
+        'path': path,
+        'status': response.status_code,
+        'html_bytes': len(html),
+        'html_gzip_bytes': len(gzip.compress(html)),
+        'inline_bytes': sum(len(match.group(2).encode()) for match in _INLINE_RE.finditer(text)),
+        'static_bytes': sum(assets.values()),
+        'static_files': sorted(assets),
+    }
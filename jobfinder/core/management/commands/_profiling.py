@@ -0,0 +1,83 @@
+import re
+import time
+
+from django.db import connections
+
+# Consultas SQL de una petición, su plan de ejecución (EXPLAIN) y las tablas
+# que recorren enteras, para comprobar con un volumen de datos realista que
+# las vistas usan índices.
+
+_FULL_SCAN_PATTERNS = {
+    'sqlite': re.compile(r'^SCAN (core_\w+)$'),
+    'postgresql': re.compile(r'Seq Scan on (core_\w+)'),
+}
+# Tablas de pocas filas fijas (una por categoría) que se leen enteras a propósito
+SMALL_TABLES = frozenset({'core_categorycount'})
+
+
+class QueryLog:
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql,
+                'params': params,
+                'many': many,
+                'time': time.perf_counter() - start,
+            })
+
+
+def explain(sql, params, using='default'):
+    connection = connections[using]
+    if connection.vendor == 'sqlite':
+        prefix = 'EXPLAIN QUERY PLAN '
+    elif connection.vendor == 'postgresql':
+        prefix = 'EXPLAIN '
+    else:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(prefix + sql, params)
+        return [str(row[-1]) for row in cursor.fetchall()]
+
+
+def full_scans(plan, using='default'):
+    pattern = _FULL_SCAN_PATTERNS.get(connections[using].vendor)
+    if pattern is None:
+        return []
+    return [
+        match.group(1) for line in plan for match in [pattern.search(line.strip())]
+        if match and match.group(1) not in SMALL_TABLES
+    ]
+
+
+def profile(client, path, method='get', data=None, using='default'):
+    log = QueryLog()
+    connection = connections[using]
+    start = time.perf_counter()
+    with connection.execute_wrapper(log):
+        response = getattr(client, method)(path, data or {})
+        if response.streaming:
+            b''.join(response.streaming_content)
+    elapsed = time.perf_counter() - start
+
+    plans = []
+    for query in log.queries:
+        if query['many'] or not query['sql'].lstrip().upper().startswith('SELECT'):
+            continue
+        plan = explain(query['sql'], query['params'], using=using)
+        plans.append({'sql': query['sql'], 'plan': plan, 'full_scans': full_scans(plan, using=using)})
+
+    return {
+        'path': path,
+        'status': response.status_code,
+        'queries': len(log.queries),
+        'sql_time': sum(query['time'] for query in log.queries),
+        'time': elapsed,
+        'plans': plans,
+        'full_scans': sorted({table for plan in plans for table in plan['full_scans']}),
+    }
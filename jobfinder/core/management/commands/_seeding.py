@@ -0,0 +1,174 @@
+import os
+import random
+import shutil
+import tempfile
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connections
+from django.test import Client
+from django.utils import timezone
+
+from core import company_stats, geo, search
+from core.models import Application, Candidate, Company, JobOffer
+
+# Datos para las pruebas de rendimiento (seed_load y los comandos bench_*):
+# empresas, ofertas, candidatos y postulaciones generados con inserciones
+# masivas, en la base de datos real o en una temporal desechable.
+
+SEED_PASSWORD = 'clave-segura-123'
+
+STATUS_WEIGHTS = {
+    'pendiente': 50,
+    'revisada': 25,
+    'contactado': 10,
+    'rechazada': 15,
+}
+
+_TITLES = [
+    'Desarrollador Python', 'Desarrollador Frontend React', 'Ingeniero DevOps',
+    'Especialista SEO', 'Community Manager', 'Analista de Marketing Digital',
+    'Diseñador Gráfico', 'Diseñador UX/UI', 'Ilustrador Digital',
+    'Redactor de Contenidos', 'Copywriter', 'Traductor Técnico',
+]
+
+_CITIES = ['Madrid', 'Barcelona', 'Valencia', 'Sevilla', 'Bilbao', 'Málaga', 'Remoto']
+
+_SKILLS = [
+    'python', 'django', 'javascript', 'react', 'sql', 'docker', 'seo', 'sem',
+    'photoshop', 'illustrator', 'figma', 'redacción', 'inglés', 'wordpress',
+]
+
+
+@contextmanager
+def _without_auto_now_add(model, field_name):
+    # Permite fijar fechas "auto_now_add" al generar datos históricos
+    field = model._meta.get_field(field_name)
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def _create_users(prefix, count, password, using, batch_size):
+    users = [
+        User(
+            username=f'{prefix}{i}',
+            email=f'{prefix}{i}@example.com',
+            first_name=prefix.capitalize(),
+            last_name=str(i),
+            password=password,
+        )
+        for i in range(count)
+    ]
+    return User.objects.using(using).bulk_create(users, batch_size=batch_size)
+
+
+def seed(companies=50, offers_per_company=40, candidates=500, applications_per_candidate=5,
+         random_seed=0, using='default', batch_size=1000):
+    rng = random.Random(random_seed)
+    now = timezone.now()
+    today = now.date()
+    password = make_password(SEED_PASSWORD)
+    categories = [choice for choice, _ in JobOffer.CATEGORY_CHOICES]
+
+    company_users = _create_users('empresa', companies, password, using, batch_size)
+    company_objs = Company.objects.using(using).bulk_create([
+        Company(
+            user=user,
+            name=f'Empresa {i}',
+            description='Empresa generada para pruebas de rendimiento.',
+            location=rng.choice(_CITIES),
+            phone='600000000',
+        )
+        for i, user in enumerate(company_users)
+    ], batch_size=batch_size)
+
+    offers = []
+    for company in company_objs:
+        for _ in range(offers_per_company):
+            title = rng.choice(_TITLES)
+            offers.append(JobOffer(
+                company=company,
+                title=title,
+                description=f'{title} para {company.name}. ' * 5,
+                category=rng.choice(categories),
+                location=rng.choice(_CITIES),
+                salary=rng.choice([None, 24000, 30000, 36000, 45000, 60000]),
+                requirements=', '.join(rng.sample(_SKILLS, 4)),
+                publication_date=now - timedelta(minutes=rng.randint(0, 60 * 24 * 90)),
+                # Un 20% de las ofertas ya ha vencido y un 10% está desactivada
+                deadline=today + timedelta(days=rng.randint(-20, 80)),
+                is_active=rng.random() > 0.1,
+            ))
+    for offer in offers:
+        geo.geocode(offer)
+    with _without_auto_now_add(JobOffer, 'publication_date'):
+        offers = JobOffer.objects.using(using).bulk_create(offers, batch_size=batch_size)
+
+    candidate_users = _create_users('candidato', candidates, password, using, batch_size)
+    candidate_objs = Candidate.objects.using(using).bulk_create([
+        Candidate(
+            user=user,
+            phone='600000000',
+            location=rng.choice(_CITIES),
+            skills=', '.join(rng.sample(_SKILLS, 5)),
+            experience='Experiencia generada para pruebas de rendimiento.',
+        )
+        for user in candidate_users
+    ], batch_size=batch_size)
+
+    statuses = list(STATUS_WEIGHTS)
+    weights = list(STATUS_WEIGHTS.values())
+    applications = []
+    for candidate in candidate_objs:
+        for offer in rng.sample(offers, min(applications_per_candidate, len(offers))):
+            applications.append(Application(
+                candidate=candidate,
+                job_offer=offer,
+                status=rng.choices(statuses, weights)[0],
+                cover_letter='Carta de presentación generada.',
+                application_date=offer.publication_date + timedelta(hours=rng.randint(1, 72)),
+            ))
+    with _without_auto_now_add(Application, 'application_date'):
+        applications = Application.objects.using(using).bulk_create(applications, batch_size=batch_size)
+
+    # bulk_create no emite señales
+    search.index_offers(JobOffer.objects.using(using), using=using)
+    company_stats.reconcile(using=using)
+
+    return {
+        'companies': company_objs,
+        'offers': offers,
+        'candidates': candidate_objs,
+        'applications': applications,
+    }
+
+
+@contextmanager
+def temporary_database(using='default', verbosity=0):
+    # Base de datos desechable en un fichero temporal, como la de los tests,
+    # para poder generar datos y lanzar carga sin tocar la base de datos real.
+    connection = connections[using]
+    directory = tempfile.mkdtemp()
+    test_settings = connection.settings_dict.setdefault('TEST', {})
+    previous_test_name = test_settings.get('NAME')
+    test_settings['NAME'] = os.path.join(directory, 'benchmark.sqlite3')
+    old_name = connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+        test_settings['NAME'] = previous_test_name
+        # Con WAL pueden quedar los ficheros -wal y -shm junto a la base de datos
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def session_cookie(user):
+    client = Client()
+    client.force_login(user)
+    return f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}'
@@ -0,0 +1,49 @@
+import random
+
+from django.core.management.base import BaseCommand
+
+from core.models import JobOffer
+
+from . import _applies, _seeding
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara el camino de postulación actual (una inserción condicional) con el '
+        'anterior (comprobar, validar y guardar) sobre una base de datos temporal: '
+        'consultas y tiempo por postulación y envíos simultáneos del mismo formulario'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--applications', type=int, default=300, help='Postulaciones medidas por camino')
+        parser.add_argument('--races', type=int, default=20, help='Formularios enviados a la vez por camino')
+        parser.add_argument('--threads', type=int, default=4, help='Envíos simultáneos de cada formulario')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        paths = [('antes', _applies.apply_with_checks), ('después', _applies.apply_with_insert)]
+        with _seeding.temporary_database():
+            needed = 2 * (options['applications'] + options['races'])
+            data = _seeding.seed(
+                companies=10, offers_per_company=20, candidates=max(needed // 20 + 1, 20),
+                applications_per_candidate=0, random_seed=options['seed'],
+            )
+            offer_ids = list(JobOffer.objects.active().values_list('pk', flat=True))
+            pairs = [(candidate.pk, offer_id) for candidate in data['candidates'] for offer_id in offer_ids]
+            random.Random(options['seed']).shuffle(pairs)
+
+            timings, races = {}, {}
+            for label, apply in paths:
+                measured, pairs = pairs[:options['applications']], pairs[options['applications']:]
+                raced, pairs = pairs[:options['races']], pairs[options['races']:]
+                timings[label] = _applies.measure_applies(apply, measured)
+                races[label] = _applies.race(apply, raced, options['threads'])
+
+        self.stdout.write(f"{'':10}{'postulaciones':>15}{'consultas':>11}{'ms':>9}")
+        for label, result in timings.items():
+            self.stdout.write(f"{label:10}{result['applies']:>15}{result['queries']:>11.1f}{result['ms']:>9.2f}")
+        self.stdout.write('')
+        self.stdout.write(f"Envíos simultáneos ({options['threads']} por formulario):")
+        for label, result in races.items():
+            outcomes = ', '.join(f'{outcome}: {count}' for outcome, count in sorted(result['outcomes'].items()))
+            self.stdout.write(f"{label:10}{result['submits']:>6} envíos  {outcomes}  (sobran {result['extra']})")
@@ -0,0 +1,55 @@
+import itertools
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+
+from core.models import JobOffer
+
+from . import _load, _seeding
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara peticiones por segundo y latencias (p50/p99) de las páginas públicas '
+        'de ofertas servidas por WSGI y por ASGI, sobre una base de datos temporal'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--companies', type=int, default=50)
+        parser.add_argument('--offers-per-company', type=int, default=40)
+
+    def handle(self, *args, **options):
+        with _seeding.temporary_database():
+            data = _seeding.seed(
+                companies=options['companies'],
+                offers_per_company=options['offers_per_company'],
+                candidates=100,
+                applications_per_candidate=3,
+            )
+            cookie = _seeding.session_cookie(data['candidates'][0].user)
+            offer_ids = list(JobOffer.objects.active().values_list('pk', flat=True)[:50])
+            paths = [
+                reverse('home'),
+                reverse('job_offers'),
+                reverse('job_offers') + '?search=desarrollador',
+                reverse('recent_offers'),
+                reverse('offers_by_category'),
+                reverse('offers_expiring_soon'),
+            ] + [reverse('job_offer_detail', args=[pk]) for pk in offer_ids[:10]]
+            urls = list(itertools.islice(itertools.cycle(paths), options['requests']))
+
+            results = {
+                'WSGI': _load.run_wsgi_load(WSGIHandler(), urls, cookie, options['concurrency']),
+                'ASGI': _load.run_asgi_load(ASGIHandler(), urls, cookie, options['concurrency']),
+            }
+
+        self.stdout.write(f"{'':6}{'peticiones':>12}{'errores':>9}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}")
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:6}{result['requests']:>12}{result['errors']:>9}{result['rps']:>9.1f}"
+                f"{result['p50_ms']:>9.1f}{result['p99_ms']:>9.1f}"
+            )
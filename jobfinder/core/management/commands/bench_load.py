@@ -0,0 +1,80 @@
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import JobOffer
+
+from . import _baseline, _load, _seeding
+
+
+class Command(BaseCommand):
+    help = (
+        'Prueba de carga de los flujos principales (buscar ofertas, ver el detalle, '
+        'postularse y el panel de empresa) con usuarios simultáneos sobre una base de '
+        'datos temporal; informa de req/s y percentiles y guarda o compara referencias'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20, help='Usuarios simultáneos')
+        parser.add_argument('--company-users', type=int, default=2, help='Cuántos de ellos son empresas')
+        parser.add_argument('--iterations', type=int, default=10, help='Repeticiones del flujo por usuario')
+        parser.add_argument('--companies', type=int, default=50)
+        parser.add_argument('--offers-per-company', type=int, default=40)
+        parser.add_argument('--candidates', type=int, default=500)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--save', metavar='FICHERO', help='Guardar los resultados como referencia (JSON)')
+        parser.add_argument('--compare', metavar='FICHERO', help='Comparar con una referencia guardada')
+        parser.add_argument(
+            '--max-regression', type=float,
+            help='Falla si el p95 de algún paso empeora más de este porcentaje respecto a --compare',
+        )
+
+    def handle(self, *args, **options):
+        if not 0 <= options['company_users'] < options['users']:
+            raise CommandError('--company-users debe ser menor que --users.')
+        baseline = _baseline.load_baseline(options['compare']) if options['compare'] else None
+
+        with _seeding.temporary_database():
+            data = _seeding.seed(
+                companies=options['companies'],
+                offers_per_company=options['offers_per_company'],
+                candidates=max(options['candidates'], options['users']),
+                applications_per_candidate=3,
+                random_seed=options['seed'],
+            )
+            offer_ids = list(JobOffer.objects.active().values_list('pk', flat=True))
+            companies = data['companies'][:options['company_users']]
+            candidates = data['candidates'][:options['users'] - len(companies)]
+            users = [
+                (_load.company_flow, _seeding.session_cookie(company.user), offer_ids)
+                for company in companies
+            ] + [
+                (_load.candidate_flow, _seeding.session_cookie(candidate.user), offer_ids)
+                for candidate in candidates
+            ]
+            report = _load.run_flows(WSGIHandler(), users, options['iterations'], options['seed'])
+
+        changes = _baseline.compare(baseline['results'], report) if baseline else {}
+        header = f"{'':20}{'peticiones':>12}{'errores':>9}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+        self.stdout.write(header + ('  vs. referencia (req/s, p95)' if baseline else ''))
+        for step, result in report.items():
+            line = (
+                f"{step:20}{result['requests']:>12}{result['errors']:>9}{result['rps']:>9.1f}"
+                f"{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}{result['p99_ms']:>9.1f}"
+            )
+            if step in changes:
+                rps, p95 = changes[step]
+                line += f'  {rps:+.1f}% {p95:+.1f}%'
+            self.stdout.write(line)
+
+        if options['save']:
+            saved = {key: options[key] for key in (
+                'users', 'company_users', 'iterations', 'companies', 'offers_per_company', 'candidates', 'seed',
+            )}
+            _baseline.save_baseline(options['save'], report, saved)
+            self.stdout.write(f"Referencia guardada en {options['save']}")
+
+        limit = options['max_regression']
+        if baseline and limit is not None:
+            regressions = [step for step, (_, p95) in changes.items() if p95 > limit]
+            if regressions:
+                raise CommandError(f"p95 empeora más de un {limit:g}% en: {', '.join(regressions)}")
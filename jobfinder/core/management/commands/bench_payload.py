@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+
+from core.models import Application, JobOffer
+
+from . import _baseline, _payload, _seeding
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide el peso del HTML de las páginas principales (con y sin gzip), los bytes de '
+        'CSS/JS en línea y los ficheros estáticos que enlazan, sobre una base de datos '
+        'temporal; guarda o compara referencias'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--save', metavar='FICHERO', help='Guardar los resultados como referencia (JSON)')
+        parser.add_argument('--compare', metavar='FICHERO', help='Comparar con una referencia guardada')
+
+    def handle(self, *args, **options):
+        baseline = _baseline.load_baseline(options['compare'])['results'] if options['compare'] else {}
+
+        with _seeding.temporary_database():
+            data = _seeding.seed(companies=5, offers_per_company=10, candidates=5, applications_per_candidate=2)
+            application = Application.objects.select_related('job_offer').first()
+            offer = application.job_offer
+            company_user = offer.company.user
+            candidate = application.candidate
+            open_offer = JobOffer.objects.active().exclude(application__candidate=candidate).first()
+            pages = [
+                ('home', None, reverse('home')),
+                ('login', None, reverse('login')),
+                ('register', None, reverse('register')),
+                ('job_offers', candidate.user, reverse('job_offers')),
+                ('job_offer_detail', candidate.user, reverse('job_offer_detail', args=[offer.pk])),
+                ('apply_to_offer', candidate.user, reverse('apply_to_offer', args=[open_offer.pk])),
+                ('my_applications', candidate.user, reverse('my_applications')),
+                ('company_dashboard', company_user, reverse('company_dashboard')),
+                ('create_job_offer', company_user, reverse('create_job_offer')),
+                ('application_list', company_user, reverse('application_list', args=[offer.pk])),
+            ]
+            report = {}
+            for name, user, path in pages:
+                client = Client(HTTP_HOST='localhost')
+                if user is not None:
+                    client.force_login(user)
+                report[name] = _payload.page_payload(client, path)
+            del data
+
+        header = f"{'':20}{'HTML':>9}{'gzip':>8}{'en línea':>10}{'estáticos':>11}"
+        self.stdout.write(header + ('  vs. referencia (HTML, gzip)' if baseline else ''))
+        for name, result in report.items():
+            line = (
+                f"{name:20}{result['html_bytes']:>9}{result['html_gzip_bytes']:>8}"
+                f"{result['inline_bytes']:>10}{result['static_bytes']:>11}"
+            )
+            previous = baseline.get(name)
+            if previous:
+                line += '  {:+.1f}% {:+.1f}%'.format(
+                    _baseline.change(previous['html_bytes'], result['html_bytes']),
+                    _baseline.change(previous['html_gzip_bytes'], result['html_gzip_bytes']),
+                )
+            self.stdout.write(line)
+
+        if options['save']:
+            _baseline.save_baseline(options['save'], report, {})
+            self.stdout.write(f"Referencia guardada en {options['save']}")
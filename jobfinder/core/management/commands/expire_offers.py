@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from core.expiry import BATCH_SIZE, expire_offers
+
+
+class Command(BaseCommand):
+    help = 'Desactiva las ofertas cuya fecha límite ya pasó (ejecutar a diario, justo después de medianoche)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        sweep = expire_offers(
+            batch_size=options['batch_size'],
+            progress=lambda count: self.stdout.write(f'{count} ofertas desactivadas...'),
+        )
+        elapsed = (sweep.finished_at - sweep.started_at).total_seconds()
+        self.stdout.write(self.style.SUCCESS(
+            f'{sweep.expired} ofertas vencidas desactivadas en {elapsed:.2f}s.'
+        ))
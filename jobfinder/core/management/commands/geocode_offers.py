@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from core import caching, facets, geo
+from core.models import JobOffer
+
+
+class Command(BaseCommand):
+    help = 'Recalcula coordenadas, geohash y modalidad remota de las ofertas (tras cambiar el nomenclátor)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        count = geo.geocode_all(JobOffer.objects.using(using), batch_size=1000)
+        if count:
+            caching.touch(caching.LISTINGS, using=using)
+            # Las ciudades de las facetas salen del nomenclátor
+            facets.invalidate(using=using)
+        self.stdout.write(self.style.SUCCESS(f'{count} ofertas actualizadas.'))
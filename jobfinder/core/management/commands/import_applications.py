@@ -0,0 +1,65 @@
+from django.core.exceptions import ValidationError
+
+from core import company_stats
+from core.models import Application, Candidate, JobOffer
+
+from ._importing import BaseImportCommand
+
+
+class Command(BaseImportCommand):
+    help = (
+        'Importa postulaciones desde un fichero CSV o JSONL con las columnas candidate '
+        '(nombre de usuario), offer (id de la oferta), cover_letter, status y notes'
+    )
+    model = Application
+    required_columns = ('candidate', 'offer', 'cover_letter')
+
+    def resolve(self, rows):
+        usernames = {row['candidate'] for row in rows if row.get('candidate')}
+        offer_ids = set()
+        for row in rows:
+            try:
+                offer_ids.add(int(row.get('offer')))
+            except (TypeError, ValueError):
+                pass
+        candidates = dict(Candidate.objects.filter(user__username__in=usernames).values_list('user__username', 'pk'))
+        # company_id: after_import recalcula las estadísticas de cada empresa
+        offers = JobOffer.objects.filter(pk__in=offer_ids).only('id', 'company_id', 'deadline', 'is_active')
+        offers = {offer.pk: offer for offer in offers}
+        existing = set(Application.objects.filter(
+            candidate_id__in=candidates.values(),
+            job_offer_id__in=offers,
+        ).values_list('candidate_id', 'job_offer_id'))
+        return {'candidates': candidates, 'offers': offers, 'existing': existing}
+
+    def build(self, row, lookups):
+        errors = {}
+        candidate_id = lookups['candidates'].get(row['candidate'])
+        if candidate_id is None:
+            errors['candidate'] = ['Candidato desconocido.']
+        try:
+            offer = lookups['offers'].get(int(row['offer']))
+        except (TypeError, ValueError):
+            offer = None
+        if offer is None:
+            errors['offer'] = ['Oferta desconocida.']
+        if errors:
+            raise ValidationError(errors)
+        if (candidate_id, offer.pk) in lookups['existing']:
+            raise ValidationError('Ya existe una postulación de este candidato a esta oferta.')
+
+        application = Application(
+            candidate_id=candidate_id,
+            job_offer=offer,
+            cover_letter=row.get('cover_letter', ''),
+            status=row.get('status') or 'pendiente',
+            notes=row.get('notes', ''),
+        )
+        application.full_clean(exclude=['candidate', 'job_offer'], validate_unique=False)
+        # Evita duplicados dentro del propio fichero
+        lookups['existing'].add((candidate_id, offer.pk))
+        return application
+
+    def after_import(self, objects):
+        # bulk_create no emite señales: recalcular las estadísticas de las empresas afectadas
+        company_stats.reconcile({application.job_offer.company_id for application in objects})
@@ -0,0 +1,65 @@
+from django.core.exceptions import ValidationError
+
+from core import caching, company_stats, facets, geo, matching, search, stats, suggest
+from core.models import Company, JobOffer
+
+from ._importing import BaseImportCommand
+
+
+class Command(BaseImportCommand):
+    help = (
+        'Importa ofertas desde un fichero CSV o JSONL con las columnas company, title, '
+        'description, category, location, salary, requirements, deadline e is_active'
+    )
+    model = JobOffer
+    required_columns = ('company', 'title', 'category', 'deadline')
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--company-key', choices=['username', 'name'], default='username',
+            help='Campo que identifica a la empresa en la columna company',
+        )
+
+    def handle(self, *args, **options):
+        self.company_key = options['company_key']
+        super().handle(*args, **options)
+
+    def resolve(self, rows):
+        keys = {row['company'] for row in rows if row.get('company')}
+        field = 'user__username' if self.company_key == 'username' else 'name'
+        companies = {}
+        for key, pk in Company.objects.filter(**{f'{field}__in': keys}).values_list(field, 'pk'):
+            companies.setdefault(key, pk)
+        return {'companies': companies}
+
+    def build(self, row, lookups):
+        company_id = lookups['companies'].get(row['company'])
+        if company_id is None:
+            raise ValidationError({'company': ['Empresa desconocida.']})
+        offer = JobOffer(
+            company_id=company_id,
+            title=row.get('title', ''),
+            description=row.get('description', ''),
+            category=row.get('category', ''),
+            location=row.get('location', ''),
+            salary=row.get('salary') or None,
+            requirements=row.get('requirements', ''),
+            deadline=row.get('deadline'),
+        )
+        if row.get('is_active') not in (None, ''):
+            offer.is_active = row['is_active']
+        offer.full_clean(exclude=['company'], validate_unique=False)
+        # bulk_create no pasa por JobOffer.save
+        geo.geocode(offer)
+        return offer
+
+    def after_import(self, objects):
+        # bulk_create no emite señales: actualizar índices y conteos a mano
+        search.index_offers(JobOffer.objects.filter(pk__in=[offer.pk for offer in objects]))
+        suggest.invalidate()
+        matching.invalidate()
+        facets.invalidate()
+        caching.touch(caching.LISTINGS)
+        stats.invalidate_category_counts()
+        company_stats.reconcile({offer.company_id for offer in objects})
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import matching
+
+
+class Command(BaseCommand):
+    help = (
+        'Reconstruye desde cero los índices de emparejamiento candidato-oferta '
+        'y obliga a los demás procesos a reconstruir los suyos'
+    )
+
+    def handle(self, *args, **options):
+        for name, index in (('ofertas', matching.offers), ('candidatos', matching.candidates)):
+            start = time.monotonic()
+            index.rebuild_everywhere()
+            self.stdout.write(
+                f'{name}: {len(index)} documentos, {index.term_count} términos '
+                f'({time.monotonic() - start:.2f}s)'
+            )
+        self.stdout.write(self.style.SUCCESS('Índices de emparejamiento reconstruidos.'))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core import search
+from core.models import JobOffer
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el índice de búsqueda de texto completo de las ofertas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if not search.is_available(using):
+            raise CommandError('El índice de búsqueda no está disponible en esta base de datos.')
+        count = search.rebuild_index(JobOffer.objects.using(using), using=using)
+        self.stdout.write(self.style.SUCCESS(f'{count} ofertas indexadas.'))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from core.stats import reconcile_category_counts
+
+
+class Command(BaseCommand):
+    help = 'Recalcula el conteo de ofertas activas por categoría (ejecutar a diario)'
+
+    def handle(self, *args, **options):
+        for category, count in reconcile_category_counts().items():
+            self.stdout.write(f'{category}: {count}')
+        self.stdout.write(self.style.SUCCESS('Conteos por categoría actualizados.'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core.company_stats import reconcile
+
+
+class Command(BaseCommand):
+    help = 'Recalcula las estadísticas del panel de cada empresa (ejecutar a diario)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company', type=int, action='append', help='Id de la empresa (se puede repetir)')
+
+    def handle(self, *args, **options):
+        stats = reconcile(options['company'])
+        self.stdout.write(self.style.SUCCESS(f'Estadísticas de {len(stats)} empresas actualizadas.'))
@@ -0,0 +1,52 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core import caching, facets, matching, stats, suggest
+
+from . import _seeding
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera datos de prueba realistas (empresas, ofertas de todas las categorías, '
+        'candidatos y postulaciones) con inserciones masivas, para pruebas de carga'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--companies', type=int, default=50)
+        parser.add_argument('--offers-per-company', type=int, default=40)
+        parser.add_argument('--candidates', type=int, default=500)
+        parser.add_argument('--applications-per-candidate', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=0, help='Semilla aleatoria (mismos datos con la misma semilla)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if User.objects.filter(username__in=['empresa0', 'candidato0']).exists():
+            raise CommandError('La base de datos ya tiene datos generados; usa una base de datos vacía.')
+
+        start = time.monotonic()
+        with transaction.atomic():
+            data = _seeding.seed(
+                companies=options['companies'],
+                offers_per_company=options['offers_per_company'],
+                candidates=options['candidates'],
+                applications_per_candidate=options['applications_per_candidate'],
+                random_seed=options['seed'],
+                batch_size=options['batch_size'],
+            )
+            # bulk_create no emite señales
+            suggest.invalidate()
+            matching.invalidate()
+            facets.invalidate()
+            caching.touch(caching.LISTINGS)
+            stats.invalidate_category_counts()
+        elapsed = time.monotonic() - start
+
+        for name, objects in data.items():
+            self.stdout.write(f'{name}: {len(objects)}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Datos generados en {elapsed:.1f} s. Contraseña de todos los usuarios: {_seeding.SEED_PASSWORD}'
+        ))
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import notifications
+
+
+class Command(BaseCommand):
+    help = (
+        'Envía los avisos por correo pendientes (postulaciones nuevas y cambios de estado) '
+        'agrupados en un resumen por destinatario; con --loop sigue vaciando la cola'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=notifications.BATCH_SIZE)
+        parser.add_argument('--loop', action='store_true', help='No terminar: revisar la cola cada --interval segundos')
+        parser.add_argument('--interval', type=float, default=30)
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        while True:
+            result = notifications.drain(options['batch_size'], using=options['database'])
+            if result or not options['loop']:
+                self.stdout.write(
+                    f"{result['emails']} correos con {result['sent']} avisos; "
+                    f"{result['retried']} para reintentar, {result['failed']} fallidos, "
+                    f"{result['discarded']} descartados."
+                )
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
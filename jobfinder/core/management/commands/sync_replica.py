@@ -0,0 +1,45 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+
+class Command(BaseCommand):
+    help = (
+        'Copia la base de datos SQLite principal en la réplica de lectura '
+        '(JOBFINDER_REPLICA_DB) con la API de copias en caliente de SQLite'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--every', type=float, help='Repetir cada N segundos en vez de copiar una sola vez')
+
+    def handle(self, *args, **options):
+        alias = settings.DATABASE_READ_ALIAS
+        if not alias:
+            raise CommandError('No hay réplica configurada (variable de entorno JOBFINDER_REPLICA_DB).')
+        primary = settings.DATABASES[DEFAULT_DB_ALIAS]
+        replica = settings.DATABASES[alias]
+        if primary['ENGINE'] != 'django.db.backends.sqlite3' or replica['ENGINE'] != primary['ENGINE']:
+            raise CommandError('sync_replica solo sirve para réplicas SQLite.')
+
+        while True:
+            start = time.monotonic()
+            self.copy(primary['NAME'], replica['NAME'])
+            self.stdout.write(f"Réplica actualizada en {time.monotonic() - start:.2f} s")
+            if not options['every']:
+                break
+            time.sleep(options['every'])
+
+    def copy(self, source_name, target_name):
+        # La copia es una instantánea coherente aunque haya escrituras en curso,
+        # y los lectores de la réplica solo esperan mientras se escribe
+        source = sqlite3.connect(source_name)
+        target = sqlite3.connect(target_name, timeout=30)
+        try:
+            source.backup(target)
+            target.execute('PRAGMA journal_mode=WAL')
+        finally:
+            target.close()
+            source.close()
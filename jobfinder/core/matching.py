@@ -0,0 +1,206 @@
+import heapq
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from operator import itemgetter
+
+from .indexes import SharedIndex
+from .models import Candidate, JobOffer
+from .search import normalize, stem
+
+# Emparejamiento entre candidatos y ofertas por similitud TF-IDF.
+# Las habilidades de los candidatos (Candidate.skills) y el título y los
+# requisitos de las ofertas activas se reducen a los mismos términos que usa
+# el buscador (sin acentos y reducidos a su raíz) y se guardan como vectores
+# normalizados en una matriz dispersa documento × término, almacenada por
+# columnas (término → {documento: peso}). Puntuar un texto contra todos los
+# documentos es un producto matriz-vector disperso: se recorren solo las
+# columnas de los términos del texto, sin tocar los documentos que no
+# comparten ninguno, y se eligen los k mejores con un montículo.
+#
+# Cada proceso tiene sus índices en memoria y los actualiza al guardar; los
+# cambios de otros procesos se recogen fuera de las peticiones, en segundo
+# plano (ver core/indexes.py). Los dos índices se reconstruyen además cada día:
+# los pesos de los documentos añadidos de uno en uno usan el idf del momento
+# y se desvían poco a poco de los de una reconstrucción completa.
+
+_TOKEN_RE = re.compile(r'\w+')
+
+STOP_WORDS = frozenset((
+    'a', 'al', 'and', 'con', 'de', 'del', 'el', 'en', 'for', 'la', 'las', 'lo', 'los',
+    'o', 'of', 'para', 'por', 'que', 'se', 'sin', 'su', 'sus', 'the', 'to', 'u', 'un',
+    'una', 'unos', 'unas', 'y', 'e', 'como', 'mas', 'muy', 'sobre', 'entre',
+))
+
+
+_stem = lru_cache(maxsize=65536)(stem)
+
+
+def terms(text):
+    return [
+        _stem(token) for token in _TOKEN_RE.findall(normalize(text))
+        if len(token) > 1 and token not in STOP_WORDS and not token.isdigit()
+    ]
+
+
+def term_frequencies(text):
+    return {term: 1 + math.log(count) for term, count in Counter(terms(text)).items()}
+
+
+def _idf(document_frequency, documents):
+    return math.log((documents + 1) / (document_frequency + 1)) + 1
+
+
+def _normalized(weights):
+    norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+    if not norm:
+        return {}
+    return {term: weight / norm for term, weight in weights.items()}
+
+
+class MatchIndex(SharedIndex):
+    def __init__(self, name, documents):
+        # documents(): iterable de (pk, texto) con todo lo que debe indexarse
+        super().__init__(f'matching:{name}')
+        self._documents = documents
+        self._columns = {}
+        self._rows = {}
+
+    def __len__(self):
+        return len(self._rows)
+
+    @property
+    def term_count(self):
+        return len(self._columns)
+
+    def _add(self, pk, frequencies):
+        # Los pesos usan el idf del momento en que se añade el documento
+        self._remove(pk)
+        count = len(self._rows) + 1
+        weights = _normalized({
+            term: frequency * _idf(len(self._columns.get(term, ())) + 1, count)
+            for term, frequency in frequencies.items()
+        })
+        for term, weight in weights.items():
+            self._columns.setdefault(term, {})[pk] = weight
+        if weights:
+            self._rows[pk] = tuple(weights)
+
+    def _remove(self, pk):
+        for term in self._rows.pop(pk, ()):
+            column = self._columns[term]
+            del column[pk]
+            if not column:
+                del self._columns[term]
+
+    def load(self):
+        rows = [(pk, term_frequencies(text)) for pk, text in self._documents()]
+        document_frequency = Counter(term for _, frequencies in rows for term in frequencies)
+        columns = {}
+        documents = {}
+        for pk, frequencies in rows:
+            weights = _normalized({
+                term: frequency * _idf(document_frequency[term], len(rows))
+                for term, frequency in frequencies.items()
+            })
+            for term, weight in weights.items():
+                columns.setdefault(term, {})[pk] = weight
+            if weights:
+                documents[pk] = tuple(weights)
+        return columns, documents
+
+    def install(self, state):
+        self._columns, self._rows = state
+
+    def update(self, pk, text, using='default'):
+        frequencies = term_frequencies(text)
+        self.changed(lambda: self._add(pk, frequencies), using=using)
+
+    def remove(self, pk, using='default'):
+        self.changed(lambda: self._remove(pk), using=using)
+
+    def _query(self, text):
+        frequencies = term_frequencies(text)
+        count = len(self._rows)
+        weights = {
+            term: frequency * _idf(len(self._columns.get(term, ())), count)
+            for term, frequency in frequencies.items()
+        }
+        return {term: weight for term, weight in _normalized(weights).items() if term in self._columns}
+
+    def scores(self, text, among=None):
+        # Similitud coseno (0-1) de `text` con cada documento que comparte algún término
+        totals = {}
+        with self._lock:
+            for term, query_weight in self._query(text).items():
+                column = self._columns[term]
+                if among is None:
+                    for pk, weight in column.items():
+                        totals[pk] = totals.get(pk, 0.0) + query_weight * weight
+                else:
+                    for pk in among:
+                        weight = column.get(pk)
+                        if weight is not None:
+                            totals[pk] = totals.get(pk, 0.0) + query_weight * weight
+        return totals
+
+    def top(self, text, limit=10, exclude=()):
+        exclude = set(exclude)
+        scores = self.scores(text)
+        candidates = ((pk, score) for pk, score in scores.items() if pk not in exclude)
+        return heapq.nlargest(limit, candidates, key=itemgetter(1))
+
+
+def offer_text(title, requirements):
+    return f'{title}\n{requirements}'
+
+
+def _offer_documents():
+    rows = JobOffer.objects.active().values_list('pk', 'title', 'requirements').iterator(chunk_size=2000)
+    return ((pk, offer_text(title, requirements)) for pk, title, requirements in rows)
+
+
+def _candidate_documents():
+    return Candidate.objects.exclude(skills='').values_list('pk', 'skills').iterator(chunk_size=2000)
+
+
+offers = MatchIndex('offers', _offer_documents)
+candidates = MatchIndex('candidates', _candidate_documents)
+
+
+def recommend_offers(candidate, limit=5, exclude=()):
+    # [(id de oferta, puntuación)] de las ofertas activas más afines al candidato
+    offers.ensure_fresh()
+    return offers.top(candidate.skills, limit, exclude)
+
+
+def rank_candidates(offer, candidate_ids):
+    # {id de candidato: puntuación} de los candidatos dados frente a la oferta
+    candidates.ensure_fresh()
+    return candidates.scores(offer_text(offer.title, offer.requirements), among=candidate_ids)
+
+
+def offer_saved(offer, using='default'):
+    if offer.is_active and not offer.is_expired:
+        offers.update(offer.pk, offer_text(offer.title, offer.requirements), using=using)
+    else:
+        offer_deleted(offer.pk, using=using)
+
+
+def offer_deleted(offer_id, using='default'):
+    offers.remove(offer_id, using=using)
+
+
+def candidate_saved(candidate, using='default'):
+    candidates.update(candidate.pk, candidate.skills, using=using)
+
+
+def candidate_deleted(candidate_id, using='default'):
+    candidates.remove(candidate_id, using=using)
+
+
+def invalidate(using='default'):
+    # Fuerza una reconstrucción en todos los procesos (p. ej. tras cargas masivas)
+    offers.invalidate(using=using)
+    candidates.invalidate(using=using)
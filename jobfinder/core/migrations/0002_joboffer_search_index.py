@@ -0,0 +1,27 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    from core import search
+
+    connection = schema_editor.connection
+    if search.create_index(connection):
+        JobOffer = apps.get_model('core', 'JobOffer')
+        search.index_offers(JobOffer.objects.using(connection.alias), using=connection.alias)
+
+
+def drop_search_index(apps, schema_editor):
+    from core import search
+
+    search.drop_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
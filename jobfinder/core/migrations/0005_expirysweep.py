@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_company_joboffer_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpirySweep',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField()),
+                ('swept_through', models.DateField()),
+                ('expired', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-finished_at'],
+                'get_latest_by': 'finished_at',
+            },
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:17
+
+import hashlib
+import os
+
+import django.db.models.deletion
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+
+
+def move_resumes_to_store(apps, schema_editor):
+    # Los CVs subidos con el antiguo FileField pasan al almacén por contenido
+    from core.resumes import blob_path, content_type_for
+
+    Candidate = apps.get_model('core', 'Candidate')
+    ResumeBlob = apps.get_model('core', 'ResumeBlob')
+    using = schema_editor.connection.alias
+    for candidate in Candidate.objects.using(using).exclude(resume='').exclude(resume__isnull=True).iterator():
+        name = candidate.resume.name
+        if not default_storage.exists(name):
+            continue
+        digest = hashlib.sha256()
+        with default_storage.open(name, 'rb') as source:
+            for chunk in source.chunks():
+                digest.update(chunk)
+        digest = digest.hexdigest()
+        path = blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with default_storage.open(name, 'rb') as source, open(path, 'wb') as target:
+                for chunk in source.chunks():
+                    target.write(chunk)
+        blob, _ = ResumeBlob.objects.using(using).get_or_create(sha256=digest, defaults={
+            'size': default_storage.size(name),
+            'content_type': content_type_for(name),
+        })
+        blob.ref_count += 1
+        blob.save(update_fields=['ref_count'])
+        candidate.resume_blob = blob
+        candidate.save(update_fields=['resume_blob'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_expirysweep'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('size', models.PositiveBigIntegerField()),
+                ('content_type', models.CharField(max_length=100)),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='application',
+            name='resume',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='core.resumeblob'),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='resume_blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='core.resumeblob'),
+        ),
+        migrations.RunPython(move_resumes_to_store, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='candidate',
+            name='resume',
+        ),
+        migrations.RenameField(
+            model_name='candidate',
+            old_name='resume_blob',
+            new_name='resume',
+        ),
+    ]
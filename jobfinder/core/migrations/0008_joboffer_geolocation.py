@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:51
+
+from django.db import migrations, models
+
+
+def backfill_geolocation(apps, schema_editor):
+    # Coordenadas y geohash de las ofertas existentes
+    from core.geo import geocode_all
+
+    JobOffer = apps.get_model('core', 'JobOffer')
+    geocode_all(JobOffer.objects.using(schema_editor.connection.alias).all())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_companystats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='joboffer',
+            name='geohash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=12),
+        ),
+        migrations.AddField(
+            model_name='joboffer',
+            name='is_remote',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='joboffer',
+            name='latitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='joboffer',
+            name='longitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='joboffer',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['geohash'], name='joboffer_active_geohash_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='joboffer',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_remote', True)), fields=['-publication_date', '-id'], name='joboffer_active_remote_idx'),
+        ),
+        migrations.RunPython(backfill_geolocation, migrations.RunPython.noop),
+    ]
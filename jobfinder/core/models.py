@@ -1,8 +1,10 @@
-from django.db import models
+from django.db import models, router, transaction
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 
+from . import geo
+
 class Company(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     name = models.CharField(max_length=200)
@@ -11,22 +13,64 @@ class Company(models.Model):
     website = models.URLField(blank=True)
     phone = models.CharField(max_length=20)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
 
+class ResumeBlob(models.Model):
+    # Contenido de un CV guardado una sola vez por hash (ver core/resumes.py)
+    sha256 = models.CharField(max_length=64, unique=True)
+    size = models.PositiveBigIntegerField()
+    content_type = models.CharField(max_length=100)
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.sha256
+
 class Candidate(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     phone = models.CharField(max_length=20)
     location = models.CharField(max_length=200)
     skills = models.TextField(blank=True)
     experience = models.TextField(blank=True)
-    resume = models.FileField(upload_to='resumes/', blank=True)
+    resume = models.ForeignKey(ResumeBlob, null=True, blank=True, on_delete=models.PROTECT, related_name='+')
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return f"{self.user.first_name} {self.user.last_name}"
 
+class JobOfferQuerySet(models.QuerySet):
+    # Campos que usan los listados (offer_list, index, recent_offers...)
+    LISTING_FIELDS = [
+        'title', 'description', 'category', 'location', 'salary',
+        'publication_date', 'deadline', 'is_active', 'is_remote', 'company__name',
+    ]
+
+    def active(self):
+        # Si expire_offers ya desactivó hoy las ofertas vencidas basta con
+        # is_active (los índices parciales); si no, filtrar también por fecha.
+        # Sin consultas: lo que sabe este proceso del último barrido.
+        from .expiry import swept_today
+
+        if swept_today():
+            return self.filter(is_active=True)
+        return self.filter(is_active=True, deadline__gte=timezone.now().date())
+
+    def for_listing(self):
+        return self.select_related('company').only(*self.LISTING_FIELDS)
+
+    def for_detail(self):
+        return self.select_related('company')
+
+    def for_dashboard(self):
+        # Las postulaciones por oferta vienen del contador application_count
+        return self.only(
+            'title', 'location', 'category', 'deadline', 'is_active',
+            'publication_date', 'application_count',
+        )
+
 class JobOffer(models.Model):
     CATEGORY_CHOICES = [
         ('💻 Desarrollo de Software', '💻 Desarrollo de Software'),
@@ -45,9 +89,56 @@ class JobOffer(models.Model):
     publication_date = models.DateTimeField(auto_now_add=True)
     deadline = models.DateField()
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Mantenido por core/company_stats.py
+    application_count = models.IntegerField(default=0, editable=False)
+    # Calculados a partir de location al guardar (ver core/geo.py)
+    latitude = models.FloatField(null=True, blank=True, editable=False)
+    longitude = models.FloatField(null=True, blank=True, editable=False)
+    geohash = models.CharField(max_length=12, blank=True, default='', editable=False)
+    is_remote = models.BooleanField(default=False, editable=False)
+
+    objects = JobOfferQuerySet.as_manager()
 
     class Meta:
         ordering = ['-publication_date']
+        indexes = [
+            # Listados de ofertas activas por fecha de publicación (paginación por clave)
+            models.Index(
+                fields=['-publication_date', '-id'],
+                condition=models.Q(is_active=True),
+                name='joboffer_active_recent_idx',
+            ),
+            # Ofertas activas por fecha límite (ofertas que expiran pronto)
+            models.Index(
+                fields=['deadline', 'id'],
+                condition=models.Q(is_active=True),
+                name='joboffer_active_deadline_idx',
+            ),
+            # Ofertas de una empresa en su panel (paginación por clave)
+            models.Index(
+                fields=['company', '-publication_date', '-id'],
+                name='joboffer_company_recent_idx',
+            ),
+            # Filtro y conteo por categoría
+            models.Index(
+                fields=['category', 'deadline'],
+                condition=models.Q(is_active=True),
+                name='joboffer_active_category_idx',
+            ),
+            # Búsqueda por radio: un rango del índice por celda (core/geo.py)
+            models.Index(
+                fields=['geohash'],
+                condition=models.Q(is_active=True),
+                name='joboffer_active_geohash_idx',
+            ),
+            # Listado de ofertas en remoto por fecha de publicación
+            models.Index(
+                fields=['-publication_date', '-id'],
+                condition=models.Q(is_active=True, is_remote=True),
+                name='joboffer_active_remote_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -60,6 +151,31 @@ class JobOffer(models.Model):
     def is_expired(self):
         return self.deadline < timezone.now().date()
 
+    def save(self, *args, **kwargs):
+        # Coordenadas y geohash a partir de location (core/geo.py)
+        update_fields = kwargs.get('update_fields')
+        if 'location' not in self.get_deferred_fields() and (update_fields is None or 'location' in update_fields):
+            geo.geocode(self)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, *geo.OFFER_FIELDS}
+        # Los contadores de core/company_stats.py se actualizan en post_save,
+        # dentro de la misma transacción que la oferta
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
+
+class ApplicationQuerySet(models.QuerySet):
+    def for_candidate(self):
+        # my_applications y cancelación: oferta y empresa de cada postulación
+        return self.select_related('job_offer__company')
+
+    def for_dashboard(self):
+        return self.select_related('candidate__user', 'job_offer')
+
+    def for_review(self):
+        # Revisión por la empresa: candidato, oferta y dueño de la oferta
+        return self.select_related('candidate__user', 'job_offer__company__user')
+
 class Application(models.Model):
     STATUS_CHOICES = [
         ('pendiente', 'Pendiente'),
@@ -74,10 +190,17 @@ class Application(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pendiente')
     cover_letter = models.TextField()
     notes = models.TextField(blank=True)
+    resume = models.ForeignKey(ResumeBlob, null=True, blank=True, on_delete=models.PROTECT, related_name='+')
+
+    objects = ApplicationQuerySet.as_manager()
 
     class Meta:
         unique_together = ['candidate', 'job_offer']
         ordering = ['-application_date']
+        indexes = [
+            models.Index(fields=['job_offer', 'status'], name='application_offer_status_idx'),
+            models.Index(fields=['candidate', '-application_date'], name='application_candidate_idx'),
+        ]
 
     def __str__(self):
         return f"{self.candidate} - {self.job_offer}"
@@ -90,4 +213,121 @@ class Application(models.Model):
     def save(self, *args, **kwargs):
         if self.job_offer_id:
             self.full_clean()
-        super().save(*args, **kwargs)
\ No newline at end of file
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
+
+class ExpirySweep(models.Model):
+    # Registro de cada ejecución de expire_offers
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField()
+    swept_through = models.DateField()
+    expired = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-finished_at']
+        get_latest_by = 'finished_at'
+
+    def __str__(self):
+        return f"{self.swept_through} ({self.expired} ofertas)"
+
+class CompanyStats(models.Model):
+    # Resumen del panel de cada empresa, mantenido por core/company_stats.py
+    STATUS_FIELDS = {
+        'pendiente': 'pending_applications',
+        'revisada': 'reviewed_applications',
+        'contactado': 'contacted_applications',
+        'rechazada': 'rejected_applications',
+    }
+
+    company = models.OneToOneField(Company, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    total_offers = models.IntegerField(default=0)
+    active_offers = models.IntegerField(default=0)
+    total_applications = models.IntegerField(default=0)
+    pending_applications = models.IntegerField(default=0)
+    reviewed_applications = models.IntegerField(default=0)
+    contacted_applications = models.IntegerField(default=0)
+    rejected_applications = models.IntegerField(default=0)
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Estadísticas de {self.company}"
+
+    @property
+    def inactive_offers(self):
+        return self.total_offers - self.active_offers
+
+    def applications_by_status(self):
+        return [
+            (status, label, getattr(self, self.STATUS_FIELDS[status]))
+            for status, label in Application.STATUS_CHOICES
+        ]
+
+class Notification(models.Model):
+    # Evento pendiente de avisar por correo (bandeja de salida). Se inserta en
+    # la misma transacción que el cambio de la postulación y lo envía el
+    # comando send_notifications (ver core/notifications.py)
+    APPLICATION_CREATED = 'application_created'
+    STATUS_CHANGED = 'status_changed'
+    KIND_CHOICES = [
+        (APPLICATION_CREATED, 'Nueva postulación'),
+        (STATUS_CHANGED, 'Cambio de estado'),
+    ]
+
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    DISCARDED = 'discarded'
+    STATE_CHOICES = [
+        (PENDING, 'Pendiente'),
+        (SENT, 'Enviada'),
+        (FAILED, 'Fallida'),
+        (DISCARDED, 'Descartada'),
+    ]
+
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    # Si se borra la postulación antes del envío, ya no hay nada que avisar
+    application = models.ForeignKey(Application, null=True, on_delete=models.SET_NULL, related_name='+')
+    old_status = models.CharField(max_length=20, blank=True)
+    new_status = models.CharField(max_length=20, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    state = models.CharField(max_length=20, choices=STATE_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            # Cola de pendientes del worker
+            models.Index(
+                fields=['next_attempt_at', 'id'],
+                condition=models.Q(state='pending'),
+                name='notification_pending_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} ({self.get_state_display()})"
+
+
+class CategoryCount(models.Model):
+    # Ofertas activas por categoría, mantenido por core/stats.py
+    category = models.CharField(max_length=50, primary_key=True)
+    count = models.IntegerField(default=0)
+    # Día del último recuento completo; None tras una escritura masiva
+    counted_on = models.DateField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.category}: {self.count}"
+
+
+class IndexVersion(models.Model):
+    # Versión de cada índice en memoria: la incrementa cada escritura que le
+    # afecta y los procesos la comparan con la suya (ver core/indexes.py)
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
@@ -0,0 +1,200 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import Application, Notification
+
+# Avisos por correo de postulaciones nuevas (a la empresa) y cambios de estado
+# (al candidato) con una bandeja de salida en la base de datos.
+# Las vistas no envían nada: las señales de Application y triage insertan una
+# fila Notification en la misma transacción que el cambio, así que si este se
+# deshace el aviso también, y una petición no espera nunca al servidor SMTP.
+# El comando send_notifications vacía la bandeja por lotes: reserva las filas
+# pendientes (un plazo durante el que ningún otro worker las toma), las agrupa
+# en un resumen por destinatario (todas las postulaciones nuevas de una empresa
+# en un solo correo) y envía los resúmenes por una única conexión, que se abre
+# cuando ya hay algo que enviar. Un envío fallido (o una conexión que no se
+# puede abrir: el lote entero) se reintenta con espera exponencial y tras
+# MAX_ATTEMPTS queda como fallido. Si el worker muere a medias, las filas reservadas vuelven a la cola
+# al vencer el plazo: un aviso puede llegar dos veces, pero no perderse.
+
+BATCH_SIZE = 200
+MAX_ATTEMPTS = 6
+RETRY_DELAY = timedelta(minutes=1)
+MAX_RETRY_DELAY = timedelta(hours=6)
+LEASE = timedelta(minutes=5)
+
+
+# Escritura (dentro de la transacción del cambio)
+
+def application_created(application, using='default'):
+    Notification.objects.using(using).create(
+        kind=Notification.APPLICATION_CREATED, application_id=application.pk, new_status=application.status,
+    )
+
+
+def status_changed(application, old_status, using='default'):
+    Notification.objects.using(using).create(
+        kind=Notification.STATUS_CHANGED, application_id=application.pk,
+        old_status=old_status, new_status=application.status,
+    )
+
+
+def statuses_changed(changes, status, using='default'):
+    # Cambio masivo (core/triage.py): changes es [(id de la postulación, estado anterior)]
+    Notification.objects.using(using).bulk_create([
+        Notification(kind=Notification.STATUS_CHANGED, application_id=pk, old_status=old, new_status=status)
+        for pk, old in changes
+    ])
+
+
+# Envío
+
+def retry_delay(attempts):
+    return min(RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+
+
+def claim(batch_size=BATCH_SIZE, now=None, using='default'):
+    # Reserva hasta batch_size avisos pendientes y los devuelve con sus
+    # postulaciones, empresas y candidatos
+    now = now or timezone.now()
+    with transaction.atomic(using=using):
+        ids = list(
+            Notification.objects.using(using).select_for_update(skip_locked=True)
+            .filter(state=Notification.PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id').values_list('pk', flat=True)[:batch_size]
+        )
+        Notification.objects.using(using).filter(pk__in=ids).update(next_attempt_at=now + LEASE)
+    return list(
+        Notification.objects.using(using).filter(pk__in=ids)
+        .select_related(
+            'application__job_offer__company__user', 'application__candidate__user',
+        )
+    )
+
+
+def recipient(notification):
+    # Usuario al que va el aviso, o None si la postulación ya no existe
+    application = notification.application
+    if application is None:
+        return None
+    if notification.kind == Notification.APPLICATION_CREATED:
+        return application.job_offer.company.user
+    return application.candidate.user
+
+
+def digests(notifications):
+    # {usuario: [avisos]} en el orden en que se produjeron, y los que no tienen
+    # a quién enviarse
+    grouped = {}
+    discarded = []
+    for notification in notifications:
+        user = recipient(notification)
+        if user is None or not user.email:
+            discarded.append(notification)
+        else:
+            grouped.setdefault(user, []).append(notification)
+    return grouped, discarded
+
+
+def build_message(user, notifications):
+    statuses = dict(Application.STATUS_CHOICES)
+    created = [n for n in notifications if n.kind == Notification.APPLICATION_CREATED]
+    changed = [n for n in notifications if n.kind == Notification.STATUS_CHANGED]
+    by_offer = {}
+    for notification in created:
+        by_offer.setdefault(notification.application.job_offer, []).append(notification.application)
+    context = {
+        'user': user,
+        'new_applications': list(by_offer.items()),
+        'new_count': len(created),
+        'status_changes': [
+            (n.application, statuses.get(n.old_status, n.old_status), statuses.get(n.new_status, n.new_status))
+            for n in changed
+        ],
+    }
+    if created and not changed:
+        subject = f'{len(created)} postulaciones nuevas' if len(created) > 1 else 'Nueva postulación'
+    elif changed and not created:
+        subject = 'Novedades en tus postulaciones'
+    else:
+        subject = 'Novedades en JobFinder'
+    return EmailMessage(
+        subject=f'[JobFinder] {subject}',
+        body=render_to_string('core/emails/digest.txt', context),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[user.email],
+    )
+
+
+def _mark_sent(notifications, now, using):
+    Notification.objects.using(using).filter(pk__in=[n.pk for n in notifications]).update(
+        state=Notification.SENT, sent_at=now, last_error='',
+    )
+
+
+def _mark_failed(notifications, error, now, using):
+    for notification in notifications:
+        notification.attempts += 1
+        notification.last_error = error
+        if notification.attempts >= MAX_ATTEMPTS:
+            notification.state = Notification.FAILED
+        else:
+            notification.next_attempt_at = now + retry_delay(notification.attempts)
+    Notification.objects.using(using).bulk_update(
+        notifications, ['attempts', 'last_error', 'state', 'next_attempt_at'],
+    )
+
+
+def drain(batch_size=BATCH_SIZE, now=None, connection=None, using='default'):
+    # Envía todo lo pendiente; devuelve un Counter con los correos enviados
+    # (emails) y los avisos enviados, reintentados, fallidos y descartados
+    now = now or timezone.now()
+    result = Counter()
+    connection = connection or get_connection()
+
+    def failed(pending, exc):
+        _mark_failed(pending, f'{type(exc).__name__}: {exc}', now, using)
+        count = sum(n.state == Notification.FAILED for n in pending)
+        result['failed'] += count
+        result['retried'] += len(pending) - count
+
+    # Una sola conexión (SMTP) para todos los resúmenes
+    opened = False
+    try:
+        while True:
+            notifications = claim(batch_size, now, using)
+            if not notifications:
+                break
+            grouped, discarded = digests(notifications)
+            if discarded:
+                Notification.objects.using(using).filter(pk__in=[n.pk for n in discarded]).update(
+                    state=Notification.DISCARDED,
+                )
+                result['discarded'] += len(discarded)
+            if grouped and not opened:
+                try:
+                    connection.open()
+                except Exception as exc:
+                    # Sin servidor no se envía nada más: el lote espera su reintento
+                    failed([n for pending in grouped.values() for n in pending], exc)
+                    break
+                opened = True
+            for user, pending in grouped.items():
+                try:
+                    connection.send_messages([build_message(user, pending)])
+                except Exception as exc:
+                    failed(pending, exc)
+                else:
+                    _mark_sent(pending, now, using)
+                    result['emails'] += 1
+                    result['sent'] += len(pending)
+    finally:
+        if opened:
+            connection.close()
+    return result
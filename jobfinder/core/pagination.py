@@ -0,0 +1,195 @@
+import hashlib
+
+from django.core import signing
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db.models import Q
+
+# Paginación por clave (keyset): cada página se pide con un cursor que guarda
+# los valores de ordenación de la última fila vista, así una página profunda
+# cuesta lo mismo que la primera (WHERE + ORDER BY + LIMIT sobre un índice).
+
+CURSOR_PARAM = 'cursor'
+CURSOR_SALT = 'core.pagination'
+COUNT_TIMEOUT = 60
+
+
+def encode_cursor(values, direction):
+    return signing.dumps([direction, values], salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(token):
+    try:
+        direction, values = signing.loads(token, salt=CURSOR_SALT)
+    except (signing.BadSignature, TypeError, ValueError):
+        return None, None
+    if direction not in ('next', 'prev') or not isinstance(values, list):
+        return None, None
+    return direction, values
+
+
+def _serialize(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def _after(ordering, values):
+    # Filtro "después de la fila con estos valores" para un orden de varias columnas:
+    # (a > x) OR (a = x AND b > y) OR ...
+    condition = Q()
+    for position, field in enumerate(ordering):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        clause = Q(**{f'{name}__{lookup}': values[position]})
+        for previous_field, previous_value in zip(ordering[:position], values):
+            clause &= Q(**{previous_field.lstrip('-'): previous_value})
+        condition |= clause
+    return condition
+
+
+def _reverse(ordering):
+    return [field[1:] if field.startswith('-') else f'-{field}' for field in ordering]
+
+
+def _count_key(queryset):
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return None
+    digest = hashlib.md5(f'{sql}|{params}'.encode(), usedforsecurity=False).hexdigest()
+    return f'core:count:{queryset.db}:{digest}'
+
+
+def approximate_count(queryset, timeout=COUNT_TIMEOUT):
+    # COUNT cacheado durante unos segundos por consulta: puede ir algo
+    # retrasado respecto a la base de datos, pero se calcula una sola vez.
+    key = _count_key(queryset)
+    if key is None:
+        return 0
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, timeout)
+    return count
+
+
+async def aapproximate_count(queryset, timeout=COUNT_TIMEOUT):
+    key = _count_key(queryset)
+    if key is None:
+        return 0
+    count = await cache.aget(key)
+    if count is None:
+        count = await queryset.acount()
+        await cache.aset(key, count, timeout)
+    return count
+
+
+class KeysetPage:
+    def __init__(self, object_list, params, has_next, has_previous, next_values, previous_values, count=None):
+        self.object_list = object_list
+        self.has_next_page = has_next
+        self.has_previous_page = has_previous
+        self.count = count
+        self._params = params
+        self._next_values = next_values
+        self._previous_values = previous_values
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.has_next_page
+
+    def has_previous(self):
+        return self.has_previous_page
+
+    def has_other_pages(self):
+        return self.has_next_page or self.has_previous_page
+
+    def _query(self, direction, values):
+        params = self._params.copy()
+        params[CURSOR_PARAM] = encode_cursor(values, direction)
+        return params.urlencode()
+
+    @property
+    def next_query(self):
+        if self.has_next_page:
+            return self._query('next', self._next_values)
+        return ''
+
+    @property
+    def previous_query(self):
+        if self.has_previous_page:
+            return self._query('prev', self._previous_values)
+        return ''
+
+
+def _page_queryset(request, queryset, ordering, per_page):
+    direction, values = decode_cursor(request.GET.get(CURSOR_PARAM, ''))
+    if values is not None and len(values) != len(ordering):
+        direction, values = None, None
+
+    if direction == 'prev':
+        page_queryset = queryset.filter(_after(_reverse(ordering), values)).order_by(*_reverse(ordering))
+    elif direction == 'next':
+        page_queryset = queryset.filter(_after(ordering, values)).order_by(*ordering)
+    else:
+        page_queryset = queryset.order_by(*ordering)
+    return direction, page_queryset[:per_page + 1]
+
+
+def _build_page(request, rows, ordering, per_page, direction, count):
+    names = [field.lstrip('-') for field in ordering]
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    if direction == 'prev':
+        rows.reverse()
+        has_next, has_previous = True, has_more
+    else:
+        has_next, has_previous = has_more, direction == 'next'
+
+    def key(row):
+        return [_serialize(getattr(row, name)) for name in names]
+
+    params = request.GET.copy()
+    params.pop(CURSOR_PARAM, None)
+    return KeysetPage(
+        rows,
+        params,
+        has_next=has_next,
+        has_previous=has_previous,
+        next_values=key(rows[-1]) if rows else None,
+        previous_values=key(rows[0]) if rows else None,
+        count=count,
+    )
+
+
+def paginate(request, queryset, ordering, per_page=20, with_count=False, count=None):
+    # count: total ya conocido (p. ej. por core/facets.py), sin consultarlo
+    ordering = list(ordering)
+    direction, page_queryset = _page_queryset(request, queryset, ordering, per_page)
+    if with_count and count is None:
+        count = approximate_count(queryset)
+    rows = list(page_queryset)
+    return _build_page(request, rows, ordering, per_page, direction, count)
+
+
+async def apaginate(request, queryset, ordering, per_page=20, with_count=False, count=None):
+    # Versión asíncrona de paginate()
+    ordering = list(ordering)
+    direction, page_queryset = _page_queryset(request, queryset, ordering, per_page)
+    if with_count and count is None:
+        count = await aapproximate_count(queryset)
+    rows = [row async for row in page_queryset]
+    return _build_page(request, rows, ordering, per_page, direction, count)
@@ -0,0 +1,136 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import User
+from django.db.models import F
+from django.utils.functional import SimpleLazyObject
+
+from .models import Candidate, Company
+
+# Perfil (empresa o candidato) del usuario de cada petición.
+# ProfileMiddleware deja en request.profile un objeto perezoso con el rol y el
+# id del perfil. Cada petición autenticada ya carga la fila del usuario de la
+# sesión; ProfileBackend la carga con los ids de su empresa y de su candidato
+# en la misma consulta (LEFT JOIN), así que el rol no cuesta consultas y
+# siempre está al día, en todos los procesos, aunque se cree o se borre el
+# perfil con la sesión abierta. Solo se carga la fila de Company o Candidate
+# si la vista o la plantilla la usa.
+
+ANONYMOUS = 'anonymous'
+USER = 'user'
+COMPANY = 'company'
+CANDIDATE = 'candidate'
+
+
+class Profile:
+    def __init__(self, user, role, profile_id=None):
+        self.user = user
+        self.role = role
+        self.profile_id = profile_id
+        self._instance = None
+
+    @property
+    def is_company(self):
+        return self.role == COMPANY
+
+    @property
+    def is_candidate(self):
+        return self.role == CANDIDATE
+
+    @property
+    def company_id(self):
+        return self.profile_id if self.is_company else None
+
+    @property
+    def candidate_id(self):
+        return self.profile_id if self.is_candidate else None
+
+    @property
+    def company(self):
+        return self._load(Company) if self.is_company else None
+
+    @property
+    def candidate(self):
+        return self._load(Candidate) if self.is_candidate else None
+
+    def _load(self, model):
+        if self._instance is None:
+            self._instance = model.objects.get(pk=self.profile_id)
+            # También queda como request.user.company / .candidate, sin otra consulta
+            self._instance.user = self.user
+        return self._instance
+
+    def role_for(self, offer=None):
+        # Rol para la caché de fragmentos: 'owner' si la oferta es de la empresa
+        if offer is not None and self.is_company and offer.company_id == self.profile_id:
+            return 'owner'
+        return self.role
+
+    def __bool__(self):
+        return self.role in (COMPANY, CANDIDATE)
+
+    def __repr__(self):
+        return f'<Profile {self.role} {self.profile_id}>'
+
+
+def with_profile_ids(queryset):
+    return queryset.annotate(profile_company_id=F('company'), profile_candidate_id=F('candidate'))
+
+
+def resolve(user):
+    # (rol, id del perfil); sin consultas si el usuario viene de ProfileBackend
+    if not user.is_authenticated:
+        return ANONYMOUS, None
+    if hasattr(user, 'profile_company_id'):
+        company_id, candidate_id = user.profile_company_id, user.profile_candidate_id
+    else:
+        company_id, candidate_id = User.objects.filter(pk=user.pk).values_list('company', 'candidate').get()
+    if company_id is not None:
+        return COMPANY, company_id
+    if candidate_id is not None:
+        return CANDIDATE, candidate_id
+    return USER, None
+
+
+def get_profile(request):
+    user = request.user
+    return Profile(user, *resolve(user))
+
+
+class ProfileBackend(ModelBackend):
+    # El usuario de la sesión, con los ids de sus perfiles
+    def get_user(self, user_id):
+        try:
+            user = with_profile_ids(User._default_manager).get(pk=user_id)
+        except User.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        try:
+            user = await with_profile_ids(User._default_manager).aget(pk=user_id)
+        except User.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
+
+
+class ProfileMiddleware:
+    # Va después de AuthenticationMiddleware
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        request.profile = SimpleLazyObject(lambda: get_profile(request))
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        # Se evalúa desde código síncrono (sync_to_async o las plantillas)
+        request.profile = SimpleLazyObject(lambda: get_profile(request))
+        return await self.get_response(request)
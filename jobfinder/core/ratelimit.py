@@ -0,0 +1,192 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+from collections import namedtuple
+from functools import lru_cache, wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+# Límite de peticiones para login, registro y postulación.
+# Cada vista decorada con @ratelimit('login', ip='20/m', username='5/m') tiene
+# un cubo de fichas por IP y otro por nombre de usuario (o por usuario
+# autenticado): cada POST gasta una ficha de cada cubo y las fichas se reponen
+# a ritmo constante hasta el máximo. Sin fichas la petición se rechaza con un
+# 429 y Retry-After antes de entrar en la vista: sin calcular el hash de la
+# contraseña, crear usuarios ni tocar la base de datos. Se comprueba primero la
+# IP, que no necesita ni leer el formulario.
+# Los cubos están en la caché (RATELIMIT_CACHE) para compartirlos entre
+# procesos. La caché solo ofrece un incremento atómico, así que ahí el cubo es
+# una ventana deslizante: un contador por periodo, y se estima lo gastado en el
+# último periodo con el contador actual y la parte que queda del anterior;
+# incr() primero y comprobar después evita que dos peticiones a la vez se
+# lleven la misma ficha. Si no hay caché o falla, el cubo de fichas exacto se
+# guarda en memoria del proceso. RATELIMITS en settings sustituye los límites
+# de una vista ({'login': {'ip': '20/m', 'username': '5/m'}}; None lo quita).
+
+KEY_PREFIX = 'core:ratelimit'
+UNITS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+# Cubos en memoria a partir de los cuales se descartan los que ya están llenos
+MAX_BUCKETS = 10000
+
+Rate = namedtuple('Rate', ['tokens', 'period'])
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    # '5/m' -> Rate(5, 60); también con varias unidades: '10/15m'
+    tokens, _, per = rate.partition('/')
+    return Rate(int(tokens), int(per[:-1] or 1) * UNITS[per[-1]])
+
+
+# Claves de los cubos: None si no aplica a la petición
+
+def client_ip(request):
+    return request.META.get('REMOTE_ADDR') or None
+
+
+def posted_username(request):
+    if request.method != 'POST':
+        return None
+    return request.POST.get('username', '').strip().lower() or None
+
+
+def user_id(request):
+    user = request.user
+    return str(user.pk) if user.is_authenticated else None
+
+
+KEYS = {
+    'ip': client_ip,
+    'username': posted_username,
+    'user': user_id,
+}
+
+
+def bucket_key(scope, kind, value):
+    digest = hashlib.md5(value.encode()).hexdigest()
+    return f'{KEY_PREFIX}:{scope}:{kind}:{digest}'
+
+
+class MemoryBuckets:
+    # Cubos de fichas en el proceso: {clave: (fichas, actualizado, lleno en)}
+    def __init__(self, max_buckets=MAX_BUCKETS):
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self.max_buckets = max_buckets
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def take(self, key, rate, now=None):
+        # (permitida, segundos hasta que haya una ficha)
+        now = time.monotonic() if now is None else now
+        refill = rate.tokens / rate.period
+        with self._lock:
+            tokens, updated, _ = self._buckets.get(key, (rate.tokens, now, now))
+            tokens = min(rate.tokens, tokens + (now - updated) * refill)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            if key not in self._buckets and len(self._buckets) >= self.max_buckets:
+                self._prune(now)
+            self._buckets[key] = (tokens, now, now + (rate.tokens - tokens) / refill)
+        return allowed, 0 if allowed else (1 - tokens) / refill
+
+    def _prune(self, now):
+        # Un cubo lleno es igual que uno que no existe
+        for key in [key for key, (_, _, full_at) in self._buckets.items() if full_at <= now]:
+            del self._buckets[key]
+        # Si siguen sin caber, fuera la mitad más antigua
+        if len(self._buckets) >= self.max_buckets:
+            for key in list(self._buckets)[:len(self._buckets) // 2]:
+                del self._buckets[key]
+
+
+class CacheBuckets:
+    # Ventana deslizante sobre los contadores atómicos de la caché
+    def __init__(self, alias):
+        self.alias = alias
+
+    def take(self, key, rate, now=None):
+        now = time.time() if now is None else now
+        cache = caches[self.alias]
+        window, elapsed = divmod(now / rate.period, 1)
+        current_key = f'{key}:{int(window)}'
+        cache.add(current_key, 0, rate.period * 2)
+        # ValueError si la clave ya no está (expulsada, o DummyCache)
+        current = cache.incr(current_key)
+        previous = cache.get(f'{key}:{int(window) - 1}', 0)
+        if previous * (1 - elapsed) + current <= rate.tokens:
+            return True, 0
+        if current > rate.tokens:
+            # Hasta el periodo siguiente, y lo que tarde en pesar menos este
+            wait = (1 - elapsed) + 1 - rate.tokens / current
+        else:
+            wait = (1 - elapsed) - (rate.tokens - current) / previous
+        return False, max(wait, 0) * rate.period
+
+
+class RateLimiter:
+    def __init__(self):
+        self.memory = MemoryBuckets()
+        self._warned = False
+
+    def take(self, key, rate):
+        alias = getattr(settings, 'RATELIMIT_CACHE', 'default')
+        if alias:
+            try:
+                return CacheBuckets(alias).take(key, rate)
+            except Exception:
+                if not self._warned:
+                    self._warned = True
+                    logger.warning('Caché %r sin incremento atómico: límites en memoria del proceso', alias, exc_info=True)
+        return self.memory.take(key, rate)
+
+
+limiter = RateLimiter()
+
+
+def too_many_requests(retry_after):
+    seconds = max(1, math.ceil(retry_after))
+    response = HttpResponse(
+        f'Demasiados intentos. Vuelve a intentarlo en {seconds} segundos.',
+        status=429, content_type='text/plain; charset=utf-8',
+    )
+    response.headers['Retry-After'] = str(seconds)
+    return response
+
+
+def check(request, scope, limits):
+    # Respuesta 429 si algún cubo de la petición se ha quedado sin fichas
+    limits = getattr(settings, 'RATELIMITS', {}).get(scope, limits)
+    for kind, rate in limits.items():
+        if not rate:
+            continue
+        value = KEYS[kind](request)
+        if value is None:
+            continue
+        allowed, retry_after = limiter.take(bucket_key(scope, kind, value), parse_rate(rate))
+        if not allowed:
+            return too_many_requests(retry_after)
+    return None
+
+
+def ratelimit(scope, methods=('POST',), **limits):
+    # limits: {'ip' | 'username' | 'user': 'fichas/periodo'}, en este orden
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method in methods:
+                response = check(request, scope, limits)
+                if response is not None:
+                    return response
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,260 @@
+import hashlib
+import mimetypes
+import os
+import re
+import tempfile
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header
+
+from .models import ResumeBlob
+
+# Almacén de CVs direccionado por contenido.
+# Cada fichero se guarda una sola vez en RESUME_STORE_ROOT/ab/cd/<sha256>, con
+# una fila ResumeBlob que cuenta cuántos candidatos y postulaciones lo usan.
+# Las subidas se escriben en disco por trozos a medida que llegan mientras se
+# calcula el hash (ResumeUploadHandler), así que nunca se cargan enteras en
+# memoria; si el contenido ya existía, el fichero temporal se descarta.
+# Las descargas admiten If-None-Match (el ETag es el hash) y Range, o se
+# delegan en el servidor web con X-Sendfile / X-Accel-Redirect.
+
+CHUNK_SIZE = 64 * 1024
+FIELD_NAME = 'resume'
+ALLOWED_EXTENSIONS = ('.pdf', '.doc', '.docx', '.odt', '.rtf', '.txt')
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def relative_path(digest):
+    return f'{digest[:2]}/{digest[2:4]}/{digest}'
+
+
+def blob_path(digest):
+    return os.path.join(settings.RESUME_STORE_ROOT, relative_path(digest))
+
+
+def content_type_for(name):
+    return mimetypes.guess_type(name or '')[0] or 'application/octet-stream'
+
+
+class HashingWriter:
+    # Fichero temporal dentro del almacén que calcula el SHA-256 de lo escrito
+    def __init__(self):
+        directory = os.path.join(settings.RESUME_STORE_ROOT, 'tmp')
+        os.makedirs(directory, exist_ok=True)
+        self.file = tempfile.NamedTemporaryFile(dir=directory, delete=False)
+        self.path = self.file.name
+        self.hash = hashlib.sha256()
+        self.size = 0
+
+    def write(self, chunk):
+        self.size += len(chunk)
+        # Más allá del límite solo se cuenta: el formulario rechazará el fichero
+        if self.size <= settings.RESUME_MAX_SIZE:
+            self.hash.update(chunk)
+            self.file.write(chunk)
+
+    def hexdigest(self):
+        return self.hash.hexdigest()
+
+    def discard(self):
+        self.file.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class HashedUploadedFile(UploadedFile):
+    def __init__(self, writer, name, content_type, charset, content_type_extra=None):
+        writer.file.flush()
+        writer.file.seek(0)
+        super().__init__(writer.file, name, content_type, writer.size, charset, content_type_extra)
+        self.writer = writer
+
+    def temporary_file_path(self):
+        return self.writer.path
+
+    def close(self):
+        # Si no llegó a guardarse en el almacén, no dejar el temporal en disco
+        try:
+            return super().close()
+        finally:
+            self.writer.discard()
+
+
+class ResumeUploadHandler(FileUploadHandler):
+    # Escribe el campo `resume` directamente en el almacén; el resto de campos
+    # siguen por los manejadores por defecto
+    chunk_size = CHUNK_SIZE
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.writer = HashingWriter() if field_name == FIELD_NAME else None
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.writer is None:
+            return raw_data
+        self.writer.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if self.writer is None:
+            return None
+        return HashedUploadedFile(
+            self.writer, self.file_name, self.content_type, self.charset, self.content_type_extra
+        )
+
+    def upload_interrupted(self):
+        if getattr(self, 'writer', None) is not None:
+            self.writer.discard()
+
+
+def store(uploaded):
+    # Guarda el fichero (si su contenido no estaba ya) y devuelve su ResumeBlob
+    # con una referencia más, que pertenece a quien llama.
+    writer = getattr(uploaded, 'writer', None)
+    if writer is None:
+        writer = HashingWriter()
+        for chunk in uploaded.chunks(CHUNK_SIZE):
+            writer.write(chunk)
+    writer.file.close()
+    digest = writer.hexdigest()
+    try:
+        path = blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(writer.path, path)
+        defaults = {'size': writer.size, 'content_type': content_type_for(uploaded.name)}
+        try:
+            with transaction.atomic():
+                blob, _ = ResumeBlob.objects.get_or_create(sha256=digest, defaults=defaults)
+        except IntegrityError:
+            # Otra petición acaba de guardar el mismo contenido
+            blob = ResumeBlob.objects.get(sha256=digest)
+        acquire(blob.pk)
+        return blob
+    finally:
+        writer.discard()
+
+
+def attach(application, uploaded=None):
+    # El CV subido pasa a ser el de la postulación y el actual del candidato;
+    # sin subida, la postulación usa el CV actual del candidato (si tiene).
+    candidate = application.candidate
+    if uploaded:
+        blob = store(uploaded)
+        if candidate.resume_id != blob.pk:
+            previous = candidate.resume_id
+            acquire(blob.pk)
+            candidate.resume = blob
+            candidate.save(update_fields=['resume'])
+            if previous:
+                release(previous)
+        application.resume = blob
+    elif candidate.resume_id:
+        acquire(candidate.resume_id)
+        application.resume_id = candidate.resume_id
+
+
+def acquire(blob_id):
+    ResumeBlob.objects.filter(pk=blob_id).update(ref_count=F('ref_count') + 1)
+
+
+def release(blob_id, using='default'):
+    ResumeBlob.objects.using(using).filter(pk=blob_id).update(ref_count=F('ref_count') - 1)
+    orphan = ResumeBlob.objects.using(using).filter(pk=blob_id, ref_count__lte=0).first()
+    if orphan is not None:
+        orphan.delete()
+        transaction.on_commit(lambda: _remove_file(orphan.sha256, using), using=using)
+
+
+def _remove_file(digest, using):
+    # Puede que otra subida haya vuelto a guardar el mismo contenido mientras tanto
+    if not ResumeBlob.objects.using(using).filter(sha256=digest).exists():
+        try:
+            os.remove(blob_path(digest))
+        except FileNotFoundError:
+            pass
+
+
+def parse_range(header, size):
+    # (inicio, fin) inclusivos de un único rango de bytes; None si no hay que
+    # aplicarlo (sin cabecera, varios rangos o formato desconocido) y
+    # ValueError si el rango no se puede satisfacer.
+    match = _RANGE_RE.match(header or '')
+    if match is None:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        length = int(end)
+        if length == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def _read(path, start, end):
+    with open(path, 'rb') as source:
+        source.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = source.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def serve(request, blob, filename):
+    etag = f'"{blob.sha256}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = _content_response(request, blob, etag, filename)
+    response.headers['ETag'] = etag
+    response.headers['Accept-Ranges'] = 'bytes'
+    patch_cache_control(response, private=True, max_age=3600)
+    return response
+
+
+def _content_response(request, blob, etag, filename):
+    disposition = content_disposition_header(True, filename)
+    mode = settings.RESUME_SENDFILE
+    if mode:
+        # El servidor web envía el fichero (y atiende Range por su cuenta)
+        response = HttpResponse(content_type=blob.content_type)
+        if mode == 'x-accel-redirect':
+            response.headers['X-Accel-Redirect'] = settings.RESUME_ACCEL_PREFIX + relative_path(blob.sha256)
+        else:
+            response.headers['X-Sendfile'] = blob_path(blob.sha256)
+        response.headers['Content-Disposition'] = disposition
+        return response
+
+    path = blob_path(blob.sha256)
+    if_range = request.headers.get('If-Range')
+    try:
+        byte_range = None if if_range and if_range != etag else parse_range(request.headers.get('Range'), blob.size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response.headers['Content-Range'] = f'bytes */{blob.size}'
+        return response
+
+    if byte_range is None:
+        response = FileResponse(open(path, 'rb'), content_type=blob.content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(_read(path, start, end), status=206, content_type=blob.content_type)
+        response.headers['Content-Range'] = f'bytes {start}-{end}/{blob.size}'
+        response.headers['Content-Length'] = str(end - start + 1)
+    response.headers['Content-Disposition'] = disposition
+    return response
@@ -0,0 +1,227 @@
+import re
+import unicodedata
+
+from django.db import connections
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.utils import timezone
+
+# Índice de texto completo para JobOffer.
+# En SQLite se usa una tabla virtual FTS5 y en PostgreSQL una tabla con un
+# tsvector y un índice GIN. Los textos se normalizan (sin acentos) y se
+# reducen a su raíz en Python, así ambos motores indexan los mismos términos.
+
+FTS_TABLE = 'core_joboffer_fts'
+
+# Número máximo de resultados que devuelve el motor, ordenados por relevancia.
+# Los ids van a la consulta de la página como IN (...) y CASE: si hay más, el
+# listado avisa de que solo muestra los más relevantes. El índice también
+# guarda las ofertas desactivadas y vencidas, así que la consulta del motor
+# descarta esas antes del LIMIT: si no, podrían ocupar el cupo.
+MAX_RESULTS = 500
+
+_TOKEN_RE = re.compile(r'\w+')
+
+# Sufijos del español ordenados de más largo a más corto
+_SUFFIXES = (
+    'amientos', 'imientos', 'aciones', 'uciones', 'amiento', 'imiento',
+    'adoras', 'adores', 'ancias', 'logias', 'mente', 'acion', 'ucion',
+    'adora', 'ador', 'ancia', 'logia', 'idad', 'ista', 'able', 'ible',
+    'ivas', 'ivos', 'iva', 'ivo', 'osas', 'osos', 'osa', 'oso',
+    'es', 'os', 'as', 's', 'o', 'a', 'e',
+)
+
+_available = {}
+
+
+def normalize(text):
+    text = text or ''
+    if text.isascii():
+        return text.lower()
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return text.lower()
+
+
+def stem(word):
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text):
+    return [stem(token) for token in _TOKEN_RE.findall(normalize(text))]
+
+
+def _document(offer, company_name=None):
+    if company_name is None:
+        company_name = offer.company.name
+    return (
+        ' '.join(tokenize(offer.title)),
+        ' '.join(tokenize(offer.description)),
+        ' '.join(tokenize(company_name)),
+    )
+
+
+def is_available(using='default'):
+    if using not in _available:
+        connection = connections[using]
+        _available[using] = (
+            connection.vendor in ('sqlite', 'postgresql')
+            and FTS_TABLE in connection.introspection.table_names()
+        )
+    return _available[using]
+
+
+def create_index(connection):
+    # Devuelve False si el motor no soporta búsqueda de texto completo
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+                f"USING fts5(title, body, company, tokenize='unicode61')"
+            )
+        elif connection.vendor == 'postgresql':
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS {FTS_TABLE} ('
+                f'offer_id bigint PRIMARY KEY REFERENCES core_joboffer (id) '
+                f'ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, '
+                f'document tsvector NOT NULL)'
+            )
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {FTS_TABLE}_document_idx '
+                f'ON {FTS_TABLE} USING GIN (document)'
+            )
+        else:
+            return False
+    _available.pop(connection.alias, None)
+    return True
+
+
+def drop_index(connection):
+    if connection.vendor in ('sqlite', 'postgresql'):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+    _available.pop(connection.alias, None)
+
+
+def _write(cursor, vendor, pk, document):
+    title, body, company = document
+    if vendor == 'sqlite':
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [pk])
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, body, company) VALUES (%s, %s, %s, %s)',
+            [pk, title, body, company],
+        )
+    else:
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (offer_id, document) VALUES (%s, "
+            f"setweight(to_tsvector('simple', %s), 'A') || "
+            f"setweight(to_tsvector('simple', %s), 'C') || "
+            f"setweight(to_tsvector('simple', %s), 'B')) "
+            f"ON CONFLICT (offer_id) DO UPDATE SET document = EXCLUDED.document",
+            [pk, title, body, company],
+        )
+
+
+def index_offer(offer, using='default'):
+    if not is_available(using):
+        return
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        _write(cursor, connection.vendor, offer.pk, _document(offer))
+
+
+def index_offers(offers, using='default'):
+    # Indexa en bloque; útil tras un bulk_create, que no emite señales
+    if not is_available(using):
+        return 0
+    connection = connections[using]
+    count = 0
+    with connection.cursor() as cursor:
+        for pk, title, description, company_name in offers.values_list(
+            'pk', 'title', 'description', 'company__name'
+        ).iterator(chunk_size=2000):
+            document = (
+                ' '.join(tokenize(title)),
+                ' '.join(tokenize(description)),
+                ' '.join(tokenize(company_name)),
+            )
+            _write(cursor, connection.vendor, pk, document)
+            count += 1
+    return count
+
+
+def remove_offer(pk, using='default'):
+    if not is_available(using):
+        return
+    connection = connections[using]
+    column = 'rowid' if connection.vendor == 'sqlite' else 'offer_id'
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE {column} = %s', [pk])
+
+
+def rebuild_index(offers, using='default'):
+    if not is_available(using):
+        return 0
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+    return index_offers(offers, using=using)
+
+
+def search_offer_ids(query, limit=MAX_RESULTS, using='default'):
+    # Devuelve los ids de las ofertas abiertas (activas y en plazo) que
+    # coinciden, del más relevante al menos relevante, o None si el índice no
+    # está disponible en esta base de datos.
+    if not is_available(using):
+        return None
+    terms = tokenize(query)
+    if not terms:
+        return []
+    connection = connections[using]
+    offers = connection.ops.quote_name('core_joboffer')
+    open_params = [True, connection.ops.adapt_datefield_value(timezone.now().date())]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            # El último término se busca como prefijo (búsqueda mientras se escribe)
+            match = ' '.join(f'"{term}"' for term in terms[:-1])
+            match = f'{match} "{terms[-1]}"*'.strip()
+            cursor.execute(
+                f'SELECT {FTS_TABLE}.rowid FROM {FTS_TABLE} '
+                f'JOIN {offers} ON {offers}.id = {FTS_TABLE}.rowid '
+                f'WHERE {FTS_TABLE} MATCH %s AND {offers}.is_active = %s AND {offers}.deadline >= %s '
+                f'ORDER BY bm25({FTS_TABLE}, 10.0, 1.0, 5.0) LIMIT %s',
+                [match, *open_params, limit],
+            )
+        else:
+            tsquery = ' & '.join(terms[:-1] + [f'{terms[-1]}:*'])
+            cursor.execute(
+                f"SELECT offer_id FROM {FTS_TABLE} JOIN {offers} ON {offers}.id = offer_id, "
+                f"to_tsquery('simple', %s) query "
+                f"WHERE document @@ query AND {offers}.is_active = %s AND {offers}.deadline >= %s "
+                f"ORDER BY ts_rank(document, query) DESC LIMIT %s",
+                [tsquery, *open_params, limit],
+            )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search_offers(offers, query):
+    # (ofertas, truncated): anota la posición de cada oferta en el ranking como
+    # `search_rank`; truncated indica que había más de MAX_RESULTS coincidencias
+    ids = search_offer_ids(query, limit=MAX_RESULTS + 1, using=offers.db)
+    if ids is None:
+        return offers.filter(
+            Q(title__icontains=query) |
+            Q(description__icontains=query) |
+            Q(company__name__icontains=query)
+        ).annotate(search_rank=Value(0, output_field=IntegerField())), False
+    if not ids:
+        # Con la anotación, para que se pueda ordenar igual por search_rank
+        return offers.annotate(search_rank=Value(0, output_field=IntegerField())).none(), False
+    truncated = len(ids) > MAX_RESULTS
+    ids = ids[:MAX_RESULTS]
+    ranking = Case(
+        *[When(pk=pk, then=position) for position, pk in enumerate(ids)],
+        output_field=IntegerField(),
+    )
+    return offers.filter(pk__in=ids).annotate(search_rank=ranking).order_by('search_rank'), truncated
@@ -0,0 +1,151 @@
+from django.core.signals import request_started
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from . import caching, company_stats, expiry, facets, matching, notifications, resumes, search, stats, suggest
+from .models import Application, Candidate, Company, JobOffer
+
+
+@receiver(post_init, sender=JobOffer)
+def remember_counted_category(sender, instance, **kwargs):
+    instance._counted_category = stats.snapshot(instance)
+
+
+@receiver(post_save, sender=JobOffer)
+def index_job_offer(sender, instance, raw=False, using='default', **kwargs):
+    if not raw:
+        search.index_offer(instance, using=using)
+        suggest.offer_saved(instance, using=using)
+        matching.offer_saved(instance, using=using)
+        facets.offer_saved(instance, using=using)
+
+
+@receiver(post_save, sender=JobOffer)
+def update_category_counts(sender, instance, created=False, using='default', **kwargs):
+    old = None if created else instance._counted_category
+    new = stats.snapshot(instance)
+    stats.offer_changed(old, new, using=using)
+    instance._counted_category = new
+
+
+@receiver(post_delete, sender=JobOffer)
+def unindex_job_offer(sender, instance, using='default', **kwargs):
+    search.remove_offer(instance.pk, using=using)
+    suggest.offer_deleted(instance.pk, using=using)
+    matching.offer_deleted(instance.pk, using=using)
+    facets.offer_deleted(instance.pk, using=using)
+
+
+@receiver(post_delete, sender=JobOffer)
+def discount_deleted_offer(sender, instance, using='default', **kwargs):
+    stats.offer_changed(instance._counted_category, None, using=using)
+
+
+@receiver(post_save, sender=Company)
+def reindex_company_offers(sender, instance, created=False, raw=False, using='default', **kwargs):
+    # El nombre de la empresa forma parte del documento indexado
+    if not created and not raw:
+        search.index_offers(JobOffer.objects.using(using).filter(company=instance), using=using)
+        suggest.invalidate(using=using)
+
+
+@receiver(post_save, sender=Candidate)
+def index_candidate_skills(sender, instance, raw=False, using='default', **kwargs):
+    if not raw:
+        matching.candidate_saved(instance, using=using)
+
+
+@receiver(post_delete, sender=Candidate)
+def unindex_candidate_skills(sender, instance, using='default', **kwargs):
+    matching.candidate_deleted(instance.pk, using=using)
+
+
+@receiver(post_save, sender=JobOffer)
+@receiver(post_delete, sender=JobOffer)
+def touch_offer_pages(sender, instance, using='default', **kwargs):
+    caching.touch(caching.LISTINGS, caching.offer_scope(instance.pk), using=using)
+
+
+@receiver(post_save, sender=Company)
+def touch_company_pages(sender, instance, created=False, using='default', **kwargs):
+    # El detalle de cada oferta ya depende de company.updated_at
+    if not created:
+        caching.touch(caching.LISTINGS, using=using)
+
+
+@receiver(post_save, sender=Application)
+@receiver(post_delete, sender=Application)
+def touch_applied_offer(sender, instance, using='default', **kwargs):
+    caching.touch(caching.offer_scope(instance.job_offer_id), using=using)
+
+
+@receiver(post_delete, sender=Application)
+@receiver(post_delete, sender=Candidate)
+def release_resume(sender, instance, using='default', **kwargs):
+    if instance.resume_id:
+        resumes.release(instance.resume_id, using=using)
+
+
+@receiver(post_init, sender=JobOffer)
+def remember_counted_active(sender, instance, **kwargs):
+    instance._counted_active = company_stats.offer_snapshot(instance)
+
+
+@receiver(post_init, sender=Application)
+def remember_counted_status(sender, instance, **kwargs):
+    instance._counted_status = company_stats.application_snapshot(instance)
+
+
+@receiver(post_save, sender=Company)
+def create_company_stats(sender, instance, created=False, raw=False, using='default', **kwargs):
+    if created and not raw:
+        company_stats.company_created(instance, using=using)
+
+
+@receiver(post_save, sender=JobOffer)
+def update_company_offer_stats(sender, instance, created=False, raw=False, using='default', **kwargs):
+    if not raw:
+        company_stats.offer_saved(instance, created, using=using)
+        instance._counted_active = company_stats.offer_snapshot(instance)
+
+
+@receiver(post_delete, sender=JobOffer)
+def discount_company_offer(sender, instance, using='default', **kwargs):
+    company_stats.offer_deleted(instance, using=using)
+
+
+@receiver(post_save, sender=Application)
+def update_company_application_stats(sender, instance, created=False, raw=False, using='default', **kwargs):
+    if not raw:
+        company_stats.application_saved(instance, created, using=using)
+        instance._counted_status = instance.status
+
+
+@receiver(post_delete, sender=Application)
+def discount_company_application(sender, instance, using='default', **kwargs):
+    company_stats.application_deleted(instance, using=using)
+
+
+@receiver(post_init, sender=Application)
+def remember_notified_status(sender, instance, **kwargs):
+    instance._notified_status = company_stats.application_snapshot(instance)
+
+
+@receiver(post_save, sender=Application)
+def enqueue_application_notification(sender, instance, created=False, raw=False, using='default', **kwargs):
+    # En la misma transacción que el cambio (ver core/notifications.py)
+    if raw:
+        return
+    old = instance._notified_status
+    if created:
+        notifications.application_created(instance, using=using)
+    # Si no se cargó el estado no se sabe si cambió: mejor no avisar
+    elif old is not company_stats.UNKNOWN and old != instance.status:
+        notifications.status_changed(instance, old, using=using)
+    instance._notified_status = instance.status
+
+
+@receiver(request_started)
+def check_expiry_sweep(sender, **kwargs):
+    # Síncrono también con ASGI: aquí sí se puede consultar ExpirySweep
+    expiry.check_sweep()
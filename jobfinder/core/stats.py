@@ -0,0 +1,78 @@
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .models import CategoryCount, JobOffer
+
+# Conteo de ofertas activas por categoría en la tabla CategoryCount.
+# Las señales suman o restan 1 a la fila de cada categoría con UPDATE ... SET
+# count = count ± 1 dentro de la misma transacción que la oferta, así todos
+# los procesos ven el mismo número sin recontar. Cada fila guarda el día de su
+# último recuento completo: el primer acceso del día recalcula los conteos y
+# descuenta las ofertas que han pasado su fecha límite, y las escrituras
+# masivas (que no emiten señales) ponen la fecha a None para que se recalcule.
+
+# Marca para instancias cargadas sin los campos necesarios (p. ej. con only())
+UNKNOWN = object()
+
+_CATEGORIES = [choice for choice, _ in JobOffer.CATEGORY_CHOICES]
+
+
+def counted_category(category, is_active, deadline):
+    # Categoría en la que cuenta la oferta, o None si no está activa
+    if deadline is not None and not hasattr(deadline, 'year'):
+        deadline = JobOffer._meta.get_field('deadline').to_python(deadline)
+    if is_active and deadline is not None and deadline >= timezone.now().date():
+        return category
+    return None
+
+
+def snapshot(offer):
+    values = offer.__dict__
+    if not {'category', 'is_active', 'deadline'} <= values.keys():
+        return UNKNOWN
+    return counted_category(values['category'], values['is_active'], values['deadline'])
+
+
+def reconcile_category_counts():
+    counts = dict.fromkeys(_CATEGORIES, 0)
+    rows = JobOffer.objects.active().values_list('category').annotate(count=Count('id')).order_by()
+    for category, count in rows:
+        if category in counts:
+            counts[category] = count
+    today = timezone.now().date()
+    CategoryCount.objects.bulk_create(
+        [CategoryCount(category=category, count=count, counted_on=today) for category, count in counts.items()],
+        update_conflicts=True, unique_fields=['category'], update_fields=['count', 'counted_on'],
+    )
+    return counts
+
+
+def category_counts():
+    # Lista con el mismo formato que values('category').annotate(count=...)
+    today = timezone.now().date()
+    rows = {row.category: row for row in CategoryCount.objects.all()}
+    if all(category in rows and rows[category].counted_on == today for category in _CATEGORIES):
+        counts = {category: rows[category].count for category in _CATEGORIES}
+    else:
+        counts = reconcile_category_counts()
+    return [
+        {'category': category, 'count': count}
+        for category, count in counts.items()
+        if count > 0
+    ]
+
+
+def invalidate_category_counts(using='default'):
+    CategoryCount.objects.using(using).update(counted_on=None)
+
+
+def offer_changed(old, new, using='default'):
+    # old/new: categoría en la que contaba la oferta antes y después del cambio
+    if old is UNKNOWN or new is UNKNOWN:
+        invalidate_category_counts(using=using)
+        return
+    if old == new:
+        return
+    for category, delta in ((old, -1), (new, 1)):
+        if category is not None:
+            CategoryCount.objects.using(using).filter(category=category).update(count=F('count') + delta)
@@ -0,0 +1,168 @@
+import heapq
+import re
+from bisect import bisect_left, insort
+
+from .indexes import SharedIndex
+from .models import JobOffer
+from .search import normalize
+
+# Índice en memoria para autocompletar la búsqueda de ofertas.
+# Guarda en una lista ordenada las claves normalizadas de títulos, empresas y
+# habilidades de las ofertas activas (una clave por cada palabra inicial, para
+# que "python" encuentre "Desarrollador Python") y responde con bisect sin
+# consultar la base de datos. Se recorren todas las claves del prefijo y se
+# eligen las más frecuentes con un montículo; para los prefijos cortos, los
+# que más claves recorren, el resultado se guarda hasta el siguiente cambio
+# del índice.
+#
+# Cada proceso tiene su propio índice. Las escrituras lo actualizan de forma
+# incremental y los cambios de otros procesos se recogen en segundo plano
+# (ver core/indexes.py). También se reconstruye cada día para descartar las
+# ofertas vencidas.
+
+MIN_PREFIX = 2
+# Prefijos de hasta esta longitud guardan su resultado
+MEMO_PREFIX = 3
+
+_SKILL_SPLIT_RE = re.compile(r'[,;\n\r•·/()]+|\s+y\s+|\s+-\s+')
+
+
+def _skills(requirements):
+    skills = []
+    for chunk in _SKILL_SPLIT_RE.split(requirements or ''):
+        chunk = chunk.strip(' .:-\t')
+        if 2 <= len(chunk) <= 40 and len(chunk.split()) <= 4:
+            skills.append(chunk)
+    return skills
+
+
+def _entries(title, company_name, requirements):
+    entries = {}
+    for kind, texts in (('title', [title]), ('company', [company_name]), ('skill', _skills(requirements))):
+        for text in texts:
+            text = ' '.join((text or '').split())
+            key = normalize(text)
+            if key:
+                entries.setdefault((kind, key), text)
+    return entries
+
+
+def _prefix_keys(normalized):
+    words = normalized.split()
+    return {' '.join(words[i:]) for i in range(len(words))}
+
+
+class SuggestIndex(SharedIndex):
+    def __init__(self):
+        super().__init__('suggest')
+        self._keys = []
+        self._entries = {}
+        self._offer_entries = {}
+        self._memo = {}
+
+    def _add(self, offer_id, entries):
+        self._remove(offer_id)
+        for entry_key, display in entries.items():
+            entry = self._entries.get(entry_key)
+            if entry is None:
+                self._entries[entry_key] = [display, 1]
+                for prefix_key in _prefix_keys(entry_key[1]):
+                    insort(self._keys, (prefix_key, entry_key))
+            else:
+                entry[1] += 1
+        self._offer_entries[offer_id] = tuple(entries)
+
+    def _remove(self, offer_id):
+        for entry_key in self._offer_entries.pop(offer_id, ()):
+            entry = self._entries[entry_key]
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._entries[entry_key]
+                for prefix_key in _prefix_keys(entry_key[1]):
+                    position = bisect_left(self._keys, (prefix_key, entry_key))
+                    del self._keys[position]
+
+    def load(self):
+        rows = JobOffer.objects.active().values_list(
+            'pk', 'title', 'company__name', 'requirements'
+        ).iterator(chunk_size=2000)
+        entries = {}
+        offer_entries = {}
+        for pk, title, company_name, requirements in rows:
+            found = _entries(title, company_name, requirements)
+            for entry_key, display in found.items():
+                entry = entries.get(entry_key)
+                if entry is None:
+                    entries[entry_key] = [display, 1]
+                else:
+                    entry[1] += 1
+            offer_entries[pk] = tuple(found)
+        keys = sorted(
+            (prefix_key, entry_key) for entry_key in entries for prefix_key in _prefix_keys(entry_key[1])
+        )
+        return keys, entries, offer_entries
+
+    def install(self, state):
+        self._keys, self._entries, self._offer_entries = state
+        self._memo = {}
+
+    def update_offer(self, offer, using='default'):
+        if offer.is_active and not offer.is_expired:
+            entries = _entries(offer.title, offer.company.name, offer.requirements)
+        else:
+            entries = None
+        self.changed(lambda: self._change(offer.pk, entries), using=using)
+
+    def remove_offer(self, offer_id, using='default'):
+        self.changed(lambda: self._change(offer_id, None), using=using)
+
+    def _change(self, offer_id, entries):
+        if entries is None:
+            self._remove(offer_id)
+        else:
+            self._add(offer_id, entries)
+        self._memo = {}
+
+    def suggest(self, prefix, limit=8):
+        prefix = ' '.join(normalize(prefix).split())
+        if len(prefix) < MIN_PREFIX:
+            return []
+        with self._lock:
+            memo_key = (prefix, limit) if len(prefix) <= MEMO_PREFIX else None
+            results = self._memo.get(memo_key)
+            if results is None:
+                # Las claves que empiezan por el prefijo van seguidas en la lista
+                start = bisect_left(self._keys, (prefix,))
+                end = bisect_left(self._keys, (prefix + '\U0010ffff',), start)
+                matches = {entry_key for _, entry_key in self._keys[start:end]}
+                top = heapq.nsmallest(
+                    limit, matches, key=lambda key: (-self._entries[key][1], self._entries[key][0])
+                )
+                results = [
+                    {'text': self._entries[key][0], 'type': key[0], 'count': self._entries[key][1]}
+                    for key in top
+                ]
+                if memo_key is not None:
+                    self._memo[memo_key] = results
+        return [dict(result) for result in results]
+
+
+index = SuggestIndex()
+
+
+def suggest(prefix, limit=8):
+    index.ensure_fresh()
+    return index.suggest(prefix, limit)
+
+
+def offer_saved(offer, using='default'):
+    index.update_offer(offer, using=using)
+
+
+def offer_deleted(offer_id, using='default'):
+    index.remove_offer(offer_id, using=using)
+
+
+def invalidate(using='default'):
+    # Fuerza una reconstrucción en todos los procesos (p. ej. al renombrar una empresa)
+    index.invalidate(using=using)
@@ -1,3 +1,1742 @@
-from django.test import TestCase
+import csv
+import gzip
+import json
+import shutil
+import tempfile
+import threading
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.sessions.models import Session
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import CommandError, call_command
+import os
+from unittest import mock
+
+from django.conf import settings
+from django.db import connection, connections, router, transaction
+from django.http import HttpResponse
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.templatetags.static import static
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from jobfinder import assets, db, metrics
+
+from . import (
+    applying, caching, company_stats, expiry, facets, geo, indexes, matching, notifications, profiles,
+    ratelimit, resumes, search, stats, suggest, triage,
+)
+from .management.commands import _baseline, _payload, _profiling, _seeding
+from .urls import urlpatterns
+from .pagination import CURSOR_PARAM
+from .models import (
+    Application, Candidate, CategoryCount, Company, CompanyStats, ExpirySweep, JobOffer, Notification, ResumeBlob,
+)
+
+
+# Sin hilos contra la base de datos de pruebas: los índices en memoria se
+# comprueban dentro de la petición (ver core/indexes.py)
+_index_settings = override_settings(INDEX_REFRESH_BACKGROUND=False)
+
+
+def setUpModule():
+    _index_settings.enable()
+
+
+def tearDownModule():
+    _index_settings.disable()
+
+
+def create_company(username='empresa', name='Acme'):
+    user = User.objects.create_user(username=username, password='clave-segura-123')
+    return Company.objects.create(
+        user=user, name=name, description='Empresa', location='Madrid', phone='600000000'
+    )
+
+
+def create_candidate(username='candidato'):
+    user = User.objects.create_user(username=username, password='clave-segura-123')
+    return Candidate.objects.create(user=user, phone='600000000', location='Madrid')
+
+
+def create_offer(company, title='Oferta', days=30, **kwargs):
+    data = {
+        'description': 'Descripción de la oferta',
+        'category': JobOffer.CATEGORY_CHOICES[0][0],
+        'location': 'Madrid',
+        'requirements': 'Requisitos',
+        'deadline': timezone.now().date() + timedelta(days=days),
+    }
+    data.update(kwargs)
+    return JobOffer.objects.create(company=company, title=title, **data)
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.company = create_company()
+
+    def test_tokenize_removes_accents_and_stems(self):
+        self.assertEqual(search.tokenize('Diseñadores'), search.tokenize('diseñador'))
+        self.assertEqual(search.tokenize('Programación'), ['program'])
+
+    def test_results_ranked_by_relevance(self):
+        in_description = create_offer(self.company, title='Analista', description='Trabajo con Python')
+        in_title = create_offer(self.company, title='Desarrollador Python')
+        self.assertEqual(search.search_offer_ids('python'), [in_title.pk, in_description.pk])
+
+    def test_accents_stemming_and_prefix(self):
+        offer = create_offer(self.company, title='Diseñador Gráfico')
+        self.assertEqual(search.search_offer_ids('disenadora grafica'), [offer.pk])
+        self.assertEqual(search.search_offer_ids('diseñ'), [offer.pk])
+
+    def test_index_follows_updates_and_deletes(self):
+        offer = create_offer(self.company, title='Redactor')
+        offer.title = 'Traductor'
+        offer.save()
+        self.assertEqual(search.search_offer_ids('redactor'), [])
+        self.assertEqual(search.search_offer_ids('traductor'), [offer.pk])
+        offer.delete()
+        self.assertEqual(search.search_offer_ids('traductor'), [])
+
+    def test_company_rename_reindexes_offers(self):
+        offer = create_offer(self.company, title='Backend')
+        self.company.name = 'Globex'
+        self.company.save()
+        self.assertEqual(search.search_offer_ids('globex'), [offer.pk])
+
+    def test_job_offers_view_combines_search_and_filters(self):
+        match = create_offer(self.company, title='Desarrollador Django')
+        create_offer(self.company, title='Desarrollador Django', days=-1)
+        create_offer(self.company, title='Desarrollador Django', category=JobOffer.CATEGORY_CHOICES[1][0])
+        create_offer(self.company, title='Diseñador')
+        self.client.force_login(create_candidate().user)
+        response = self.client.get(reverse('job_offers'), {
+            'search': 'desarrolladores',
+            'category': JobOffer.CATEGORY_CHOICES[0][0],
+        })
+        self.assertEqual(list(response.context['offers']), [match])
+
+    def test_job_offers_view_without_results(self):
+        create_offer(self.company, title='Desarrollador Django')
+        self.client.force_login(create_candidate().user)
+        response = self.client.get(reverse('job_offers'), {'search': 'astronauta'})
+        self.assertEqual(list(response.context['offers']), [])
+
+    def test_job_offers_view_warns_when_results_are_capped(self):
+        indexes.forget()
+        create_offer(self.company, title='Desarrollador Python')
+        best = create_offer(self.company, title='Desarrollador Python', description='Python y más Python')
+        self.client.force_login(create_candidate().user)
+        response = self.client.get(reverse('job_offers'), {'search': 'python'})
+        self.assertFalse(response.context['search_truncated'])
+        # Los fragmentos en caché dependen de la búsqueda, no del límite
+        cache.clear()
+        with mock.patch('core.search.MAX_RESULTS', 1):
+            response = self.client.get(reverse('job_offers'), {'search': 'python'})
+        self.assertTrue(response.context['search_truncated'])
+        self.assertEqual(list(response.context['offers']), [best])
+        self.assertContains(response, 'se muestran las')
+
+    def test_closed_offers_do_not_take_the_cap(self):
+        for _ in range(3):
+            create_offer(self.company, title='Python Python', description='Python', is_active=False)
+        create_offer(self.company, title='Python Python', description='Python', days=-1)
+        active = create_offer(self.company, title='Analista', description='Algo de Python')
+        self.assertEqual(search.search_offer_ids('python'), [active.pk])
+        with mock.patch('core.search.MAX_RESULTS', 2):
+            offers, truncated = search.search_offers(JobOffer.objects.active(), 'python')
+        self.assertEqual((list(offers), truncated), ([active], False))
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        indexes.forget()
+        company = create_company()
+        self.offers = [create_offer(company, title=f'Oferta {i}') for i in range(25)]
+        self.client.force_login(create_candidate().user)
+
+    def test_pages_cover_every_offer_once(self):
+        seen = []
+        query = ''
+        while True:
+            response = self.client.get(f"{reverse('job_offers')}?{query}")
+            page = response.context['offers']
+            seen.extend(offer.pk for offer in page)
+            if not page.has_next():
+                break
+            query = page.next_query
+        expected = sorted(self.offers, key=lambda o: (o.publication_date, o.pk), reverse=True)
+        self.assertEqual(seen, [offer.pk for offer in expected])
+
+    def test_previous_page_returns_first_page(self):
+        first = self.client.get(reverse('job_offers')).context['offers']
+        second = self.client.get(f"{reverse('job_offers')}?{first.next_query}").context['offers']
+        self.assertTrue(second.has_previous())
+        back = self.client.get(f"{reverse('job_offers')}?{second.previous_query}").context['offers']
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous())
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        response = self.client.get(reverse('job_offers'), {CURSOR_PARAM: 'no-es-un-cursor'})
+        self.assertEqual(len(response.context['offers']), 20)
+
+    def test_count_is_cached(self):
+        self.client.get(reverse('job_offers'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('job_offers'))
+        self.assertFalse([q for q in queries if 'COUNT(' in q['sql']])
+        self.assertEqual(response.context['offers'].count, 25)
+
+
+class CategoryCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.company = create_company()
+        self.software, self.marketing = [choice for choice, _ in JobOffer.CATEGORY_CHOICES[:2]]
+
+    def counts(self):
+        return {item['category']: item['count'] for item in stats.category_counts()}
+
+    def test_counts_follow_offer_writes_without_recounting(self):
+        offer = create_offer(self.company, category=self.software)
+        other = create_offer(self.company, category=self.software)
+        create_offer(self.company, category=self.software, days=-1)
+        self.assertEqual(self.counts(), {self.software: 2})
+
+        offer.category = self.marketing
+        offer.save()
+        # Una sola consulta a CategoryCount, sin contar ofertas
+        with self.assertNumQueries(1):
+            self.assertEqual(self.counts(), {self.software: 1, self.marketing: 1})
+
+        offer.is_active = False
+        offer.save()
+        self.assertEqual(self.counts(), {self.software: 1})
+
+        other.delete()
+        self.assertEqual(self.counts(), {})
+
+    def test_rolled_back_write_leaves_counts(self):
+        self.assertEqual(self.counts(), {})
+        with self.assertRaises(ValueError), transaction.atomic():
+            create_offer(self.company, category=self.software)
+            raise ValueError
+        self.assertEqual(CategoryCount.objects.get(category=self.software).count, 0)
+
+    def test_bulk_writes_trigger_a_recount(self):
+        self.assertEqual(self.counts(), {})
+        JobOffer.objects.bulk_create([JobOffer(
+            company=self.company, title='Masiva', description='-', category=self.marketing,
+            location='Madrid', requirements='-', deadline=timezone.now().date() + timedelta(days=3),
+        )])
+        stats.invalidate_category_counts()
+        self.assertEqual(self.counts(), {self.marketing: 1})
+        self.assertTrue(all(row.counted_on for row in CategoryCount.objects.all()))
+
+    def test_reconcile_discounts_expired_offers(self):
+        offer = create_offer(self.company, category=self.software)
+        self.assertEqual(self.counts(), {self.software: 1})
+        # Una oferta que vence no emite señales; la reconciliación diaria la descuenta
+        JobOffer.objects.filter(pk=offer.pk).update(deadline=timezone.now().date() - timedelta(days=1))
+        stats.reconcile_category_counts()
+        self.assertEqual(self.counts(), {})
+
+    def test_home_reads_stored_counts(self):
+        create_offer(self.company, category=self.software)
+        stats.reconcile_category_counts()
+        response = self.client.get(reverse('home'))
+        self.assertEqual(list(response.context['offers_by_category']), [{'category': self.software, 'count': 1}])
+
+
+class SuggestTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        suggest.index = suggest.SuggestIndex()
+        self.company = create_company(name='Acme Diseño')
+
+    def texts(self, prefix):
+        return [item['text'] for item in suggest.suggest(prefix)]
+
+    def test_suggestions_ranked_by_offer_count(self):
+        create_offer(self.company, title='Diseñador Gráfico', requirements='Photoshop, Illustrator')
+        create_offer(self.company, title='Diseñador Gráfico', requirements='Photoshop')
+        create_offer(self.company, title='Diseñador Web', requirements='Figma')
+        create_offer(self.company, title='Diseñador Senior', days=-1)
+        # La empresa aparece en tres ofertas activas, el título "Diseñador Gráfico" en dos
+        self.assertEqual(self.texts('disen'), ['Acme Diseño', 'Diseñador Gráfico', 'Diseñador Web'])
+        self.assertEqual(self.texts('grafico'), ['Diseñador Gráfico'])
+        self.assertEqual(self.texts('photo'), ['Photoshop'])
+        self.assertEqual(self.texts('acme'), ['Acme Diseño'])
+
+    def test_answers_without_queries_and_follows_writes(self):
+        offer = create_offer(self.company, title='Redactor SEO')
+        self.assertEqual(self.texts('redac'), ['Redactor SEO'])
+        with self.captureOnCommitCallbacks(execute=True):
+            offer.title = 'Traductor'
+            offer.save()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.texts('redac'), [])
+            self.assertEqual(self.texts('tradu'), ['Traductor'])
+            self.assertEqual(self.texts('tr'), ['Traductor'])
+        with self.captureOnCommitCallbacks(execute=True):
+            offer.delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.texts('tradu'), [])
+            # El resultado guardado del prefijo corto se descarta con el cambio
+            self.assertEqual(self.texts('tr'), [])
+
+    def test_other_process_write_picked_up_by_refresh(self):
+        create_offer(self.company, title='Community Manager')
+        self.assertEqual(self.texts('commu'), ['Community Manager'])
+        with transaction.atomic():
+            JobOffer.objects.update(title='Copywriter')
+            indexes.bump('suggest')
+        # Las peticiones siguen con el índice que hay hasta la comprobación
+        self.assertEqual(self.texts('copy'), [])
+        self.assertTrue(suggest.index.refresh())
+        self.assertEqual(self.texts('copy'), ['Copywriter'])
+
+    def test_short_prefix_ranks_every_match(self):
+        # Cientos de claves con el prefijo por delante de la más frecuente
+        for pk in range(600):
+            suggest.index._add(pk, {('skill', f'zaa{pk:03}'): f'Zaa{pk:03}'})
+        for pk in range(600, 603):
+            suggest.index._add(pk, {('skill', 'zaz'): 'Zaz'})
+        self.assertEqual(suggest.index.suggest('za', 2), [
+            {'text': 'Zaz', 'type': 'skill', 'count': 3},
+            {'text': 'Zaa000', 'type': 'skill', 'count': 1},
+        ])
+
+    def test_endpoint(self):
+        create_offer(self.company, title='Desarrollador Python')
+        response = self.client.get(reverse('suggest_offers'), {'q': 'pyth'})
+        self.assertEqual(response.json()['suggestions'], [
+            {'text': 'Desarrollador Python', 'type': 'title', 'count': 1},
+        ])
+
+
+class ImportCommandTests(TestCase):
+    def setUp(self):
+        self.company = create_company(username='acme')
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.deadline = (timezone.now().date() + timedelta(days=10)).isoformat()
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def read_errors(self, path):
+        with open(f'{path}.errors.jsonl', encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_import_offers_from_csv(self):
+        category = JobOffer.CATEGORY_CHOICES[0][0]
+        path = self.write('offers.csv', (
+            'company,title,description,category,location,salary,requirements,deadline\n'
+            f'acme,Desarrollador Python,Backend,{category},Madrid,30000,Python,{self.deadline}\n'
+            f'desconocida,Diseñador,Web,{category},Madrid,,Figma,{self.deadline}\n'
+            f'acme,Analista,Datos,{category},Remoto,,SQL,2000-01-01\n'
+            f'acme,Redactor,Blog,{category},Remoto,,SEO,{self.deadline}\n'
+        ))
+        call_command('import_offers', path, batch_size=2, stdout=StringIO())
+        self.assertEqual(
+            sorted(JobOffer.objects.values_list('title', flat=True)),
+            ['Desarrollador Python', 'Redactor'],
+        )
+        self.assertEqual([error['line'] for error in self.read_errors(path)], [2, 3])
+        self.assertFalse(os.path.exists(f'{path}.checkpoint'))
+        # Las ofertas importadas se pueden buscar aunque bulk_create no emita señales
+        self.assertEqual(len(search.search_offer_ids('python')), 1)
+
+    def test_resume_from_checkpoint(self):
+        category = JobOffer.CATEGORY_CHOICES[0][0]
+        rows = [
+            {
+                'company': 'acme', 'title': f'Oferta {i}', 'description': 'Descripción', 'category': category,
+                'location': 'Madrid', 'requirements': 'Requisitos', 'deadline': self.deadline,
+            }
+            for i in range(5)
+        ]
+        path = self.write('offers.jsonl', ''.join(json.dumps(row) + '\n' for row in rows))
+        with open(f'{path}.checkpoint', 'w', encoding='utf-8') as f:
+            json.dump({'rows': 3}, f)
+        call_command('import_offers', path, resume=True, stdout=StringIO())
+        self.assertEqual(sorted(JobOffer.objects.values_list('title', flat=True)), ['Oferta 3', 'Oferta 4'])
+
+    def test_malformed_jsonl_lines_go_to_errors(self):
+        category = JobOffer.CATEGORY_CHOICES[0][0]
+        row = {
+            'company': 'acme', 'description': 'Descripción', 'category': category,
+            'location': 'Madrid', 'requirements': 'Requisitos', 'deadline': self.deadline,
+        }
+        path = self.write('offers.jsonl', '\n'.join([
+            json.dumps({**row, 'title': 'Primera'}),
+            '{"company": "acme", "title":',
+            '[1, 2]',
+            json.dumps({**row, 'title': 'Última'}),
+        ]) + '\n')
+        call_command('import_offers', path, stdout=StringIO())
+        self.assertEqual(sorted(JobOffer.objects.values_list('title', flat=True)), ['Primera', 'Última'])
+        errors = self.read_errors(path)
+        self.assertEqual([(error['line'], error['row']) for error in errors], [
+            (2, '{"company": "acme", "title":'),
+            (3, '[1, 2]'),
+        ])
+        self.assertIn('JSON no válido', errors[0]['errors']['__all__'][0])
+
+    def test_import_applications_skips_duplicates(self):
+        offer = create_offer(self.company)
+        candidate = create_candidate(username='ana')
+        rows = [
+            {'candidate': 'ana', 'offer': offer.pk, 'cover_letter': 'Hola'},
+            {'candidate': 'ana', 'offer': offer.pk, 'cover_letter': 'Otra vez'},
+            {'candidate': 'nadie', 'offer': offer.pk, 'cover_letter': 'Hola'},
+        ]
+        path = self.write('applications.jsonl', ''.join(json.dumps(row) + '\n' for row in rows))
+        with CaptureQueriesContext(connection) as queries:
+            call_command('import_applications', path, stdout=StringIO())
+        # Las ofertas se leen una vez, con todo lo que usa el comando
+        offer_reads = [q['sql'] for q in queries if q['sql'].startswith('SELECT "core_joboffer"."id"')]
+        self.assertEqual(len(offer_reads), 1, offer_reads)
+        self.assertEqual(list(Application.objects.values_list('candidate', 'cover_letter')), [(candidate.pk, 'Hola')])
+        self.assertEqual([error['line'] for error in self.read_errors(path)], [2, 3])
+
+
+class ExportApplicationsTests(TestCase):
+    def setUp(self):
+        self.company = create_company()
+        self.offer = create_offer(self.company, title='Backend')
+        other_offer = create_offer(create_company(username='otra'), title='Ajena')
+        self.pending = Application.objects.create(
+            candidate=create_candidate('ana'), job_offer=self.offer, cover_letter='Hola'
+        )
+        self.reviewed = Application.objects.create(
+            candidate=create_candidate('luis'), job_offer=self.offer, cover_letter='Hola', status='revisada'
+        )
+        Application.objects.create(candidate=create_candidate('eva'), job_offer=other_offer, cover_letter='Hola')
+        self.client.force_login(self.company.user)
+
+    def export(self, **params):
+        response = self.client.get(reverse('export_applications'), params)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_contains_only_own_applications(self):
+        lines = self.export().splitlines()
+        self.assertEqual(lines[0].split(',')[:3], ['id', 'offer_id', 'offer_title'])
+        self.assertEqual([line.split(',')[0] for line in lines[1:]], [str(self.pending.pk), str(self.reviewed.pk)])
+
+    def test_jsonl_with_status_filter(self):
+        rows = [json.loads(line) for line in self.export(format='jsonl', status='revisada').splitlines()]
+        self.assertEqual([(row['id'], row['offer_title']) for row in rows], [(self.reviewed.pk, 'Backend')])
+
+    def test_date_range_filter(self):
+        tomorrow = (timezone.now().date() + timedelta(days=1)).isoformat()
+        self.assertEqual(len(self.export(date_from=tomorrow).splitlines()), 1)
+
+    def test_offer_filter(self):
+        self.assertEqual(len(self.export(offer=self.offer.pk).splitlines()), 3)
+        response = self.client.get(reverse('export_applications'), {'offer': 'abc'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_csv_neutralizes_formulas(self):
+        user = self.pending.candidate.user
+        user.first_name = '=HYPERLINK("http://example.com")'
+        user.last_name = '@SUMA(A1)'
+        user.save()
+        Candidate.objects.filter(pk=self.pending.candidate_id).update(phone='+34600000000', location='-Madrid')
+        row = next(csv.DictReader(StringIO(self.export(status='pendiente'))))
+        self.assertEqual(
+            [row['first_name'], row['last_name'], row['phone'], row['location']],
+            ['\'=HYPERLINK("http://example.com")', "'@SUMA(A1)", "'+34600000000", "'-Madrid"],
+        )
+        # En JSONL no hay fórmulas: los valores van tal cual
+        rows = [json.loads(line) for line in self.export(format='jsonl', status='pendiente').splitlines()]
+        self.assertEqual(rows[0]['phone'], '+34600000000')
+
+    def test_invalid_filters_are_rejected(self):
+        # Una descarga no redirige a una página HTML: el cliente guardaría eso
+        for params in ({'status': 'desconocido'}, {'date_from': 'ayer'}, {'date_to': '2024-13-01'}):
+            with self.subTest(params=params):
+                response = self.client.get(reverse('export_applications'), params)
+                self.assertEqual(response.status_code, 400)
+                self.assertFalse(response.streaming)
+
+    def test_candidates_cannot_export(self):
+        self.client.force_login(create_candidate('otro').user)
+        self.assertRedirects(self.client.get(reverse('export_applications')), reverse('home'))
+
+
+class ConditionalResponseTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        indexes.forget()
+        self.company = create_company()
+        self.offer = create_offer(self.company, title='Backend')
+        self.candidate = create_candidate()
+        self.client.force_login(self.candidate.user)
+
+    def assertNotModified(self, url, response):
+        repeat = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(repeat.status_code, 304)
+
+    def test_detail_revalidates_until_offer_changes(self):
+        url = reverse('job_offer_detail', args=[self.offer.pk])
+        response = self.client.get(url)
+        self.assertTrue(response.has_header('Last-Modified'))
+        self.assertIn('private', response['Cache-Control'])
+        self.assertNotModified(url, response)
+
+        self.offer.title = 'Backend senior'
+        self.offer.save()
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertContains(changed, 'Backend senior')
+
+    def test_detail_etag_changes_after_applying(self):
+        url = reverse('job_offer_detail', args=[self.offer.pk])
+        response = self.client.get(url)
+        Application.objects.create(candidate=self.candidate, job_offer=self.offer, cover_letter='Hola')
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertTrue(changed.context['has_applied'])
+
+    def test_listing_changes_when_an_offer_is_published(self):
+        url = reverse('job_offers')
+        response = self.client.get(url)
+        self.assertNotModified(url, response)
+
+        create_offer(self.company, title='Frontend')
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertContains(changed, 'Frontend')
+
+    def test_pending_messages_are_not_hidden_by_304(self):
+        url = reverse('job_offer_detail', args=[self.offer.pk])
+        response = self.client.get(url)
+        Application.objects.create(candidate=self.candidate, job_offer=self.offer, cover_letter='Hola')
+        response = self.client.get(url)
+        # Volver a postularse redirige al detalle con un mensaje de error
+        self.client.get(reverse('apply_to_offer', args=[self.offer.pk]))
+        repeat = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertContains(repeat, 'Ya te has postulado')
+
+    def test_fragments_vary_on_role(self):
+        url = reverse('job_offer_detail', args=[self.offer.pk])
+        self.client.get(url)
+        self.client.force_login(self.company.user)
+        owner = self.client.get(url)
+        self.assertContains(owner, reverse('edit_job_offer', args=[self.offer.pk]))
+        self.client.force_login(create_company('otra', 'Globex').user)
+        other = self.client.get(url)
+        self.assertNotContains(other, reverse('edit_job_offer', args=[self.offer.pk]))
+
+
+class ExpirySweepTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        indexes.forget()
+        expiry.forget()
+        self.addCleanup(expiry.forget)
+        self.company = create_company()
+        self.current = create_offer(self.company, title='Vigente')
+        self.expired = []
+        for title in ('Vencida 1', 'Vencida 2', 'Vencida 3'):
+            offer = create_offer(self.company, title=title)
+            JobOffer.objects.filter(pk=offer.pk).update(deadline=timezone.now().date() - timedelta(days=1))
+            self.expired.append(offer)
+
+    def test_command_deactivates_expired_offers_in_batches(self):
+        out = StringIO()
+        call_command('expire_offers', batch_size=2, stdout=out)
+        self.assertEqual(JobOffer.objects.filter(is_active=True).get(), self.current)
+        self.assertIn('3 ofertas vencidas desactivadas', out.getvalue())
+        sweep = ExpirySweep.objects.latest()
+        self.assertEqual((sweep.expired, sweep.swept_through), (3, timezone.now().date()))
+
+    def test_active_uses_only_is_active_after_sweep(self):
+        self.assertIn('"deadline" >=', str(JobOffer.objects.active().query))
+        expiry.expire_offers()
+        self.assertNotIn('"deadline" >=', str(JobOffer.objects.active().query))
+        self.assertEqual(list(JobOffer.objects.active()), [self.current])
+
+    def test_other_processes_see_the_sweep_in_the_database(self):
+        ExpirySweep.objects.create(
+            started_at=timezone.now(), finished_at=timezone.now(), swept_through=timezone.now().date(),
+        )
+        self.assertIn('"deadline" >=', str(JobOffer.objects.active().query))
+        # Cada petición lo comprueba al empezar (como mucho cada SWEPT_RECHECK segundos)
+        self.client.get(reverse('login'))
+        self.assertNotIn('"deadline" >=', str(JobOffer.objects.active().query))
+        with self.assertNumQueries(0):
+            expiry.check_sweep(force=True)
+
+    def test_sweep_invalidates_derived_caches(self):
+        stats.category_counts()
+        listings = caching.stamp(caching.LISTINGS)
+        expiry.expire_offers()
+        self.assertFalse(CategoryCount.objects.exclude(counted_on=None).exists())
+        self.assertGreater(caching.stamp(caching.LISTINGS), listings)
+
+
+class MatchingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        indexes.forget()
+        self.company = create_company()
+        self.backend = create_offer(self.company, title='Desarrollador Backend', requirements='Python, Django y SQL')
+        self.design = create_offer(self.company, title='Diseñador Gráfico', requirements='Photoshop e Illustrator')
+        self.candidate = create_candidate()
+        self.candidate.skills = 'Python, Django, PostgreSQL'
+        self.candidate.save()
+
+    def test_terms_share_search_normalization(self):
+        self.assertEqual(matching.terms('Diseñadores y Programación'), ['disen', 'program'])
+
+    def test_recommends_offers_matching_skills(self):
+        ranking = matching.recommend_offers(self.candidate)
+        self.assertEqual([pk for pk, _ in ranking], [self.backend.pk])
+        self.assertGreater(ranking[0][1], 0)
+        self.assertEqual(matching.recommend_offers(self.candidate, exclude=[self.backend.pk]), [])
+
+    def test_index_updated_incrementally_on_save(self):
+        matching.recommend_offers(self.candidate)
+        version = matching.offers.version
+        with self.captureOnCommitCallbacks(execute=True):
+            self.design.requirements = 'Python y Photoshop'
+            self.design.save()
+        self.assertEqual(
+            [pk for pk, _ in matching.recommend_offers(self.candidate)],
+            [self.backend.pk, self.design.pk],
+        )
+        self.assertEqual(matching.offers.version, version + 1)
+
+    def test_other_process_changes_picked_up_outside_requests(self):
+        matching.recommend_offers(self.candidate)
+        # Otro proceso cambia la oferta
+        with transaction.atomic():
+            JobOffer.objects.filter(pk=self.design.pk).update(requirements='Python')
+            indexes.bump('matching:offers')
+        with self.assertNumQueries(0):
+            ranking = matching.recommend_offers(self.candidate)
+        self.assertEqual([pk for pk, _ in ranking], [self.backend.pk])
+
+        matching.offers.checked_at -= settings.INDEX_REFRESH_SECONDS
+        with override_settings(INDEX_REFRESH_BACKGROUND=True), \
+                mock.patch('core.indexes.threading.Thread') as thread, self.assertNumQueries(0):
+            ranking = matching.recommend_offers(self.candidate)
+        self.assertEqual([pk for pk, _ in ranking], [self.backend.pk])
+        thread.return_value.start.assert_called_once_with()
+        # Lo que haría el hilo
+        thread.call_args.kwargs['target']()
+        self.assertEqual(
+            {pk for pk, _ in matching.recommend_offers(self.candidate)},
+            {self.backend.pk, self.design.pk},
+        )
+
+    def test_candidates_rebuilt_daily(self):
+        self.assertTrue(matching.candidates.daily)
+        matching.rank_candidates(self.backend, {self.candidate.pk})
+        matching.candidates.built_on -= timedelta(days=1)
+        self.assertTrue(matching.candidates.refresh())
+        self.assertEqual(matching.candidates.built_on, timezone.now().date())
+        self.assertFalse(matching.candidates.refresh())
+
+    def test_application_list_ranks_applicants(self):
+        other = create_candidate('otro')
+        other.skills = 'Photoshop'
+        other.save()
+        for candidate in (other, self.candidate):
+            Application.objects.create(candidate=candidate, job_offer=self.backend, cover_letter='Hola')
+        self.client.force_login(self.company.user)
+        response = self.client.get(reverse('application_list', args=[self.backend.pk]))
+        self.assertEqual([a.candidate for a in response.context['top_candidates']], [self.candidate])
+
+    def test_my_applications_shows_recommendations(self):
+        self.client.force_login(self.candidate.user)
+        response = self.client.get(reverse('my_applications'))
+        self.assertEqual(response.context['recommended_offers'], [self.backend])
+
+    def test_rebuild_command(self):
+        out = StringIO()
+        call_command('rebuild_match_index', stdout=out)
+        self.assertIn('ofertas: 2 documentos', out.getvalue())
+        self.assertIn('candidatos: 1 documentos', out.getvalue())
+
+
+class ResumeStoreTests(TestCase):
+    PDF = b'%PDF-1.4 ' + b'x' * 200000
+
+    def setUp(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        self.enterContext(override_settings(RESUME_STORE_ROOT=root.name))
+        self.root = root.name
+        self.company = create_company()
+        self.offers = [create_offer(self.company, title=f'Oferta {i}') for i in range(3)]
+
+    def apply(self, candidate, offer, resume=None):
+        self.client.force_login(candidate.user)
+        data = {'cover_letter': 'Hola'}
+        if resume is not None:
+            data['resume'] = SimpleUploadedFile('cv.pdf', resume, content_type='application/pdf')
+        response = self.client.post(reverse('apply_to_offer', args=[offer.pk]), data)
+        self.assertRedirects(response, reverse('my_applications'))
+        return Application.objects.get(candidate=candidate, job_offer=offer)
+
+    def test_same_content_stored_once_and_reused(self):
+        first, second = create_candidate('ana'), create_candidate('luis')
+        a = self.apply(first, self.offers[0], self.PDF)
+        b = self.apply(second, self.offers[0], self.PDF)
+        c = self.apply(first, self.offers[1])
+        self.assertEqual(ResumeBlob.objects.count(), 1)
+        blob = ResumeBlob.objects.get()
+        self.assertEqual({a.resume_id, b.resume_id, c.resume_id}, {blob.pk})
+        # Dos candidatos y tres postulaciones
+        self.assertEqual(blob.ref_count, 5)
+        with open(resumes.blob_path(blob.sha256), 'rb') as stored:
+            self.assertEqual(stored.read(), self.PDF)
+        self.assertEqual(os.listdir(os.path.join(self.root, 'tmp')), [])
+
+    def test_file_removed_with_last_reference(self):
+        candidate = create_candidate()
+        application = self.apply(candidate, self.offers[0], self.PDF)
+        path = resumes.blob_path(application.resume.sha256)
+        with self.captureOnCommitCallbacks(execute=True):
+            candidate.user.delete()
+        self.assertFalse(ResumeBlob.objects.exists())
+        self.assertFalse(os.path.exists(path))
+
+    def test_rejects_unknown_formats(self):
+        candidate = create_candidate()
+        self.client.force_login(candidate.user)
+        self.client.post(reverse('apply_to_offer', args=[self.offers[0].pk]), {
+            'cover_letter': 'Hola',
+            'resume': SimpleUploadedFile('cv.exe', b'MZ'),
+        })
+        self.assertFalse(Application.objects.exists())
+        self.assertFalse(ResumeBlob.objects.exists())
+
+    def test_download_supports_ranges_and_etag(self):
+        application = self.apply(create_candidate(), self.offers[0], self.PDF)
+        url = reverse('download_resume', args=[application.pk])
+        self.client.force_login(self.company.user)
+
+        response = self.client.get(url)
+        self.assertEqual(b''.join(response.streaming_content), self.PDF)
+        self.assertEqual(response['ETag'], f'"{application.resume.sha256}"')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+        partial = self.client.get(url, HTTP_RANGE='bytes=0-7')
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(b''.join(partial.streaming_content), b'%PDF-1.4')
+        self.assertEqual(partial['Content-Range'], f'bytes 0-7/{len(self.PDF)}')
+        tail = self.client.get(url, HTTP_RANGE='bytes=-3')
+        self.assertEqual(b''.join(tail.streaming_content), b'xxx')
+
+        self.assertEqual(self.client.get(url, HTTP_RANGE=f'bytes={len(self.PDF)}-').status_code, 416)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_download_delegated_to_web_server(self):
+        application = self.apply(create_candidate(), self.offers[0], self.PDF)
+        self.client.force_login(self.company.user)
+        with self.settings(RESUME_SENDFILE='x-accel-redirect'):
+            response = self.client.get(reverse('download_resume', args=[application.pk]))
+        self.assertEqual(
+            response['X-Accel-Redirect'],
+            '/protected/resumes/' + resumes.relative_path(application.resume.sha256),
+        )
+        self.assertEqual(response.content, b'')
+
+    def test_only_owner_company_and_candidate_can_download(self):
+        application = self.apply(create_candidate(), self.offers[0], self.PDF)
+        self.client.force_login(create_company('otra', 'Globex').user)
+        response = self.client.get(reverse('download_resume', args=[application.pk]))
+        self.assertRedirects(response, reverse('home'))
+
+
+class CompanyStatsTests(TestCase):
+    def setUp(self):
+        self.company = create_company()
+        self.candidates = [create_candidate(f'candidato{i}') for i in range(3)]
+
+    def stats(self):
+        return CompanyStats.objects.get(company=self.company)
+
+    def counters(self):
+        stats = self.stats()
+        return (
+            stats.total_offers, stats.active_offers, stats.total_applications,
+            dict((status, count) for status, _, count in stats.applications_by_status() if count),
+        )
+
+    def apply(self, offer, candidate, **kwargs):
+        return Application.objects.create(candidate=candidate, job_offer=offer, cover_letter='Carta', **kwargs)
+
+    def test_counters_follow_writes(self):
+        offer = create_offer(self.company)
+        other = create_offer(self.company, is_active=False)
+        first = self.apply(offer, self.candidates[0])
+        self.apply(offer, self.candidates[1], status='revisada')
+        self.apply(other, self.candidates[2])
+        self.assertEqual(self.counters(), (2, 1, 3, {'pendiente': 2, 'revisada': 1}))
+        offer.refresh_from_db()
+        self.assertEqual(offer.application_count, 2)
+
+        first.status = 'contactado'
+        first.save()
+        other.is_active = True
+        other.save()
+        self.assertEqual(self.counters(), (2, 2, 3, {'pendiente': 1, 'revisada': 1, 'contactado': 1}))
+
+        # Borrar la oferta descuenta también sus postulaciones
+        offer.delete()
+        self.assertEqual(self.counters(), (1, 1, 1, {'pendiente': 1}))
+
+    def test_counters_roll_back_with_the_write(self):
+        offer = create_offer(self.company)
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                self.apply(offer, self.candidates[0])
+                raise RuntimeError
+        self.assertEqual(self.counters(), (1, 1, 0, {}))
+
+    def test_reconcile_fixes_drift(self):
+        offer = create_offer(self.company)
+        self.apply(offer, self.candidates[0])
+        # Escrituras que no emiten señales
+        Application.objects.filter(job_offer=offer).update(status='rechazada')
+        JobOffer.objects.filter(pk=offer.pk).update(deadline=timezone.now().date() - timedelta(days=1))
+        CompanyStats.objects.filter(company=self.company).update(total_offers=7)
+
+        call_command('reconcile_company_stats', stdout=StringIO())
+        self.assertEqual(self.counters(), (1, 0, 1, {'rechazada': 1}))
+        self.assertIsNotNone(self.stats().reconciled_at)
+
+    def test_dashboard_reads_stats_row(self):
+        create_offer(self.company)
+        CompanyStats.objects.filter(company=self.company).delete()
+        self.client.force_login(self.company.user)
+        response = self.client.get(reverse('company_dashboard'))
+        # Sin fila se reconstruye a partir de las tablas
+        self.assertEqual((response.context['total_offers'], response.context['active_offers']), (1, 1))
+        self.assertTrue(CompanyStats.objects.filter(company=self.company).exists())
+
+
+class BulkStatusUpdateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+        cls.offer = create_offer(cls.company)
+        cls.applications = [
+            Application.objects.create(
+                candidate=create_candidate(f'candidato{i}'), job_offer=cls.offer, cover_letter='Carta'
+            )
+            for i in range(12)
+        ]
+        other_offer = create_offer(create_company('otra', 'Otra'))
+        cls.foreign = Application.objects.create(
+            candidate=cls.applications[0].candidate, job_offer=other_offer, cover_letter='Carta'
+        )
+
+    def setUp(self):
+        self.client.force_login(self.company.user)
+
+    def post_json(self, payload):
+        return self.client.post(
+            reverse('bulk_update_application_status'), json.dumps(payload), content_type='application/json'
+        )
+
+    def test_updates_owned_applications_and_reports_each_id(self):
+        self.applications[1].status = 'revisada'
+        self.applications[1].save()
+        ids = [application.pk for application in self.applications] + [self.foreign.pk, 999999]
+        response = self.post_json({'applications': ids, 'status': 'revisada'})
+
+        data = response.json()
+        results = {item['id']: item['result'] for item in data['results']}
+        self.assertEqual(data['totals'], {'updated': 11, 'unchanged': 1, 'not_found': 2})
+        self.assertEqual(results[self.applications[1].pk], 'unchanged')
+        self.assertEqual(results[self.foreign.pk], 'not_found')
+        self.assertEqual(Application.objects.filter(job_offer=self.offer, status='revisada').count(), 12)
+        self.foreign.refresh_from_db()
+        self.assertEqual(self.foreign.status, 'pendiente')
+
+        stats = CompanyStats.objects.get(company=self.company)
+        self.assertEqual((stats.pending_applications, stats.reviewed_applications), (0, 12))
+
+    def test_query_count_does_not_grow_with_ids(self):
+        few = [application.pk for application in self.applications[:2]]
+        many = [application.pk for application in self.applications[2:]]
+        with CaptureQueriesContext(connection) as first:
+            self.post_json({'applications': few, 'status': 'contactado'})
+        with CaptureQueriesContext(connection) as second:
+            self.post_json({'applications': many, 'status': 'contactado'})
+        self.assertEqual(len(first), len(second))
+
+    def test_form_submission_redirects_to_offer(self):
+        ids = ','.join(str(application.pk) for application in self.applications[:3])
+        response = self.client.post(reverse('bulk_update_application_status'), {
+            'applications': ids, 'status': 'rechazada', 'offer': self.offer.pk,
+        }, follow=True)
+        self.assertRedirects(response, reverse('application_list', args=[self.offer.pk]))
+        self.assertContains(response, '3 postulaciones actualizadas.')
+
+    def test_invalid_payload(self):
+        response = self.post_json({'applications': ['x'], 'status': 'revisada'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('applications', response.json()['errors'])
+
+
+class ProfileTests(TestCase):
+    def test_role_loaded_with_the_session_user(self):
+        company = create_company()
+        backend = profiles.ProfileBackend()
+        with self.assertNumQueries(1):
+            user = backend.get_user(company.user_id)
+        request = RequestFactory().get('/')
+        request.user = user
+        with self.assertNumQueries(0):
+            profile = profiles.get_profile(request)
+            self.assertTrue(profile.is_company)
+            self.assertEqual(profile.company_id, company.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(profile.company.name, 'Acme')
+            self.assertEqual(request.user.company.name, 'Acme')
+
+    def test_async_backend_loads_the_role(self):
+        candidate = create_candidate()
+        user = async_to_sync(profiles.ProfileBackend().aget_user)(candidate.user_id)
+        self.assertEqual(profiles.resolve(user), (profiles.CANDIDATE, candidate.pk))
+
+    def test_profile_changes_apply_to_open_sessions(self):
+        user = User.objects.create_user(username='nuevo', password='clave-segura-123')
+        self.client.force_login(user)
+        self.assertRedirects(self.client.get(reverse('my_applications')), reverse('home'))
+
+        candidate = Candidate.objects.create(user=user, phone='600000000', location='Madrid')
+        self.assertEqual(self.client.get(reverse('my_applications')).status_code, 200)
+        candidate.delete()
+        self.assertRedirects(self.client.get(reverse('my_applications')), reverse('home'))
+
+
+class GeoTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        indexes.forget()
+        self.company = create_company()
+        candidate = create_candidate()
+        self.client.force_login(candidate.user)
+
+    def titles(self, query):
+        response = self.client.get(reverse('job_offers') + query)
+        return response, [offer.title for offer in response.context['offers']]
+
+    def test_locate_normalizes_free_text(self):
+        place, remote = geo.locate('Madrid, España o Remoto')
+        self.assertEqual(place.name, 'Madrid')
+        self.assertTrue(remote)
+        self.assertEqual(geo.locate('vitoria-gasteiz').place.name, 'Vitoria-Gasteiz')
+        self.assertEqual(geo.locate('Oficina en LA CORUÑA').place.name, 'A Coruña')
+        self.assertEqual(geo.locate('Teletrabajo'), (None, True))
+
+    def test_offers_are_geocoded_on_save(self):
+        offer = create_offer(self.company, location='Sevilla (híbrido)')
+        self.assertAlmostEqual(offer.latitude, 37.39, places=2)
+        self.assertTrue(offer.geohash.startswith(geo.encode(offer.latitude, offer.longitude, 5)))
+        self.assertFalse(offer.is_remote)
+        offer.location = 'Remoto'
+        offer.save(update_fields=['location'])
+        offer.refresh_from_db()
+        self.assertEqual((offer.geohash, offer.latitude, offer.is_remote), ('', None, True))
+
+    def test_radius_and_remote_filters(self):
+        create_offer(self.company, title='Centro', location='Madrid')
+        create_offer(self.company, title='Sur', location='Getafe, Madrid')
+        create_offer(self.company, title='Costa', location='Barcelona')
+        create_offer(self.company, title='Casa', location='Remoto')
+
+        response, titles = self.titles('?near=madrid&km=25')
+        self.assertEqual(titles, ['Centro', 'Sur'])
+        self.assertContains(response, 'a 12 km')
+        self.assertEqual(self.titles('?near=Valencia&km=250')[1], [])
+        self.assertEqual(self.titles('?remote=1')[1], ['Casa'])
+
+        response, titles = self.titles('?near=Atlántida')
+        self.assertEqual(len(titles), 4)
+        self.assertContains(response, 'Ubicación desconocida')
+
+
+class FacetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        facets.index = facets.FacetIndex()
+        self.company = create_company()
+        self.software, self.marketing = [choice for choice, _ in JobOffer.CATEGORY_CHOICES[:2]]
+        create_offer(self.company, title='Python Madrid', category=self.software, salary=30000)
+        create_offer(self.company, title='Django Barcelona', category=self.software, location='Barcelona', days=3)
+        create_offer(self.company, title='SEO Madrid', category=self.marketing, salary=50000, days=5)
+        create_offer(self.company, title='SEO Vencida', category=self.marketing, days=-1)
+        self.client.force_login(create_candidate().user)
+
+    def facet(self, response, name):
+        facet = next(facet for facet in response.context['facets'] if facet['name'] == name)
+        return {option['value']: option['count'] for option in facet['options'] if option['count']}
+
+    def test_filters_combine_and_count_the_other_options(self):
+        response = self.client.get(reverse('job_offers'), {'category': self.software, 'city': 'Madrid'})
+        self.assertEqual([offer.title for offer in response.context['offers']], ['Python Madrid'])
+        self.assertEqual(response.context['offers'].count, 1)
+        # Cada faceta cuenta con los filtros de las demás
+        self.assertEqual(self.facet(response, 'category'), {self.software: 1, self.marketing: 1})
+        self.assertEqual(self.facet(response, 'city'), {'Madrid': 1, 'Barcelona': 1})
+        self.assertEqual(self.facet(response, 'salary'), {'24000-36000': 1})
+
+        response = self.client.get(reverse('job_offers'), {'expiring': 'week', 'salary': '48000-'})
+        self.assertEqual([offer.title for offer in response.context['offers']], ['SEO Madrid'])
+        self.assertEqual(self.facet(response, 'expiring'), {'week': 1})
+        self.assertEqual(self.facet(response, 'salary'), {'none': 1, '48000-': 1})
+
+    def test_text_search_restricts_counts(self):
+        response = self.client.get(reverse('job_offers'), {'search': 'seo'})
+        self.assertEqual(response.context['offers'].count, 1)
+        self.assertEqual(self.facet(response, 'category'), {self.marketing: 1})
+
+    def test_follows_writes_without_queries(self):
+        self.assertEqual(facets.count({}).total, 3)
+        offer = JobOffer.objects.get(title='Python Madrid')
+        with self.captureOnCommitCallbacks(execute=True):
+            offer.location = 'Sevilla'
+            offer.save()
+        with self.assertNumQueries(0):
+            result = facets.count({'city': 'Sevilla'})
+        self.assertEqual((result.total, result.counts['city']), (1, {'Sevilla': 1, 'Madrid': 1, 'Barcelona': 1}))
+        with self.captureOnCommitCallbacks(execute=True):
+            offer.delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(facets.count({}).total, 2)
+
+    def test_bitmaps_sized_by_active_offers(self):
+        create_offer(self.company, title='Python Sevilla', pk=10 ** 6, location='Sevilla')
+        self.assertEqual(facets.count({'city': 'Sevilla'}).total, 1)
+        self.assertEqual(facets.index._all.bit_length(), 4)
+        # Las posiciones libres se reutilizan
+        with self.captureOnCommitCallbacks(execute=True):
+            JobOffer.objects.get(title='Python Madrid').delete()
+            create_offer(self.company, title='Go Madrid', pk=2 * 10 ** 6)
+        self.assertEqual(facets.count({'city': 'Madrid'}).total, 2)
+        self.assertEqual(facets.index._all.bit_length(), 4)
+        search_ids = JobOffer.objects.filter(title__contains='Python').values_list('pk', flat=True)
+        self.assertEqual(facets.count({}, list(search_ids)).total, 1)
+
+    def test_remote_and_radius_from_bitmaps(self):
+        create_offer(self.company, title='Python Getafe', category=self.software, location='Getafe')
+        create_offer(self.company, title='Python Remoto', category=self.software, location='Remoto')
+        facets.count({})
+        madrid = geo.locate('Madrid').place
+        with self.assertNumQueries(0):
+            nearby = facets.count({}, near=(madrid.latitude, madrid.longitude, 25))
+            remote = facets.count({'category': self.software}, remote=True)
+        self.assertEqual((nearby.total, nearby.counts['city']), (3, {'Madrid': 2, 'Getafe': 1, 'Barcelona': 0}))
+        self.assertEqual(remote.total, 1)
+
+        response = self.client.get(reverse('job_offers'), {'near': 'Madrid', 'km': 25, 'category': self.software})
+        self.assertEqual(response.context['offers'].count, 2)
+        self.assertEqual(self.facet(response, 'category'), {self.software: 2, self.marketing: 1})
+        response = self.client.get(reverse('job_offers'), {'remote': '1'})
+        self.assertEqual([offer.title for offer in response.context['offers']], ['Python Remoto'])
+        self.assertEqual(response.context['offers'].count, 1)
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionRefusedError('SMTP no disponible')
+
+
+class UnreachableEmailBackend(BaseEmailBackend):
+    opened = 0
+
+    def open(self):
+        self.opened += 1
+        raise ConnectionRefusedError('Servidor SMTP caído')
+
+    def send_messages(self, email_messages):
+        raise AssertionError('Sin conexión no se envía')
+
+
+class NotificationTests(TestCase):
+    def setUp(self):
+        self.company = create_company()
+        self.other_company = create_company('otra', 'Globex')
+        self.offers = [create_offer(self.company, title=f'Oferta {i}') for i in range(2)]
+        self.other_offer = create_offer(self.other_company, title='Oferta Globex')
+        self.candidates = [create_candidate(f'candidato{i}') for i in range(2)]
+        for profile in [self.company, self.other_company, *self.candidates]:
+            profile.user.email = f'{profile.user.username}@example.com'
+            profile.user.save()
+
+    def test_outbox_is_written_with_the_change(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                applying.apply(self.candidates[0].pk, self.offers[0].pk, 'Hola')
+                raise RuntimeError
+        self.assertFalse(Notification.objects.exists())
+
+        self.client.force_login(self.candidates[0].user)
+        self.client.post(reverse('apply_to_offer', args=[self.offers[0].pk]), {'cover_letter': 'Hola'})
+        notification = Notification.objects.get()
+        self.assertEqual((notification.kind, notification.state), (Notification.APPLICATION_CREATED, Notification.PENDING))
+        # Nada se envía durante la petición
+        self.assertEqual(mail.outbox, [])
+
+    def test_events_are_coalesced_per_recipient(self):
+        for candidate in self.candidates:
+            for offer in [*self.offers, self.other_offer]:
+                applying.apply(candidate.pk, offer.pk, 'Hola')
+        application = Application.objects.get(candidate=self.candidates[0], job_offer=self.offers[0])
+        application.status = 'revisada'
+        application.save()
+        triage.update_statuses(self.other_company.pk, [
+            Application.objects.get(candidate=self.candidates[0], job_offer=self.other_offer).pk,
+        ], 'contactado')
+
+        result = notifications.drain()
+        self.assertEqual((result['emails'], result['sent']), (3, 8))
+        recipients = {message.to[0]: message for message in mail.outbox}
+        self.assertEqual(set(recipients), {'empresa@example.com', 'otra@example.com', 'candidato0@example.com'})
+        self.assertEqual(recipients['empresa@example.com'].subject, '[JobFinder] 4 postulaciones nuevas')
+        self.assertIn('Oferta 1', recipients['empresa@example.com'].body)
+        body = recipients['candidato0@example.com'].body
+        self.assertIn('Oferta 0 (Acme): Pendiente → Revisada', body)
+        self.assertIn('Oferta Globex (Globex): Pendiente → Contactado', body)
+        self.assertFalse(Notification.objects.exclude(state=Notification.SENT).exists())
+        self.assertEqual(notifications.drain()['emails'], 0)
+
+    def test_failed_sends_are_retried_with_backoff(self):
+        applying.apply(self.candidates[0].pk, self.offers[0].pk, 'Hola')
+        now = timezone.now()
+        result = notifications.drain(now=now, connection=FailingEmailBackend())
+        self.assertEqual(result['retried'], 1)
+        notification = Notification.objects.get()
+        self.assertEqual(notification.attempts, 1)
+        self.assertEqual(notification.next_attempt_at, now + notifications.RETRY_DELAY)
+        self.assertIn('SMTP no disponible', notification.last_error)
+        # Hasta que pase la espera no se vuelve a intentar
+        self.assertEqual(notifications.drain(now=now)['emails'], 0)
+
+        later = now
+        for attempt in range(2, notifications.MAX_ATTEMPTS + 1):
+            later += notifications.retry_delay(attempt - 1)
+            notifications.drain(now=later, connection=FailingEmailBackend())
+        notification.refresh_from_db()
+        self.assertEqual((notification.state, notification.attempts), (Notification.FAILED, notifications.MAX_ATTEMPTS))
+        self.assertEqual(mail.outbox, [])
+
+    def test_connection_opened_only_with_something_to_send(self):
+        backend = UnreachableEmailBackend()
+        self.assertEqual(notifications.drain(connection=backend), {})
+        self.assertEqual(backend.opened, 0)
+
+        applying.apply(self.candidates[0].pk, self.offers[0].pk, 'Hola')
+        applying.apply(self.candidates[0].pk, self.other_offer.pk, 'Hola')
+        now = timezone.now()
+        # Un servidor caído no tumba el worker: el lote se reintenta más tarde
+        result = notifications.drain(now=now, connection=backend)
+        self.assertEqual((result['retried'], backend.opened), (2, 1))
+        self.assertEqual(
+            set(Notification.objects.values_list('attempts', 'next_attempt_at')),
+            {(1, now + notifications.RETRY_DELAY)},
+        )
+        self.assertIn('Servidor SMTP caído', Notification.objects.first().last_error)
+
+    def test_command_discards_what_cannot_be_sent(self):
+        applying.apply(self.candidates[0].pk, self.offers[0].pk, 'Hola')
+        applying.apply(self.candidates[1].pk, self.offers[0].pk, 'Hola')
+        Application.objects.filter(candidate=self.candidates[1]).delete()
+        out = StringIO()
+        call_command('send_notifications', stdout=out)
+        self.assertIn('1 correos con 1 avisos', out.getvalue())
+        self.assertEqual(Notification.objects.filter(state=Notification.DISCARDED).count(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+
+class ApplyTests(TestCase):
+    def setUp(self):
+        self.company = create_company()
+        self.candidate = create_candidate()
+        self.offer = create_offer(self.company)
+
+    def test_single_insert_without_prior_reads(self):
+        with CaptureQueriesContext(connection) as queries:
+            result, application = applying.apply(self.candidate.pk, self.offer.pk, 'Hola')
+        self.assertEqual(result, applying.APPLIED)
+        statements = [query['sql'].split()[0].upper() for query in queries]
+        self.assertEqual([s for s in statements if s in ('SELECT', 'INSERT')][0], 'INSERT')
+        self.assertEqual(Application.objects.get().pk, application.pk)
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.application_count, 1)
+        self.assertEqual(CompanyStats.objects.get(company=self.company).total_applications, 1)
+
+    def test_duplicate_leaves_counters_untouched(self):
+        self.client.force_login(self.candidate.user)
+        url = reverse('apply_to_offer', args=[self.offer.pk])
+        self.assertRedirects(self.client.post(url, {'cover_letter': 'Hola'}), reverse('my_applications'))
+        response = self.client.post(url, {'cover_letter': 'Otra vez'})
+        self.assertRedirects(response, reverse('job_offer_detail', args=[self.offer.pk]))
+        self.assertEqual(applying.apply(self.candidate.pk, self.offer.pk, 'Hola'), (applying.DUPLICATE, None))
+
+        self.assertEqual(Application.objects.get().cover_letter, 'Hola')
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.application_count, 1)
+        self.assertEqual(CompanyStats.objects.get(company=self.company).total_applications, 1)
+
+    def test_closed_and_missing_offers(self):
+        expired = create_offer(self.company, days=-1)
+        inactive = create_offer(self.company, is_active=False)
+        for offer in (expired, inactive):
+            self.assertEqual(applying.apply(self.candidate.pk, offer.pk, 'Hola'), (applying.CLOSED, None))
+        self.assertEqual(applying.apply(self.candidate.pk, 0, 'Hola'), (applying.NOT_FOUND, None))
+        self.assertFalse(Application.objects.exists())
+
+        self.client.force_login(self.candidate.user)
+        response = self.client.post(reverse('apply_to_offer', args=[inactive.pk]), {'cover_letter': 'Hola'})
+        self.assertRedirects(response, reverse('job_offer_detail', args=[inactive.pk]))
+        response = self.client.post(reverse('apply_to_offer', args=[0]), {'cover_letter': 'Hola'})
+        self.assertEqual(response.status_code, 404)
+
+
+class ConcurrentApplyTests(TransactionTestCase):
+    # Dos envíos a la vez desde dos hilos, cada uno con su conexión, contra una
+    # base de datos SQLite en fichero: la de memoria de los tests comparte una
+    # sola caché y no reproduce los bloqueos de una base de datos real
+    alias = 'concurrent_apply'
+
+    @classmethod
+    def setUpClass(cls):
+        directory = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, directory, ignore_errors=True)
+        connections.settings[cls.alias] = {
+            **connections['default'].settings_dict,
+            'NAME': os.path.join(directory, 'apply.sqlite3'),
+        }
+        cls.addClassCleanup(connections.settings.pop, cls.alias)
+        cls.addClassCleanup(connections.__delitem__, cls.alias)
+        cls.addClassCleanup(lambda: connections[cls.alias].close())
+        # Aquí y no como atributo: el runner no debe crear esta base de datos
+        cls.databases = {'default', cls.alias}
+        call_command('migrate', database=cls.alias, verbosity=0)
+        super().setUpClass()
+
+    def tearDown(self):
+        # Las ofertas de esta base de datos no deben quedar en los índices en memoria
+        indexes.forget()
+
+    def test_simultaneous_submits_create_one_application(self):
+        using = self.alias
+        company_user = User.objects.db_manager(using).create_user('empresa', password='clave-segura-123')
+        company = Company.objects.using(using).create(
+            user=company_user, name='Acme', description='Empresa', location='Madrid', phone='600000000',
+        )
+        offer = JobOffer.objects.using(using).create(
+            company=company, title='Backend', description='Descripción', category=JobOffer.CATEGORY_CHOICES[0][0],
+            location='Madrid', requirements='Python', deadline=timezone.now().date() + timedelta(days=30),
+        )
+        candidate_user = User.objects.db_manager(using).create_user('candidato', password='clave-segura-123')
+        candidate = Candidate.objects.using(using).create(user=candidate_user, phone='600000000', location='Madrid')
+
+        barrier = threading.Barrier(2)
+        results = []
+
+        def submit():
+            barrier.wait()
+            try:
+                results.append(applying.apply(candidate.pk, offer.pk, 'Hola', using=using)[0])
+            except Exception as exc:
+                results.append(type(exc).__name__)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=submit) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(results), [applying.APPLIED, applying.DUPLICATE])
+        self.assertEqual(Application.objects.using(using).filter(candidate=candidate, job_offer=offer).count(), 1)
+        offer.refresh_from_db(using=using)
+        self.assertEqual(offer.application_count, 1)
+
+
+class RateLimitTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        ratelimit.limiter.memory.clear()
+
+    @override_settings(RATELIMITS={'login': {'ip': '100/m', 'username': '2/m'}})
+    def test_login_rejected_before_authenticating(self):
+        User.objects.create_user(username='ana', password='clave-segura-123')
+        url = reverse('login')
+        for _ in range(2):
+            response = self.client.post(url, {'username': 'Ana', 'password': 'incorrecta'})
+            self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.client.post(url, {'username': 'ana', 'password': 'clave-segura-123'})
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response.headers['Retry-After']), 0)
+        # Los demás usuarios y los GET no se ven afectados
+        self.assertEqual(self.client.post(url, {'username': 'otro', 'password': 'x'}).status_code, 200)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    @override_settings(RATELIMITS={'register': {'ip': '1/h'}})
+    def test_register_limited_by_ip(self):
+        url = reverse('register')
+        self.client.post(url, {'username': 'uno'})
+        self.assertEqual(self.client.post(url, {'username': 'dos'}).status_code, 429)
+        response = self.client.post(url, {'username': 'dos'}, REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(RATELIMITS={'apply': {'ip': None, 'user': '1/m'}})
+    def test_apply_limited_by_user(self):
+        offer = create_offer(create_company())
+        self.client.force_login(create_candidate().user)
+        url = reverse('apply_to_offer', args=[offer.pk])
+        self.assertEqual(self.client.post(url, {'cover_letter': 'Hola'}).status_code, 302)
+        self.assertEqual(self.client.post(url, {'cover_letter': 'Hola'}).status_code, 429)
+
+    def test_memory_bucket_refills(self):
+        buckets = ratelimit.MemoryBuckets()
+        rate = ratelimit.parse_rate('2/m')
+        self.assertEqual([buckets.take('k', rate, now=0)[0] for _ in range(3)], [True, True, False])
+        self.assertEqual(buckets.take('k', rate, now=0)[1], 30)
+        self.assertTrue(buckets.take('k', rate, now=30)[0])
+        self.assertFalse(buckets.take('k', rate, now=31)[0])
+
+    def test_cache_window_slides(self):
+        buckets = ratelimit.CacheBuckets('default')
+        rate = ratelimit.parse_rate('4/m')
+        self.assertEqual([buckets.take('k', rate, now=600)[0] for _ in range(4)], [True] * 4)
+        # A mitad del periodo siguiente aún cuenta la mitad del anterior
+        self.assertEqual([buckets.take('k', rate, now=690)[0] for _ in range(3)], [True, True, False])
+        self.assertTrue(buckets.take('k', rate, now=725)[0])
+
+    @override_settings(
+        CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'dummy': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+        },
+        RATELIMIT_CACHE='dummy',
+    )
+    def test_falls_back_to_memory_without_atomic_cache(self):
+        rate = ratelimit.parse_rate('1/m')
+        with self.assertLogs('core.ratelimit', 'WARNING'):
+            self.assertTrue(ratelimit.limiter.take('k', rate)[0])
+        self.assertFalse(ratelimit.limiter.take('k', rate)[0])
+
+
+@override_settings(METRICS_ENABLED=True, METRICS_SERVER_TIMING=True, METRICS_TOKEN='token-de-prueba')
+class MetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.registry.reset()
+
+    def test_records_per_view_and_sets_server_timing(self):
+        create_offer(create_company())
+        response = self.client.get(reverse('home'))
+        self.assertRegex(response.headers['Server-Timing'], r'db;dur=[\d.]+;desc="\d+ consultas"')
+        self.assertIn('total;dur=', response.headers['Server-Timing'])
+
+        body = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer token-de-prueba').content.decode()
+        self.assertIn('jobfinder_request_duration_seconds_count{view="home"} 1', body)
+        self.assertIn('jobfinder_db_queries_bucket{view="home",le="+Inf"} 1', body)
+        self.assertIn('jobfinder_template_render_seconds_count{view="home"} 1', body)
+        self.assertIn('jobfinder_cache_requests_total{view="home",result="miss"}', body)
+        self.assertIn('jobfinder_responses_total{view="home",status="2xx"} 1', body)
+
+    def test_counts_queries_and_cache_hits(self):
+        self.client.get(reverse('login'))
+        self.client.get(reverse('home'))
+        self.client.get(reverse('home'))
+        view = metrics.registry._views['home']
+        self.assertEqual(view.latency.count, 2)
+        self.assertGreater(view.cache_hits, 0)
+        self.assertEqual(metrics.registry._views['login'].queries.count, 1)
+
+    @override_settings(METRICS_SLOW_REQUEST=0, METRICS_TRACE_SAMPLE_RATE=1)
+    def test_logs_sampled_slow_requests(self):
+        with self.assertLogs('jobfinder.metrics', 'WARNING') as logs:
+            self.client.get(reverse('home'))
+        self.assertIn('Petición lenta GET / (home, 200)', logs.output[0])
+        self.assertIn('SELECT', logs.output[0])
+
+    def test_endpoint_is_restricted(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer otro-token')
+        self.assertEqual(response.status_code, 403)
+        User.objects.create_user('admin', password='clave-segura-123', is_staff=True)
+        self.client.login(username='admin', password='clave-segura-123')
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 200)
+
+    @override_settings(METRICS_TOKEN=None)
+    def test_no_token_configured_is_not_a_token(self):
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer None')
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(METRICS_SERVER_TIMING=False)
+    def test_server_timing_is_optional(self):
+        response = self.client.get(reverse('home'))
+        self.assertNotIn('Server-Timing', response.headers)
+        self.assertEqual(metrics.registry._views['home'].latency.count, 1)
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled(self):
+        response = self.client.get(reverse('home'))
+        self.assertNotIn('Server-Timing', response.headers)
+        self.assertEqual(metrics.registry._views, {})
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer token-de-prueba')
+        self.assertEqual(response.status_code, 404)
+
+
+class SeedLoadTests(TestCase):
+    def test_seed_load_generates_dataset(self):
+        out = StringIO()
+        call_command(
+            'seed_load', companies=2, offers_per_company=6, candidates=4, applications_per_candidate=3, stdout=out,
+        )
+        self.assertEqual((Company.objects.count(), JobOffer.objects.count()), (2, 12))
+        self.assertEqual(Application.objects.count(), 12)
+        self.assertEqual(sum(CompanyStats.objects.values_list('total_applications', flat=True)), 12)
+        self.assertIn('applications: 12', out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('seed_load', companies=1, stdout=StringIO())
+
+    def test_compare_with_baseline(self):
+        baseline = {'job_offers': {'rps': 100, 'p95_ms': 50}}
+        report = {'job_offers': {'rps': 80, 'p95_ms': 60}, 'apply_to_offer': {'rps': 10, 'p95_ms': 5}}
+        self.assertEqual(_baseline.compare(baseline, report), {'job_offers': (-20.0, 20.0)})
+
+
+class DatabaseRoutingTests(SimpleTestCase):
+    # Sin la transacción de TestCase: dentro de una transacción se lee de la principal
+    databases = {'default'}
+
+    def routed_read(self, method, path, cookies=None, model=JobOffer):
+        # Base de datos a la que iría una lectura de `model` dentro de la vista de `path`
+        request = getattr(RequestFactory(), method)(path)
+        request.COOKIES.update(cookies or {})
+        request.resolver_match = resolve(path)
+        seen = []
+
+        def view(request):
+            seen.append(router.db_for_read(model))
+            return HttpResponse()
+
+        middleware = db.ReplicaRoutingMiddleware(lambda request: middleware.process_view(request, view, (), {}) or view(request))
+        response = middleware(request)
+        return seen[0], response
+
+    @override_settings(DATABASE_READ_ALIAS='replica')
+    def test_listing_reads_go_to_replica(self):
+        self.assertEqual(self.routed_read('get', reverse('job_offers'))[0], 'replica')
+        self.assertEqual(self.routed_read('get', reverse('job_offer_detail', args=[1]))[0], 'replica')
+        self.assertEqual(self.routed_read('get', reverse('my_applications'))[0], 'default')
+        self.assertEqual(router.db_for_write(JobOffer), 'default')
+
+    @override_settings(DATABASE_READ_ALIAS='replica')
+    def test_sessions_and_users_read_primary(self):
+        # Con la réplica retrasada, un usuario recién identificado seguiría siendo anónimo
+        for model in (Session, User, ContentType):
+            self.assertEqual(self.routed_read('get', reverse('job_offers'), model=model)[0], 'default')
+
+    @override_settings(DATABASE_READ_ALIAS='replica')
+    def test_reads_inside_transactions_use_primary(self):
+        with transaction.atomic():
+            self.assertEqual(self.routed_read('get', reverse('job_offers'))[0], 'default')
+
+    @override_settings(DATABASE_READ_ALIAS='replica')
+    def test_reads_stick_to_primary_after_a_write(self):
+        alias, response = self.routed_read('post', reverse('apply_to_offer', args=[1]))
+        self.assertEqual(alias, 'default')
+        self.assertIn(db.STICKY_COOKIE, response.cookies)
+        alias, _ = self.routed_read('get', reverse('job_offers'), {db.STICKY_COOKIE: '1'})
+        self.assertEqual(alias, 'default')
+
+    @override_settings(DATABASE_READ_ALIAS=None)
+    def test_without_replica_everything_reads_primary(self):
+        alias, response = self.routed_read('post', reverse('job_offers'))
+        self.assertEqual(alias, 'default')
+        self.assertNotIn(db.STICKY_COOKIE, response.cookies)
+        self.assertEqual(self.routed_read('get', reverse('job_offers'))[0], 'default')
+
+    def test_connection_pragmas(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 5000)
+
+
+class StaticAssetsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        static_root = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(static_root.cleanup)
+        cls.enterClassContext(override_settings(STATIC_ROOT=static_root.name))
+        call_command('collectstatic', interactive=False, verbosity=0)
+        super().setUpClass()
+
+    def test_collectstatic_fingerprints_and_compresses(self):
+        name = staticfiles_storage.stored_name('css/jobfinder.css')
+        self.assertRegex(name, r'^css/jobfinder\.[0-9a-f]{12}\.css$')
+        self.assertEqual(static('css/jobfinder.css'), f'/static/{name}')
+        with open(staticfiles_storage.path(name), 'rb') as original:
+            data = original.read()
+        with open(staticfiles_storage.path(name) + '.gz', 'rb') as compressed:
+            self.assertEqual(gzip.decompress(compressed.read()), data)
+
+    def test_middleware_serves_compressed_immutable_files(self):
+        name = staticfiles_storage.stored_name('js/jobfinder.js')
+        with open(staticfiles_storage.path(name), 'rb') as original:
+            data = original.read()
+
+        response = self.client.get(f'/static/{name}', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(response.headers['Vary'], 'Accept-Encoding')
+        self.assertIn('immutable', response.headers['Cache-Control'])
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), data)
+
+        response = self.client.get(f'/static/{name}', HTTP_ACCEPT_ENCODING='gzip;q=0')
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(b''.join(response.streaming_content), data)
+
+        response = self.client.get(f'/static/{name}', HTTP_IF_MODIFIED_SINCE=response.headers['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+        # Sin huella no es inmutable
+        response = self.client.get('/static/js/jobfinder.js')
+        self.assertNotIn('immutable', response.headers['Cache-Control'])
+        response.close()
+
+    def test_pages_have_no_inline_styles_or_scripts(self):
+        company = create_company()
+        offer = create_offer(company)
+        self.client.force_login(create_candidate().user)
+        for path in (reverse('home'), reverse('login'), reverse('job_offers'), reverse('job_offer_detail', args=[offer.pk])):
+            payload = _payload.page_payload(self.client, path)
+            self.assertEqual(payload['status'], 200)
+            self.assertEqual(payload['inline_bytes'], 0, path)
+            self.assertIn(static('css/jobfinder.css'), payload['static_files'])
+
+
+class ListingQueryCountTests(TestCase):
+    def setUp(self):
+        self.company = create_company()
+        self.candidate = create_candidate()
+        self.client.force_login(self.candidate.user)
+
+    def add_rows(self, count):
+        for _ in range(count):
+            offer = create_offer(self.company, title='Oferta')
+            Application.objects.create(candidate=self.candidate, job_offer=offer, cover_letter='Hola')
+
+    def assertConstantQueries(self, path):
+        self.add_rows(2)
+        # La primera petición puede construir los índices en memoria
+        self.client.get(path)
+        expiry.check_sweep(force=True)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(path)
+        self.add_rows(8)
+        with CaptureQueriesContext(connection) as many:
+            self.client.get(path)
+        self.assertEqual(len(many), len(few))
+
+    def test_job_offers(self):
+        self.assertConstantQueries(reverse('job_offers'))
+
+    def test_my_applications(self):
+        self.assertConstantQueries(reverse('my_applications'))
+
+    def test_company_dashboard(self):
+        self.client.force_login(self.company.user)
+        self.assertConstantQueries(reverse('company_dashboard'))
+
+
+class AsyncViewTests(TestCase):
+    # Las vistas públicas de ofertas por ASGI (AsyncClient), como en producción
+    def setUp(self):
+        cache.clear()
+        indexes.forget()
+        self.company = create_company()
+        self.offer = create_offer(self.company, title='Backend Python')
+        self.candidate = create_candidate()
+
+    async def test_home(self):
+        await self.async_client.aforce_login(self.candidate.user)
+        response = await self.async_client.get(reverse('home'))
+        self.assertContains(response, 'Backend Python')
+        # El usuario de la cabecera es el que cargó la vista
+        self.assertContains(response, 'candidato')
+
+    async def test_job_offers(self):
+        await self.async_client.aforce_login(self.candidate.user)
+        response = await self.async_client.get(reverse('job_offers'), {'search': 'python'})
+        self.assertContains(response, 'Backend Python')
+
+    async def test_job_offer_detail(self):
+        await self.async_client.aforce_login(self.candidate.user)
+        path = reverse('job_offer_detail', args=[self.offer.pk])
+        response = await self.async_client.get(path)
+        self.assertNotContains(response, 'Ya te has postulado')
+
+        await Application.objects.acreate(candidate=self.candidate, job_offer=self.offer, cover_letter='Hola')
+        response = await self.async_client.get(path)
+        self.assertContains(response, 'Ya te has postulado')
+
+        response = await self.async_client.get(reverse('job_offer_detail', args=[self.offer.pk + 100]))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_login_required(self):
+        response = await self.async_client.get(reverse('recent_offers'))
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response.url.startswith(reverse('login')))
+
+    def test_template_reuses_loaded_user(self):
+        self.async_client.force_login(self.candidate.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = async_to_sync(self.async_client.get)(reverse('offers_by_category'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len([query for query in queries if '"auth_user"' in query['sql']]), 1)
+
+
+class QueryBudgetTests(TestCase):
+    # Límite de consultas SQL por vista con un volumen de datos realista.
+    # Cada URL de core/urls.py debe tener aquí su presupuesto.
+    BUDGETS = {
+        'home': 3,
+        'register': 1,
+        'login': 1,
+        'logout': 4,
+        'job_offers': 6,
+        'suggest_offers': 1,
+        'job_offer_detail': 5,
+        'create_job_offer': 3,
+        'edit_job_offer': 3,
+        'delete_job_offer': 3,
+        'apply_to_offer': 5,
+        'my_applications': 5,
+        'cancel_application': 3,
+        'company_dashboard': 5,
+        'application_list': 4,
+        'export_applications': 3,
+        'download_resume': 3,
+        'update_application_status': 3,
+        'bulk_update_application_status': 2,
+        'offers_by_category': 3,
+        'recent_offers': 3,
+        'offers_expiring_soon': 3,
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        resume_root = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(resume_root.cleanup)
+        cls.enterClassContext(override_settings(RESUME_STORE_ROOT=resume_root.name))
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        data = _seeding.seed(companies=20, offers_per_company=50, candidates=200, applications_per_candidate=5)
+        cls.application = data['applications'][0]
+        cls.offer = cls.application.job_offer
+        cls.company = cls.offer.company
+        cls.candidate = cls.application.candidate
+        blob = resumes.store(SimpleUploadedFile('cv.pdf', b'%PDF-1.4'))
+        Application.objects.filter(pk=cls.application.pk).update(resume=blob)
+        cls.open_offer = JobOffer.objects.filter(
+            is_active=True, deadline__gte=timezone.now().date()
+        ).exclude(application__candidate=cls.candidate).first()
+
+    def requests(self):
+        company_user = self.company.user
+        candidate_user = self.candidate.user
+        return {
+            'home': (None, reverse('home')),
+            'register': (None, reverse('register')),
+            'login': (None, reverse('login')),
+            'logout': (candidate_user, reverse('logout')),
+            'job_offers': (candidate_user, reverse('job_offers') + '?search=desarrollador'),
+            'suggest_offers': (None, reverse('suggest_offers') + '?q=dise'),
+            'job_offer_detail': (candidate_user, reverse('job_offer_detail', args=[self.offer.pk])),
+            'create_job_offer': (company_user, reverse('create_job_offer')),
+            'edit_job_offer': (company_user, reverse('edit_job_offer', args=[self.offer.pk])),
+            'delete_job_offer': (company_user, reverse('delete_job_offer', args=[self.offer.pk])),
+            'apply_to_offer': (candidate_user, reverse('apply_to_offer', args=[self.open_offer.pk])),
+            'my_applications': (candidate_user, reverse('my_applications')),
+            'cancel_application': (candidate_user, reverse('cancel_application', args=[self.application.pk])),
+            'company_dashboard': (company_user, reverse('company_dashboard')),
+            'application_list': (company_user, reverse('application_list', args=[self.offer.pk])),
+            'export_applications': (company_user, reverse('export_applications') + '?status=pendiente'),
+            'download_resume': (company_user, reverse('download_resume', args=[self.application.pk])),
+            'update_application_status': (company_user, reverse('update_application_status', args=[self.application.pk])),
+            'bulk_update_application_status': (company_user, reverse('bulk_update_application_status')),
+            'offers_by_category': (candidate_user, reverse('offers_by_category')),
+            'recent_offers': (candidate_user, reverse('recent_offers')),
+            'offers_expiring_soon': (candidate_user, reverse('offers_expiring_soon')),
+        }
+
+    def test_radius_search_uses_geohash_index(self):
+        cache.clear()
+        self.client.force_login(self.candidate.user)
+        result = _profiling.profile(self.client, reverse('job_offers') + '?near=Madrid&km=25')
+        self.assertEqual(result['status'], 200)
+        self.assertEqual(result['full_scans'], [])
+        self.assertTrue(any(
+            'joboffer_active_geohash_idx (geohash>? AND geohash<?)' in line
+            for plan in result['plans'] for line in plan['plan']
+        ))
+
+    def test_every_view_within_budget_without_full_scans(self):
+        cache.clear()
+        # Índices en memoria ya construidos, barrido ya comprobado y conteos de
+        # hoy ya hechos, como en un proceso en marcha
+        expiry.check_sweep(force=True)
+        stats.reconcile_category_counts()
+        matching.offers.rebuild()
+        matching.candidates.rebuild()
+        suggest.index.rebuild()
+        facets.index.rebuild()
+        requests = self.requests()
+        report = []
+        for pattern in urlpatterns:
+            with self.subTest(view=pattern.name):
+                self.assertIn(pattern.name, self.BUDGETS)
+                self.assertIn(pattern.name, requests)
+                user, path = requests[pattern.name]
+                self.client.logout()
+                if user is not None:
+                    self.client.force_login(user)
+                result = _profiling.profile(self.client, path)
+                report.append(dict(result, view=pattern.name))
+                self.assertLess(result['status'], 400)
+                self.assertLessEqual(result['queries'], self.BUDGETS[pattern.name])
+                self.assertEqual(result['full_scans'], [])
+
+        # JOBFINDER_BENCHMARK_REPORT=ruta.json guarda consultas, planes y tiempos
+        report_path = os.environ.get('JOBFINDER_BENCHMARK_REPORT')
+        if report_path:
+            with open(report_path, 'w', encoding='utf-8') as report_file:
+                json.dump(report, report_file, indent=2, ensure_ascii=False)
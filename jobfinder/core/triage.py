@@ -0,0 +1,55 @@
+from collections import Counter
+
+from django.db import transaction
+
+from . import caching, company_stats, notifications
+from .models import Application
+
+# Cambio de estado de muchas postulaciones a la vez (revisión por la empresa).
+# Por cada lote de ids se comprueba la propiedad con una sola consulta, que
+# además trae el estado anterior, y se aplica el cambio con un único UPDATE.
+# Como update() no emite señales, los contadores de company_stats, las marcas
+# de caché de las ofertas y los avisos por correo se actualizan aquí, en la
+# misma transacción.
+
+BATCH_SIZE = 1000
+MAX_APPLICATIONS = 10000
+
+UPDATED = 'updated'
+UNCHANGED = 'unchanged'
+NOT_FOUND = 'not_found'
+
+
+def update_statuses(company_id, application_ids, status, using='default'):
+    # Devuelve {id: UPDATED | UNCHANGED | NOT_FOUND} en el orden recibido.
+    # NOT_FOUND incluye las postulaciones de otras empresas, sin distinguirlas.
+    results = dict.fromkeys(application_ids, NOT_FOUND)
+    ids = list(results)
+    transitions = Counter()
+    offers = set()
+    notified = []
+    with transaction.atomic(using=using):
+        for start in range(0, len(ids), BATCH_SIZE):
+            rows = (
+                Application.objects.using(using).select_for_update(of=('self',))
+                .filter(pk__in=ids[start:start + BATCH_SIZE], job_offer__company_id=company_id)
+                .order_by().values_list('pk', 'status', 'job_offer_id')
+            )
+            changed = []
+            for pk, old, offer_id in rows:
+                if old == status:
+                    results[pk] = UNCHANGED
+                    continue
+                results[pk] = UPDATED
+                changed.append(pk)
+                notified.append((pk, old))
+                transitions[old] += 1
+                offers.add(offer_id)
+            if changed:
+                Application.objects.using(using).filter(pk__in=changed).update(status=status)
+
+        if transitions:
+            company_stats.statuses_changed(company_id, transitions, status, using=using)
+            caching.touch(*(caching.offer_scope(pk) for pk in offers), using=using)
+            notifications.statuses_changed(notified, status, using=using)
+    return results
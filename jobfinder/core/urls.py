@@ -9,6 +9,7 @@ urlpatterns = [
     
     # Ofertas de trabajo
     path('offers/', views.job_offers, name='job_offers'),
+    path('offers/suggest/', views.suggest_offers, name='suggest_offers'),
     path('offers/<int:pk>/', views.job_offer_detail, name='job_offer_detail'),
     path('offers/create/', views.create_job_offer, name='create_job_offer'),
     path('offers/<int:pk>/edit/', views.edit_job_offer, name='edit_job_offer'),
@@ -22,7 +23,10 @@ urlpatterns = [
     # Panel de empresa
     path('company/dashboard/', views.company_dashboard, name='company_dashboard'),
     path('company/offers/<int:offer_pk>/applications/', views.application_list, name='application_list'),
+    path('company/applications/export/', views.export_applications, name='export_applications'),
+    path('applications/<int:pk>/resume/', views.download_resume, name='download_resume'),
     path('applications/<int:pk>/update-status/', views.update_application_status, name='update_application_status'),
+    path('company/applications/status/', views.bulk_update_application_status, name='bulk_update_application_status'),
     
     # Consultas
     path('offers/by-category/', views.offers_by_category, name='offers_by_category'),
@@ -1,32 +1,64 @@
+import json
+import mimetypes
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
+from django.http import Http404, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 from django.contrib.auth import login, logout 
 from django.contrib.auth import authenticate
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Count, Q
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 from django.utils import timezone
-from django.core.exceptions import ValidationError
-from datetime import timedelta
+from django.utils.dateparse import parse_date
 from .models import Company, Candidate, JobOffer, Application
 from .forms import *
+from . import applying, caching, company_stats, facets, geo, matching, resumes, triage
+from .ratelimit import ratelimit
+from .exports import stream_csv, stream_jsonl
+from .pagination import apaginate, paginate
+from .search import MAX_RESULTS, search_offers
+from .stats import category_counts
+from .suggest import suggest
 
-def home(request):
-    recent_offers = JobOffer.objects.filter(
-        is_active=True, 
-        deadline__gte=timezone.now().date()
-    ).order_by('-publication_date')[:5]
-    
-    offers_by_category = JobOffer.objects.filter(
-        is_active=True,
-        deadline__gte=timezone.now().date()
-    ).values('category').annotate(count=Count('id'))
+# Las vistas públicas de ofertas son asíncronas: con ASGI no ocupan un hilo
+# del servidor mientras esperan a la base de datos, y solo el renderizado de la
+# plantilla se ejecuta en un hilo. Las consultas van una detrás de otra: el ORM
+# asíncrono ejecuta cada una en el mismo hilo y con la misma conexión, así que
+# lanzarlas con asyncio.gather no las solapa.
+async def arender(request, template_name, context):
+    # La plantilla usa el usuario que ya cargó request.auser(), sin otra consulta
+    request.user = await request.auser()
+    return await sync_to_async(render)(request, template_name, context)
+
+async def _alist(queryset):
+    return [obj async for obj in queryset]
+
+async def _conditional(request, etag, modified, role_for=None):
+    # Rol del usuario y, si el cliente ya tiene esta versión, la respuesta 304
+    def check():
+        response = caching.not_modified(request, etag, modified)
+        if response is not None:
+            return None, response
+        return request.profile.role_for(role_for), None
+    return await sync_to_async(check)()
+
+async def home(request):
+    user = await request.auser()
+    modified = caching.stamp(caching.LISTINGS)
+    etag = caching.make_etag('home', caching.cache_version(modified), user.pk)
+    role, not_modified = await _conditional(request, etag, modified)
+    if not_modified:
+        return not_modified
     
     context = {
-        'recent_offers': recent_offers,
-        'offers_by_category': offers_by_category,
+        'recent_offers': await _alist(JobOffer.objects.active().for_listing().order_by('-publication_date')[:5]),
+        'offers_by_category': await sync_to_async(category_counts)(),
+        **caching.fragment_context(modified, role),
     }
-    return render(request, 'core/index.html', context)
+    response = await arender(request, 'core/index.html', context)
+    return caching.set_validators(response, etag, modified)
 
+@ratelimit('register', ip='10/h', username='5/h')
 def register(request):
     if request.method == 'POST':
         user_form = UserRegisterForm(request.POST)
@@ -92,6 +124,7 @@ def register(request):
     
     return render(request, 'core/register.html', {'user_form': user_form})
     
+@ratelimit('login', ip='20/m', username='5/m')
 def login_view(request):
     if request.method == 'POST':
         username = request.POST['username']
@@ -114,49 +147,99 @@ def logout_view(request):
     return redirect('home')
 
 @login_required
-def job_offers(request):
-    offers = JobOffer.objects.filter(
-        is_active=True, 
-        deadline__gte=timezone.now().date()
-    ).order_by('-publication_date')
+async def job_offers(request):
+    user = await request.auser()
+    modified = caching.stamp(caching.LISTINGS)
+    query = request.GET.urlencode()
+    etag = caching.make_etag('job_offers', caching.cache_version(modified), user.pk, query)
+    role, not_modified = await _conditional(request, etag, modified)
+    if not_modified:
+        return not_modified
+    
+    offers = JobOffer.objects.active().for_listing()
+    ordering = ['-publication_date', '-id']
     
-    category = request.GET.get('category')
     search = request.GET.get('search')
+    # Categoría, ciudad, salario y plazo: facetas combinables (core/facets.py)
+    selected = facets.selection(request.GET)
+    remote = False
+    near = None
+    search_truncated = False
+    
+    # Radio alrededor de una ciudad y solo remoto, desde el índice geohash
+    location_form = OfferLocationFilterForm(request.GET)
+    place = None
+    if location_form.is_valid():
+        remote = location_form.cleaned_data['remote']
+        if remote:
+            offers = offers.filter(is_remote=True)
+        place = location_form.cleaned_data['near']
+        if place is not None:
+            near = (place.latitude, place.longitude, location_form.cleaned_data['km'])
+            offers = geo.within(offers, *near)
+            ordering = ['distance_km'] + ordering
+    if search:
+        offers, search_truncated = await sync_to_async(search_offers)(offers, search)
+        ordering = ['search_rank'] + ordering
     
-    if category:
-        offers = offers.filter(category=category)
+    # El total y los contadores de cada opción salen del índice de facetas, sin
+    # COUNT ni GROUP BY; remoto y distancia también son mapas del índice, y solo
+    # la búsqueda aporta los ids que cumplen (como mucho MAX_RESULTS)
+    within_ids = None
     if search:
-        offers = offers.filter(
-            Q(title__icontains=search) | 
-            Q(description__icontains=search) |
-            Q(company__name__icontains=search)
-        )
-    
-    context = {'offers': offers}
-    return render(request, 'core/offer_list.html', context)
+        within_ids = [pk async for pk in offers.order_by().values_list('pk', flat=True)]
+    result = await sync_to_async(facets.count)(selected, within_ids, remote, near)
+    offers = facets.filter_offers(offers, selected)
+    
+    context = {
+        'offers': await apaginate(request, offers, ordering, per_page=20, count=result.total),
+        'facets': facets.options(result, selected, request.GET),
+        'location_form': location_form,
+        'near': place,
+        'search_truncated': search_truncated,
+        'max_search_results': MAX_RESULTS,
+        **caching.fragment_context(modified, role, query=query),
+    }
+    response = await arender(request, 'core/offer_list.html', context)
+    return caching.set_validators(response, etag, modified)
+
+def suggest_offers(request):
+    # Autocompletado del buscador: responde desde el índice en memoria, sin consultas
+    suggestions = suggest(request.GET.get('q', ''))
+    return JsonResponse({'suggestions': suggestions})
 
 @login_required
-def job_offer_detail(request, pk):
-    offer = get_object_or_404(JobOffer, pk=pk)
-    has_applied = False
-    
-    if hasattr(request.user, 'candidate'):
-        has_applied = Application.objects.filter(
-            candidate=request.user.candidate, 
-            job_offer=offer
-        ).exists()
+async def job_offer_detail(request, pk):
+    user = await request.auser()
+    try:
+        offer = await JobOffer.objects.for_detail().aget(pk=pk)
+    except JobOffer.DoesNotExist:
+        raise Http404('No JobOffer matches the given query.')
+    # Para usuarios que no son candidatos siempre es False
+    has_applied = await Application.objects.filter(candidate__user=user, job_offer_id=pk).aexists()
+    
+    modified = caching.last_modified(
+        offer.updated_at,
+        offer.company.updated_at,
+        caching.stamp(caching.offer_scope(pk)),
+    )
+    etag = caching.make_etag('job_offer_detail', pk, caching.cache_version(modified), user.pk, has_applied)
+    role, not_modified = await _conditional(request, etag, modified, role_for=offer)
+    if not_modified:
+        return not_modified
     
     context = {
         'offer': offer,
         'has_applied': has_applied,
+        **caching.fragment_context(modified, role),
     }
-    return render(request, 'core/offer_detail.html', context)
+    response = await arender(request, 'core/offer_detail.html', context)
+    return caching.set_validators(response, etag, modified)
 
 @login_required
 def create_job_offer(request):
-    try:
-        company = request.user.company
-    except Company.DoesNotExist:
+    company = request.profile.company
+    if company is None:
         messages.error(request, 'Solo las empresas pueden publicar ofertas. Tu usuario no tiene un perfil de empresa.')
         return redirect('home')
     
@@ -177,13 +260,11 @@ def create_job_offer(request):
 
 @login_required
 def edit_job_offer(request, pk):
-    try:
-        company = request.user.company
-    except Company.DoesNotExist:
+    if not request.profile.is_company:
         messages.error(request, 'Solo las empresas pueden editar ofertas.')
         return redirect('home')
     
-    offer = get_object_or_404(JobOffer, pk=pk, company=company)
+    offer = get_object_or_404(JobOffer, pk=pk, company_id=request.profile.company_id)
     
     if request.method == 'POST':
         form = JobOfferForm(request.POST, instance=offer)
@@ -205,13 +286,11 @@ def edit_job_offer(request, pk):
 
 @login_required
 def delete_job_offer(request, pk):
-    try:
-        company = request.user.company
-    except Company.DoesNotExist:
+    if not request.profile.is_company:
         messages.error(request, 'Solo las empresas pueden eliminar ofertas.')
         return redirect('home')
     
-    offer = get_object_or_404(JobOffer, pk=pk, company=company)
+    offer = get_object_or_404(JobOffer, pk=pk, company_id=request.profile.company_id)
     
     if request.method == 'POST':
         offer.delete()
@@ -221,41 +300,46 @@ def delete_job_offer(request, pk):
     context = {'offer': offer}
     return render(request, 'core/offer_confirm_delete.html', context)
 
+@ratelimit('apply', ip='60/m', user='20/m')
 @login_required
+@csrf_exempt
 def apply_to_offer(request, pk):
-    if not hasattr(request.user, 'candidate'):
+    # El CV se escribe en el almacén a medida que llega; el manejador tiene que
+    # instalarse antes de leer el cuerpo, así que CSRF se comprueba después.
+    request.upload_handlers.insert(0, resumes.ResumeUploadHandler(request))
+    return _apply_to_offer(request, pk)
+
+APPLY_ERRORS = {
+    applying.DUPLICATE: 'Ya te has postulado a esta oferta.',
+    applying.CLOSED: 'Esta oferta ha expirada.',
+}
+
+@csrf_protect
+def _apply_to_offer(request, pk):
+    if not request.profile.is_candidate:
         messages.error(request, 'Solo los candidatos pueden postularse a ofertas.')
         return redirect('home')
     
-    offer = get_object_or_404(JobOffer, pk=pk)
-    
-    if Application.objects.filter(candidate=request.user.candidate, job_offer=offer).exists():
-        messages.error(request, 'Ya te has postulado a esta oferta.')
-        return redirect('job_offer_detail', pk=pk)
-    
-    if offer.is_expired:
-        messages.error(request, 'Esta oferta ha expirada.')
-        return redirect('job_offer_detail', pk=pk)
-    
     if request.method == 'POST':
-        form = ApplicationForm(request.POST)
+        form = ApplicationForm(request.POST, request.FILES)
         if form.is_valid():
+            # Sin comprobaciones previas: la inserción rechaza duplicados y
+            # ofertas cerradas en la propia base de datos (core/applying.py)
             try:
-                application = form.save(commit=False)
-                application.candidate = request.user.candidate
-                application.job_offer = offer
-                
-                try:
-                    application.full_clean()
-                    application.save()
-                    messages.success(request, 'Postulación enviada exitosamente!')
-                    return redirect('my_applications')
-                except ValidationError as e:
-                    for field, errors in e.error_dict.items():
-                        for error in errors:
-                            messages.error(request, f'{field}: {error}')
+                result, _ = applying.apply(
+                    request.profile.candidate_id, pk,
+                    form.cleaned_data['cover_letter'], form.cleaned_data.get('resume'),
+                )
             except Exception as e:
                 messages.error(request, f'Error al guardar la aplicación: {str(e)}')
+            else:
+                if result == applying.APPLIED:
+                    messages.success(request, 'Postulación enviada exitosamente!')
+                    return redirect('my_applications')
+                if result == applying.NOT_FOUND:
+                    raise Http404('No JobOffer matches the given query.')
+                messages.error(request, APPLY_ERRORS[result])
+                return redirect('job_offer_detail', pk=pk)
         else:
             for field, errors in form.errors.items():
                 for error in errors:
@@ -263,16 +347,26 @@ def apply_to_offer(request, pk):
     else:
         form = ApplicationForm()
     
+    offer = get_object_or_404(JobOffer.objects.for_detail(), pk=pk)
+    
+    if Application.objects.filter(candidate_id=request.profile.candidate_id, job_offer=offer).exists():
+        messages.error(request, APPLY_ERRORS[applying.DUPLICATE])
+        return redirect('job_offer_detail', pk=pk)
+    
+    if offer.is_expired or not offer.is_active:
+        messages.error(request, APPLY_ERRORS[applying.CLOSED])
+        return redirect('job_offer_detail', pk=pk)
+    
     context = {'form': form, 'offer': offer}
     return render(request, 'core/apply.html', context)
 
 @login_required
 def cancel_application(request, pk):
-    if not hasattr(request.user, 'candidate'):
+    if not request.profile.is_candidate:
         messages.error(request, 'Solo los candidatos pueden cancelar postulaciones.')
         return redirect('home')
     
-    application = get_object_or_404(Application, pk=pk, candidate=request.user.candidate)
+    application = get_object_or_404(Application.objects.for_candidate(), pk=pk, candidate_id=request.profile.candidate_id)
     
     if request.method == 'POST':
         application.delete()
@@ -284,60 +378,135 @@ def cancel_application(request, pk):
 
 @login_required
 def my_applications(request):
-    if not hasattr(request.user, 'candidate'):
+    if not request.profile.is_candidate:
         messages.error(request, 'Acceso restringido a candidatos.')
         return redirect('home')
     
-    applications = Application.objects.filter(candidate=request.user.candidate)
-    context = {'applications': applications}
+    candidate = request.profile.candidate
+    applications = list(Application.objects.filter(candidate=candidate).for_candidate())
+    
+    # Ofertas activas más afines a sus habilidades, sin las que ya postuló
+    applied = [application.job_offer_id for application in applications]
+    ranking = matching.recommend_offers(candidate, limit=5, exclude=applied)
+    offers = JobOffer.objects.active().for_listing().in_bulk([pk for pk, _ in ranking])
+    recommended_offers = []
+    for pk, score in ranking:
+        if pk in offers:
+            offers[pk].match_score = round(score * 100)
+            recommended_offers.append(offers[pk])
+    
+    context = {
+        'applications': applications,
+        'recommended_offers': recommended_offers,
+    }
     return render(request, 'core/my_applications.html', context)
 
 @login_required
 def company_dashboard(request):
-    if not hasattr(request.user, 'company'):
+    if not request.profile.is_company:
         messages.error(request, 'Acceso restringido a empresas.')
         return redirect('home')
     
-    company = request.user.company
-    offers = JobOffer.objects.filter(company=company).annotate(
-        application_count=Count('application')
-    )
-    applications = Application.objects.filter(job_offer__company=company)
-    
-    # Calcular estadísticas en la vista
-    total_offers = offers.count()
-    total_applications = applications.count()
-    active_offers = offers.filter(is_active=True, deadline__gte=timezone.now().date()).count()
+    company = request.profile.company
+    # Totales mantenidos por core/company_stats.py: una sola fila por empresa
+    stats = company_stats.for_company(company)
+    offers = JobOffer.objects.filter(company=company).for_dashboard()
     
     context = {
-        'offers': offers,
-        'applications': applications,
-        'total_offers': total_offers,
-        'total_applications': total_applications,
-        'active_offers': active_offers,
+        'offers': paginate(request, offers, ['-publication_date', '-id'], per_page=20),
+        'total_offers': stats.total_offers,
+        'total_applications': stats.total_applications,
+        'active_offers': stats.active_offers,
+        'expired_offers': stats.inactive_offers,
+        'applications_by_status': stats.applications_by_status(),
     }
     return render(request, 'core/company_dashboard.html', context)
 
 @login_required
 def application_list(request, offer_pk):
-    if not hasattr(request.user, 'company'):
+    if not request.profile.is_company:
         messages.error(request, 'Acceso restringido a empresas.')
         return redirect('home')
     
-    offer = get_object_or_404(JobOffer, pk=offer_pk, company=request.user.company)
-    applications = Application.objects.filter(job_offer=offer).select_related(
-        'candidate', 'candidate__user', 'job_offer'
-    )
+    offer = get_object_or_404(JobOffer, pk=offer_pk, company_id=request.profile.company_id)
+    applications = list(Application.objects.filter(job_offer=offer).for_review())
+    
+    # Afinidad de cada candidato con los requisitos de la oferta
+    scores = matching.rank_candidates(offer, {application.candidate_id for application in applications})
+    for application in applications:
+        application.match_score = round(scores.get(application.candidate_id, 0) * 100)
+    top_candidates = sorted(
+        (application for application in applications if application.match_score),
+        key=lambda application: -application.match_score,
+    )[:5]
     
     context = {
         'offer': offer,
         'applications': applications,
+        'top_candidates': top_candidates,
+        'bulk_form': BulkApplicationStatusForm(initial={'offer': offer.pk}),
     }
     return render(request, 'core/application_list.html', context)
 
+@login_required
+def export_applications(request):
+    if not request.profile.is_company:
+        messages.error(request, 'Acceso restringido a empresas.')
+        return redirect('home')
+    
+    applications = Application.objects.filter(job_offer__company_id=request.profile.company_id)
+    
+    offer_pk = request.GET.get('offer')
+    status = request.GET.get('status')
+    date_from = request.GET.get('date_from')
+    date_to = request.GET.get('date_to')
+    
+    if offer_pk:
+        try:
+            offer_pk = int(offer_pk)
+        except ValueError:
+            return HttpResponseBadRequest('Oferta no válida.')
+        applications = applications.filter(job_offer__pk=offer_pk)
+    if status:
+        if status not in dict(Application.STATUS_CHOICES):
+            return HttpResponseBadRequest('Estado no válido.')
+        applications = applications.filter(status=status)
+    if date_from or date_to:
+        try:
+            if date_from:
+                applications = applications.filter(application_date__date__gte=parse_date(date_from))
+            if date_to:
+                applications = applications.filter(application_date__date__lte=parse_date(date_to))
+        except (TypeError, ValueError):
+            return HttpResponseBadRequest('Rango de fechas no válido (usa AAAA-MM-DD).')
+    
+    if request.GET.get('format') == 'jsonl':
+        response = StreamingHttpResponse(stream_jsonl(applications), content_type='application/x-ndjson; charset=utf-8')
+        filename = 'postulaciones.jsonl'
+    else:
+        response = StreamingHttpResponse(stream_csv(applications), content_type='text/csv; charset=utf-8')
+        filename = 'postulaciones.csv'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+@login_required
+def download_resume(request, pk):
+    application = get_object_or_404(
+        Application.objects.select_related('resume', 'candidate__user', 'job_offer__company'),
+        pk=pk, resume__isnull=False,
+    )
+    
+    if request.user.pk not in (application.candidate.user_id, application.job_offer.company.user_id):
+        messages.error(request, 'No tienes permisos para esta acción.')
+        return redirect('home')
+    
+    extension = mimetypes.guess_extension(application.resume.content_type) or ''
+    filename = f'cv-{application.candidate.user.username}{extension}'
+    return resumes.serve(request, application.resume, filename)
+
 @login_required
 def update_application_status(request, pk):
-    application = get_object_or_404(Application, pk=pk)
+    application = get_object_or_404(Application.objects.for_review(), pk=pk)
     
     if request.user != application.job_offer.company.user:
         messages.error(request, 'No tienes permisos para esta acción.')
@@ -356,33 +525,71 @@ def update_application_status(request, pk):
     return render(request, 'core/update_application_status.html', context)
 
 @login_required
-def offers_by_category(request):
-    offers_count = JobOffer.objects.filter(
-        is_active=True,
-        deadline__gte=timezone.now().date()
-    ).values('category').annotate(count=Count('id'))
-    
-    context = {'offers_count': offers_count}
-    return render(request, 'core/offers_by_category.html', context)
+def bulk_update_application_status(request):
+    if not request.profile.is_company:
+        messages.error(request, 'Acceso restringido a empresas.')
+        return redirect('home')
+    if request.method != 'POST':
+        return redirect('company_dashboard')
+    
+    # Desde el formulario de application_list o como JSON:
+    # {"applications": [1, 2, ...], "status": "revisada"}
+    as_json = request.content_type == 'application/json'
+    if as_json:
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            return JsonResponse({'errors': {'__all__': ['JSON no válido.']}}, status=400)
+    else:
+        data = request.POST
+    
+    form = BulkApplicationStatusForm(data)
+    if not form.is_valid():
+        if as_json:
+            return JsonResponse({'errors': form.errors}, status=400)
+        messages.error(request, 'Selecciona al menos una postulación y un estado válido.')
+        return _bulk_status_redirect(request.POST.get('offer'))
+    
+    status = form.cleaned_data['status']
+    results = triage.update_statuses(request.profile.company_id, form.cleaned_data['applications'], status)
+    totals = {result: 0 for result in (triage.UPDATED, triage.UNCHANGED, triage.NOT_FOUND)}
+    for result in results.values():
+        totals[result] += 1
+    
+    if as_json:
+        return JsonResponse({
+            'status': status,
+            'totals': totals,
+            'results': [{'id': pk, 'result': result} for pk, result in results.items()],
+        })
+    
+    messages.success(request, f'{totals[triage.UPDATED]} postulaciones actualizadas.')
+    if totals[triage.NOT_FOUND]:
+        messages.warning(request, f'{totals[triage.NOT_FOUND]} postulaciones no encontradas.')
+    return _bulk_status_redirect(form.cleaned_data['offer'])
+
+def _bulk_status_redirect(offer_pk):
+    if offer_pk and str(offer_pk).isdigit():
+        return redirect('application_list', offer_pk=offer_pk)
+    return redirect('company_dashboard')
+
+@login_required
+async def offers_by_category(request):
+    context = {'offers_count': await sync_to_async(category_counts)()}
+    return await arender(request, 'core/offers_by_category.html', context)
 
 @login_required
-def recent_offers(request):
-    recent_offers = JobOffer.objects.filter(
-        is_active=True,
-        deadline__gte=timezone.now().date()
-    ).order_by('-publication_date')[:10]
-    
-    context = {'recent_offers': recent_offers}
-    return render(request, 'core/recent_offers.html', context)
+async def recent_offers(request):
+    recent_offers = JobOffer.objects.active().for_listing()
+    
+    context = {'recent_offers': await apaginate(request, recent_offers, ['-publication_date', '-id'], per_page=10)}
+    return await arender(request, 'core/recent_offers.html', context)
 
 @login_required
-def offers_expiring_soon(request):
-    next_week = timezone.now().date() + timedelta(days=7)
-    expiring_offers = JobOffer.objects.filter(
-        is_active=True,
-        deadline__gte=timezone.now().date(),
-        deadline__lte=next_week
-    ).order_by('deadline')
-    
-    context = {'expiring_offers': expiring_offers}
-    return render(request, 'core/offers_expiring_soon.html', context)
\ No newline at end of file
+async def offers_expiring_soon(request):
+    expiring_offers = JobOffer.objects.active().for_listing().filter(deadline__lte=facets.expiring_until())
+    
+    context = {'expiring_offers': await apaginate(request, expiring_offers, ['deadline', 'id'], per_page=20)}
+    return await arender(request, 'core/offers_expiring_soon.html', context)
\ No newline at end of file
@@ -0,0 +1,167 @@
+import gzip
+import mimetypes
+import os
+import re
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# CSS y JS propios como ficheros estáticos con huella y comprimidos de antemano.
+# Las plantillas ya no llevan <style> ni <script> en línea: enlazan
+# static/css/jobfinder.css, static/js/jobfinder.js y un fichero por página, que
+# el navegador guarda en caché tras la primera visita.
+# collectstatic con CompressedManifestStorage copia cada fichero a STATIC_ROOT
+# con el hash de su contenido en el nombre (jobfinder.3f2a9c0b1d4e.css) y
+# escribe al lado las versiones .gz (y .br si está instalado brotli) cuando
+# ocupan menos que el original. {% static %} devuelve el nombre con huella.
+# StaticFilesMiddleware sirve STATIC_URL desde STATIC_ROOT eligiendo la versión
+# comprimida que acepte el cliente, sin comprimir en cada petición, y marca los
+# nombres con huella como inmutables durante un año: si el contenido cambia,
+# cambia el nombre. Lo que no está en STATIC_ROOT (en desarrollo, sin
+# collectstatic) sigue hacia runserver o la vista de static() como hasta ahora.
+
+COMPRESSIBLE = frozenset(('.css', '.js', '.map', '.svg', '.json', '.txt', '.xml', '.html'))
+# (Content-Encoding, extensión), en orden de preferencia
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+# Ficheros sin huella (p. ej. enlazados a mano): pueden cambiar con cada despliegue
+MAX_AGE = 60
+
+# Nombre con huella de ManifestStaticFilesStorage: <nombre>.<12 hex>.<ext>
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}(\.[^./]+)$')
+
+
+def compressors():
+    yield '.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0)
+    if brotli is not None:
+        yield '.br', lambda data: brotli.compress(data, quality=11)
+
+
+class CompressedManifestStorage(ManifestStaticFilesStorage):
+    def stored_name(self, name):
+        # Sin manifiesto (desarrollo y pruebas sin collectstatic) el nombre es el original
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for name in {*paths, *self.hashed_files.values()}:
+            self.compress(name)
+
+    def compress(self, name):
+        # Escribe las versiones comprimidas de `name`; devuelve sus nombres
+        if os.path.splitext(name)[1].lower() not in COMPRESSIBLE or not self.exists(name):
+            return []
+        path = self.path(name)
+        with open(path, 'rb') as source:
+            data = source.read()
+        written = []
+        for suffix, compress in compressors():
+            compressed = compress(data)
+            if len(compressed) < len(data):
+                with open(path + suffix, 'wb') as target:
+                    target.write(compressed)
+                written.append(name + suffix)
+            elif os.path.exists(path + suffix):
+                # Queda de un collectstatic anterior y ya no compensa
+                os.remove(path + suffix)
+        return written
+
+
+def accepted_encodings(header):
+    # Codificaciones de Accept-Encoding, sin las de q=0
+    accepted = set()
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        q = params.strip()
+        if q.startswith('q='):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def serve(request):
+    # Respuesta para un fichero de STATIC_ROOT, o None si la petición no es para uno
+    if request.method not in ('GET', 'HEAD') or not settings.STATIC_ROOT:
+        return None
+    prefix = settings.STATIC_URL
+    if not prefix.startswith('/') or not request.path.startswith(prefix):
+        return None
+    name = request.path[len(prefix):]
+    try:
+        path = safe_join(settings.STATIC_ROOT, name)
+    except SuspiciousFileOperation:
+        return None
+    if not os.path.isfile(path):
+        return None
+
+    content_type, _ = mimetypes.guess_type(path)
+    encoding = None
+    served = path
+    if os.path.splitext(path)[1].lower() in COMPRESSIBLE:
+        accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+        for coding, suffix in ENCODINGS:
+            if coding in accepted and os.path.isfile(path + suffix):
+                encoding, served = coding, path + suffix
+                break
+
+    stat = os.stat(path)
+    if not was_modified_since(request.headers.get('If-Modified-Since'), stat.st_mtime):
+        response = HttpResponseNotModified()
+    else:
+        response = FileResponse(open(served, 'rb'), content_type=content_type or 'application/octet-stream')
+        response.headers['Last-Modified'] = http_date(stat.st_mtime)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    if os.path.splitext(path)[1].lower() in COMPRESSIBLE:
+        response.headers['Vary'] = 'Accept-Encoding'
+    if HASHED_NAME_RE.search(name):
+        response.headers['Cache-Control'] = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    else:
+        response.headers['Cache-Control'] = f'public, max-age={MAX_AGE}'
+    return response
+
+
+class StaticFilesMiddleware:
+    # Va el primero: los ficheros estáticos no pasan por sesiones, métricas, etc.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = serve(request)
+        if response is None:
+            response = self.get_response(request)
+        return response
+
+    async def __acall__(self, request):
+        response = serve(request)
+        if response is None:
+            response = await self.get_response(request)
+        return response
@@ -0,0 +1,101 @@
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Lecturas en la réplica y escrituras en la base de datos principal.
+# ReplicaRoutingMiddleware marca las peticiones GET/HEAD a las vistas de
+# DATABASE_READ_VIEWS (listados y detalle de ofertas) y PrimaryReplicaRouter
+# envía sus lecturas a DATABASE_READ_ALIAS; todo lo demás, y cualquier lectura
+# dentro de una transacción, va a la principal.
+# Tras una escritura (POST, etc.) el cliente recibe una cookie que durante
+# DATABASE_STICKY_SECONDS manda también sus lecturas a la principal, para que
+# vea lo que acaba de escribir aunque la réplica vaya con retraso.
+# Solo se leen de la réplica los modelos de core: sesiones, usuarios y tipos
+# de contenido van siempre a la principal, porque si la réplica va más de
+# DATABASE_STICKY_SECONDS por detrás, un usuario que acaba de iniciar sesión
+# parecería anónimo y login_required lo mandaría otra vez al login.
+# Sin DATABASE_READ_ALIAS todo se lee de la principal.
+
+STICKY_COOKIE = 'db_primary'
+# Aplicaciones cuyos modelos pueden leerse de la réplica
+REPLICA_APPS = frozenset({'core'})
+
+_routing = ContextVar('jobfinder_db_routing', default=None)
+
+
+class RequestRouting:
+    __slots__ = ('read_alias',)
+
+    def __init__(self):
+        self.read_alias = None
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in REPLICA_APPS:
+            # auth, sessions, contenttypes...: la base de datos por defecto
+            return None
+        routing = _routing.get()
+        if routing is None or routing.read_alias is None:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return routing.read_alias
+
+    def db_for_write(self, model, **hints):
+        # Explícito: si no, Django escribiría en la base de datos de la que se leyó la instancia
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # La réplica tiene los mismos datos que la principal
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != getattr(settings, 'DATABASE_READ_ALIAS', None)
+
+
+class ReplicaRoutingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = _routing.set(RequestRouting())
+        try:
+            return self._finish(request, self.get_response(request))
+        finally:
+            _routing.reset(token)
+
+    async def __acall__(self, request):
+        token = _routing.set(RequestRouting())
+        try:
+            return self._finish(request, await self.get_response(request))
+        finally:
+            _routing.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        alias = getattr(settings, 'DATABASE_READ_ALIAS', None)
+        if (
+            alias
+            and request.method in ('GET', 'HEAD')
+            and STICKY_COOKIE not in request.COOKIES
+            and request.resolver_match.view_name in settings.DATABASE_READ_VIEWS
+        ):
+            _routing.get().read_alias = alias
+        return None
+
+    def _finish(self, request, response):
+        if getattr(settings, 'DATABASE_READ_ALIAS', None) and request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            response.set_cookie(
+                STICKY_COOKIE, '1', max_age=settings.DATABASE_STICKY_SECONDS, httponly=True, samesite='Lax',
+            )
+        return response
@@ -0,0 +1,320 @@
+import bisect
+import hmac
+import logging
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache.backends import locmem
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from django.template.backends import django as django_backend
+
+# Métricas por petición, agrupadas por vista (nombre de la URL resuelta).
+# MetricsMiddleware abre una traza por petición en una ContextVar y al final la
+# vuelca en histogramas en memoria; los demás puntos de medida solo suman a la
+# traza activa (si no hay ninguna no hacen nada):
+#   - SQL: un execute_wrapper instalado en cada conexión al crearse.
+#   - Plantillas: el backend DjangoTemplates de este módulo mide el render de
+#     la plantilla principal (los include quedan dentro).
+#   - Caché: el backend LocMemCache de este módulo cuenta aciertos y fallos.
+# Todo ello solo con METRICS_ENABLED; si no, el middleware no se instala y
+# /metrics/ no existe. Los histogramas se exponen en formato de texto de
+# Prometheus en /metrics/, que pide el token de METRICS_TOKEN en la cabecera
+# Authorization (o un usuario del personal); la IP de origen no sirve detrás
+# de un proxy. Con METRICS_SERVER_TIMING cada respuesta lleva además la
+# cabecera Server-Timing, visible para cualquier cliente: solo en desarrollo.
+# Cada proceso tiene sus propias métricas; Prometheus las suma al consultar
+# varios procesos.
+# Una muestra de las peticiones lentas se escribe en el log con sus consultas
+# más lentas.
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+TRACE_QUERIES = 5
+
+_current = ContextVar('jobfinder_metrics_trace', default=None)
+
+
+class Trace:
+    __slots__ = ('started', 'queries', 'query_time', 'template_time', 'cache_hits', 'cache_misses', 'statements')
+
+    def __init__(self, sampled):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.query_time = 0.0
+        self.template_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Solo las peticiones muestreadas guardan el texto de sus consultas
+        self.statements = [] if sampled else None
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def samples(self):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield _format_bound(bound), cumulative
+        yield '+Inf', cumulative + self.counts[-1]
+
+
+class ViewMetrics:
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.query_time = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.template_time = Histogram(LATENCY_BUCKETS)
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.responses = {}
+
+
+class Registry:
+    HISTOGRAMS = (
+        ('jobfinder_request_duration_seconds', 'latency', 'Duración de la petición hasta devolver la respuesta'),
+        ('jobfinder_db_query_duration_seconds', 'query_time', 'Tiempo en consultas SQL por petición'),
+        ('jobfinder_db_queries', 'queries', 'Consultas SQL por petición'),
+        ('jobfinder_template_render_seconds', 'template_time', 'Tiempo de render de plantillas por petición'),
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._views = {}
+
+    def record(self, view, status, trace, duration):
+        with self._lock:
+            metrics = self._views.get(view)
+            if metrics is None:
+                metrics = self._views[view] = ViewMetrics()
+            metrics.latency.observe(duration)
+            metrics.query_time.observe(trace.query_time)
+            metrics.queries.observe(trace.queries)
+            metrics.template_time.observe(trace.template_time)
+            metrics.cache_hits += trace.cache_hits
+            metrics.cache_misses += trace.cache_misses
+            status_class = f'{status // 100}xx'
+            metrics.responses[status_class] = metrics.responses.get(status_class, 0) + 1
+
+    def render(self):
+        with self._lock:
+            views = sorted(self._views.items())
+            lines = []
+            for name, attribute, help_text in self.HISTOGRAMS:
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for view, metrics in views:
+                    histogram = getattr(metrics, attribute)
+                    label = _label(view)
+                    for bound, count in histogram.samples():
+                        lines.append(f'{name}_bucket{{view="{label}",le="{bound}"}} {count}')
+                    lines.append(f'{name}_sum{{view="{label}"}} {histogram.sum:.6f}')
+                    lines.append(f'{name}_count{{view="{label}"}} {histogram.count}')
+
+            lines.append('# HELP jobfinder_cache_requests_total Lecturas de caché por resultado')
+            lines.append('# TYPE jobfinder_cache_requests_total counter')
+            for view, metrics in views:
+                label = _label(view)
+                lines.append(f'jobfinder_cache_requests_total{{view="{label}",result="hit"}} {metrics.cache_hits}')
+                lines.append(f'jobfinder_cache_requests_total{{view="{label}",result="miss"}} {metrics.cache_misses}')
+
+            lines.append('# HELP jobfinder_responses_total Respuestas por clase de estado HTTP')
+            lines.append('# TYPE jobfinder_responses_total counter')
+            for view, metrics in views:
+                label = _label(view)
+                for status_class, count in sorted(metrics.responses.items()):
+                    lines.append(f'jobfinder_responses_total{{view="{label}",status="{status_class}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+def _format_bound(bound):
+    return repr(float(bound)) if isinstance(bound, float) else f'{bound}.0'
+
+
+def _label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Puntos de medida
+
+def _record_query(execute, sql, params, many, context):
+    trace = _current.get()
+    if trace is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - start
+        trace.queries += 1
+        trace.query_time += elapsed
+        if trace.statements is not None:
+            trace.statements.append((elapsed, sql))
+
+
+def install_query_wrapper(connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+connection_created.connect(install_query_wrapper)
+
+
+class TimedTemplate:
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        trace = _current.get()
+        if trace is None:
+            return self.template.render(context, request)
+        start = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            trace.template_time += time.perf_counter() - start
+
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+    # Igual que el backend de Django, midiendo el render de cada plantilla
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
+
+
+_MISSING = object()
+
+
+class InstrumentedCacheMixin:
+    # get_many() y aget() de BaseCache pasan por get()
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        trace = _current.get()
+        if trace is not None:
+            if value is _MISSING:
+                trace.cache_misses += 1
+            else:
+                trace.cache_hits += 1
+        return default if value is _MISSING else value
+
+
+class LocMemCache(InstrumentedCacheMixin, locmem.LocMemCache):
+    pass
+
+
+# Middleware
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        # Conexiones abiertas antes de cargar el middleware
+        for connection in connections.all(initialized_only=True):
+            install_query_wrapper(connection)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = _current.set(Trace(self._sampled()))
+        try:
+            response = self.get_response(request)
+            return self._finish(request, response)
+        finally:
+            _current.reset(token)
+
+    async def __acall__(self, request):
+        token = _current.set(Trace(self._sampled()))
+        try:
+            response = await self.get_response(request)
+            return self._finish(request, response)
+        finally:
+            _current.reset(token)
+
+    def _sampled(self):
+        return random.random() < getattr(settings, 'METRICS_TRACE_SAMPLE_RATE', 0)
+
+    def _finish(self, request, response):
+        trace = _current.get()
+        duration = time.perf_counter() - trace.started
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match is not None else 'unresolved'
+        registry.record(view, response.status_code, trace, duration)
+
+        if getattr(settings, 'METRICS_SERVER_TIMING', False):
+            response.headers['Server-Timing'] = server_timing(trace, duration)
+        slow = getattr(settings, 'METRICS_SLOW_REQUEST', None)
+        if trace.statements is not None and slow is not None and duration >= slow:
+            log_slow_request(request, view, response.status_code, trace, duration)
+        return response
+
+
+def server_timing(trace, duration):
+    return ', '.join((
+        f'db;dur={trace.query_time * 1000:.1f};desc="{trace.queries} consultas"',
+        f'tpl;dur={trace.template_time * 1000:.1f}',
+        f'cache;desc="{trace.cache_hits} aciertos, {trace.cache_misses} fallos"',
+        f'total;dur={duration * 1000:.1f}',
+    ))
+
+
+def log_slow_request(request, view, status, trace, duration):
+    slowest = sorted(trace.statements, key=lambda statement: statement[0], reverse=True)[:TRACE_QUERIES]
+    logger.warning(
+        'Petición lenta %s %s (%s, %s): %.0f ms, %d consultas (%.0f ms), plantillas %.0f ms, '
+        'caché %d/%d aciertos%s',
+        request.method, request.get_full_path(), view, status, duration * 1000,
+        trace.queries, trace.query_time * 1000, trace.template_time * 1000,
+        trace.cache_hits, trace.cache_hits + trace.cache_misses,
+        ''.join(f'\n  {elapsed * 1000:.1f} ms  {sql}' for elapsed, sql in slowest),
+    )
+
+
+def metrics_view(request):
+    if not getattr(settings, 'METRICS_ENABLED', False):
+        raise Http404
+    # Con el token de METRICS_TOKEN (el servidor de Prometheus) o para el personal
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    authorization = request.headers.get('Authorization', '')
+    scraper = bool(token) and hmac.compare_digest(authorization.encode(), f'Bearer {token}'.encode())
+    if not scraper and not request.user.is_staff:
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -20,11 +20,19 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Ficheros de STATIC_ROOT ya comprimidos y con caché inmutable (ver jobfinder/assets.py)
+    'jobfinder.assets.StaticFilesMiddleware',
+    # Métricas por vista, solo con METRICS_ENABLED (ver jobfinder/metrics.py)
+    'jobfinder.metrics.MetricsMiddleware',
+    # Lecturas de las vistas de DATABASE_READ_VIEWS en la réplica
+    'jobfinder.db.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # request.profile: rol del usuario, cargado con él (ver core/profiles.py)
+    'core.profiles.ProfileMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -33,7 +41,8 @@ ROOT_URLCONF = 'jobfinder.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates que además mide el render para jobfinder/metrics.py
+        'BACKEND': 'jobfinder.metrics.DjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -41,6 +50,7 @@ TEMPLATES = [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
+                'core.context_processors.profile',
                 'django.contrib.messages.context_processors.messages',
             ],
         },
@@ -49,13 +59,63 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'jobfinder.wsgi.application'
 
+# PRAGMA que se aplican al abrir cada conexión SQLite
+SQLITE_PRAGMAS = {
+    # WAL: las lecturas no bloquean las escrituras ni al revés
+    'journal_mode': 'WAL',
+    # Con WAL, NORMAL solo sincroniza el disco en los checkpoints
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -20000,
+    'temp_store': 'MEMORY',
+}
+
+
+def sqlite_options(**pragmas):
+    # Espera a que se libere el bloqueo en vez de fallar con "database is
+    # locked", y toma el bloqueo de escritura al empezar cada transacción para
+    # que esa espera sirva también cuando una transacción pasa de leer a escribir
+    pragmas = {**SQLITE_PRAGMAS, **pragmas}
+    return {
+        'timeout': pragmas['busy_timeout'] / 1000,
+        'transaction_mode': 'IMMEDIATE',
+        'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in pragmas.items()),
+    }
+
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': sqlite_options(),
+        # Conexiones persistentes, comprobadas antes de reutilizarlas
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Réplica de solo lectura (jobfinder/db.py). En local puede ser una copia de
+# db.sqlite3 que se mantiene al día con `manage.py sync_replica`.
+DATABASE_REPLICA_NAME = os.environ.get('JOBFINDER_REPLICA_DB')
+DATABASE_READ_ALIAS = None
+if DATABASE_REPLICA_NAME:
+    DATABASE_READ_ALIAS = 'replica'
+    DATABASES[DATABASE_READ_ALIAS] = {
+        **DATABASES['default'],
+        'NAME': DATABASE_REPLICA_NAME,
+        'OPTIONS': sqlite_options(query_only='ON'),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['jobfinder.db.PrimaryReplicaRouter']
+# Vistas cuyas lecturas van a la réplica
+DATABASE_READ_VIEWS = [
+    'home', 'job_offers', 'suggest_offers', 'job_offer_detail',
+    'offers_by_category', 'recent_offers', 'offers_expiring_soon',
+]
+# Tras una escritura, el cliente lee de la principal durante este tiempo
+DATABASE_STICKY_SECONDS = 10
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -83,8 +143,77 @@ STATICFILES_DIRS = [
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Carga el usuario de la sesión con los ids de sus perfiles (core/profiles.py)
+AUTHENTICATION_BACKENDS = ['core.profiles.ProfileBackend']
+
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'home'
 LOGOUT_REDIRECT_URL = 'home'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+# collectstatic añade la huella del contenido al nombre y escribe las versiones
+# .gz/.br (jobfinder/assets.py)
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'jobfinder.assets.CompressedManifestStorage',
+    },
+}
+
+# Almacén de CVs por contenido (core/resumes.py)
+RESUME_STORE_ROOT = os.path.join(BASE_DIR, 'media', 'resumes')
+RESUME_MAX_SIZE = 10 * 1024 * 1024
+# None: Django sirve el fichero. 'x-sendfile' (Apache/lighttpd) o
+# 'x-accel-redirect' (nginx, con RESUME_ACCEL_PREFIX como location internal)
+RESUME_SENDFILE = None
+RESUME_ACCEL_PREFIX = '/protected/resumes/'
+
+# Avisos por correo (core/notifications.py), enviados por send_notifications.
+# En local se muestran por consola; en producción, el backend SMTP.
+EMAIL_BACKEND = os.environ.get('JOBFINDER_EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+DEFAULT_FROM_EMAIL = 'JobFinder <no-responder@jobfinder.local>'
+
+# Límites de peticiones de login, registro y postulación (core/ratelimit.py).
+# Caché con los contadores compartidos entre procesos (None: en memoria de cada
+# proceso). RATELIMITS = {'login': {'ip': '20/m', 'username': '5/m'}, ...}
+# sustituye los límites de los decoradores.
+RATELIMIT_CACHE = 'default'
+
+# Índices en memoria (core/indexes.py): cada cuántos segundos se comprueba, en
+# un hilo aparte, si otro proceso ha cambiado los datos
+INDEX_REFRESH_SECONDS = 30
+INDEX_REFRESH_BACKGROUND = True
+
+# En producción, con varios procesos, la caché tiene que ser compartida
+# (Memcached o Redis): guarda las marcas que invalidan los fragmentos y los
+# contadores de ratelimit. `check --deploy` avisa si es local (core/checks.py).
+CACHES = {
+    'default': {
+        # LocMemCache que cuenta aciertos y fallos por petición
+        'BACKEND': 'jobfinder.metrics.LocMemCache',
+    },
+}
+# Métricas (jobfinder/metrics.py): apagadas salvo en desarrollo o con
+# JOBFINDER_METRICS=1. /metrics/ pide "Authorization: Bearer <METRICS_TOKEN>"
+# (o un usuario del personal). Server-Timing muestra a cualquier cliente el
+# desglose de cada respuesta: solo en desarrollo.
+METRICS_ENABLED = DEBUG or os.environ.get('JOBFINDER_METRICS') == '1'
+METRICS_TOKEN = os.environ.get('JOBFINDER_METRICS_TOKEN')
+METRICS_SERVER_TIMING = DEBUG
+# Peticiones más lentas que esto (en segundos) se registran en el log, con una
+# muestra de METRICS_TRACE_SAMPLE_RATE para no guardar el SQL de todas
+METRICS_SLOW_REQUEST = 0.5
+METRICS_TRACE_SAMPLE_RATE = 0.1
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'jobfinder.metrics': {'handlers': ['console'], 'level': 'WARNING', 'propagate': False},
+    },
+}
 from django.template.context_processors import request
\ No newline at end of file
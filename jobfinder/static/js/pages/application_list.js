@@ -0,0 +1,32 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const form = document.getElementById('bulk-status-form');
+    if (!form) {
+        return;
+    }
+    const items = Array.from(form.querySelectorAll('.bulk-item'));
+    const selectAll = document.getElementById('bulk-select-all');
+    const submit = document.getElementById('bulk-submit');
+    const selected = document.getElementById('bulk-selected');
+
+    function refresh() {
+        const count = items.filter(item => item.checked).length;
+        selected.textContent = count;
+        submit.disabled = count === 0;
+    }
+    selectAll.addEventListener('change', function() {
+        items.forEach(item => { item.checked = selectAll.checked; });
+        refresh();
+    });
+    items.forEach(item => item.addEventListener('change', refresh));
+
+    // Los ids viajan en un solo campo para no superar el límite de campos por petición
+    form.addEventListener('submit', function() {
+        const ids = items.filter(item => item.checked).map(item => item.value);
+        items.forEach(item => { item.disabled = true; });
+        const field = document.createElement('input');
+        field.type = 'hidden';
+        field.name = 'applications';
+        field.value = ids.join(',');
+        form.appendChild(field);
+    });
+});
@@ -0,0 +1,83 @@
+// Valores de la plantilla: atributos data-* de la etiqueta <script>
+const applyOptions = document.currentScript.dataset;
+
+document.addEventListener('DOMContentLoaded', function() {
+    // Contador de caracteres para la carta de presentación
+    const textarea = document.getElementById(applyOptions.coverLetterId);
+    const charCount = document.createElement('div');
+    charCount.className = 'form-text text-end';
+    charCount.innerHTML = '<span id="charCount">0</span> caracteres escritos';
+
+    textarea.parentNode.appendChild(charCount);
+
+    textarea.addEventListener('input', function() {
+        const count = this.value.length;
+        document.getElementById('charCount').textContent = count;
+
+        // Cambiar color según la longitud
+        if (count < 100) {
+            charCount.style.color = '#dc3545';
+        } else if (count < 200) {
+            charCount.style.color = '#ffc107';
+        } else {
+            charCount.style.color = '#28a745';
+        }
+    });
+
+    // Trigger initial count
+    textarea.dispatchEvent(new Event('input'));
+
+    // Validación de longitud mínima
+    const form = document.querySelector('form');
+    form.addEventListener('submit', function(e) {
+        const coverLetter = textarea.value.trim();
+
+        if (coverLetter.length < 50) {
+            e.preventDefault();
+            showNotification('La carta de presentación debe tener al menos 50 caracteres.', 'warning');
+            textarea.focus();
+        }
+    });
+
+    function showNotification(message, type) {
+        const notification = document.createElement('div');
+        notification.className = `alert alert-${type} alert-dismissible fade show position-fixed`;
+        notification.style.cssText = 'top: 100px; right: 20px; z-index: 1060; min-width: 300px;';
+        notification.innerHTML = `
+            <i class="fas fa-exclamation-circle me-2"></i>${message}
+            <button type="button" class="btn-close" data-bs-dismiss="alert"></button>
+        `;
+
+        document.body.appendChild(notification);
+
+        setTimeout(() => {
+            if (notification.parentNode) {
+                notification.parentNode.removeChild(notification);
+            }
+        }, 5000);
+    }
+
+    // Auto-guardado local (simulado)
+    // CORRECCIÓN: Removí la sintaxis incorrecta de Django dentro de JavaScript
+    const saveKey = 'draft_' + applyOptions.offerId; // Simple y funciona
+    const savedDraft = localStorage.getItem(saveKey);
+
+    if (savedDraft && !textarea.value) {
+        if (confirm('Tienes un borrador guardado para esta postulación. ¿Deseas recuperarlo?')) {
+            textarea.value = savedDraft;
+            textarea.dispatchEvent(new Event('input'));
+        }
+    }
+
+    // Guardar borrado automáticamente cada 10 segundos
+    setInterval(() => {
+        if (textarea.value.trim()) {
+            localStorage.setItem(saveKey, textarea.value);
+        }
+    }, 10000);
+
+    // Limpiar borrado al enviar el formulario
+    form.addEventListener('submit', function() {
+        localStorage.removeItem(saveKey);
+    });
+});
@@ -0,0 +1,56 @@
+function copyToClipboard() {
+    const url = window.location.href;
+    navigator.clipboard.writeText(url).then(() => {
+        // Mostrar notificación de éxito
+        const notification = document.createElement('div');
+        notification.className = 'alert alert-success alert-dismissible fade show position-fixed';
+        notification.style.cssText = 'top: 100px; right: 20px; z-index: 1060; min-width: 250px;';
+        notification.innerHTML = `
+            <i class="fas fa-check-circle me-2"></i>Enlace copiado al portapapeles
+            <button type="button" class="btn-close" data-bs-dismiss="alert"></button>
+        `;
+
+        document.body.appendChild(notification);
+
+        setTimeout(() => {
+            if (notification.parentNode) {
+                notification.parentNode.removeChild(notification);
+            }
+        }, 3000);
+    });
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    // Efectos de animación para las tarjetas
+    const cards = document.querySelectorAll('.card');
+    cards.forEach((card, index) => {
+        card.style.animationDelay = `${index * 0.1}s`;
+    });
+
+    // Contador de tiempo restante
+    const deadlineElement = document.querySelector('.text-success .text-muted');
+    if (deadlineElement) {
+        const deadlineText = deadlineElement.textContent;
+        if (deadlineText.includes('restantes')) {
+            // Actualizar cada minuto
+            setInterval(() => {
+                // Recargar la página para actualizar el tiempo restante
+                // En una implementación real, esto se haría con JavaScript
+            }, 60000);
+        }
+    }
+
+    // Smooth scroll para anclas internas
+    document.querySelectorAll('a[href^="#"]').forEach(anchor => {
+        anchor.addEventListener('click', function (e) {
+            e.preventDefault();
+            const target = document.querySelector(this.getAttribute('href'));
+            if (target) {
+                target.scrollIntoView({
+                    behavior: 'smooth',
+                    block: 'start'
+                });
+            }
+        });
+    });
+});
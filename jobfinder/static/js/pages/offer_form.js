@@ -0,0 +1,53 @@
+// Valores de la plantilla: atributos data-* de la etiqueta <script>
+const offerFormOptions = document.currentScript.dataset;
+
+document.addEventListener('DOMContentLoaded', function() {
+    // Configurar fecha mínima
+    const deadlineField = document.getElementById(offerFormOptions.deadlineId);
+    const today = new Date().toISOString().split('T')[0];
+
+    if (deadlineField) {
+        deadlineField.min = today;
+
+        // Establecer fecha por defecto (15 días desde hoy)
+        if (!deadlineField.value) {
+            const defaultDate = new Date();
+            defaultDate.setDate(defaultDate.getDate() + 15);
+            deadlineField.value = defaultDate.toISOString().split('T')[0];
+        }
+    }
+
+    // Validación en tiempo real
+    const form = document.querySelector('form');
+    const inputs = form.querySelectorAll('input[required], textarea[required], select[required]');
+
+    inputs.forEach(input => {
+        input.addEventListener('blur', function() {
+            if (!this.value.trim()) {
+                this.classList.add('is-invalid');
+            } else {
+                this.classList.remove('is-invalid');
+                this.classList.add('is-valid');
+            }
+        });
+
+        input.addEventListener('input', function() {
+            if (this.value.trim()) {
+                this.classList.remove('is-invalid');
+                this.classList.add('is-valid');
+            }
+        });
+    });
+
+    // Efectos visuales mejorados
+    const cards = document.querySelectorAll('.card');
+    cards.forEach(card => {
+        card.addEventListener('mouseenter', function() {
+            this.style.transform = 'translateY(-5px) scale(1.02)';
+        });
+
+        card.addEventListener('mouseleave', function() {
+            this.style.transform = 'translateY(0) scale(1)';
+        });
+    });
+});
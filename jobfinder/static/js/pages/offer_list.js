@@ -0,0 +1,97 @@
+// Valores de la plantilla: atributos data-* de la etiqueta <script>
+const offerListOptions = document.currentScript.dataset;
+
+document.addEventListener('DOMContentLoaded', function() {
+    // Efectos de hover en las tarjetas de ofertas
+    const offerCards = document.querySelectorAll('.offer-card');
+    offerCards.forEach(card => {
+        card.addEventListener('mouseenter', function() {
+            this.style.transform = 'translateY(-8px) scale(1.02)';
+        });
+
+        card.addEventListener('mouseleave', function() {
+            this.style.transform = 'translateY(0) scale(1)';
+        });
+    });
+
+    // Auto-completar búsqueda
+    const searchInput = document.getElementById('search');
+    const searchSuggestions = document.createElement('div');
+    searchSuggestions.className = 'dropdown-menu w-100';
+    searchSuggestions.style.display = 'none';
+
+    if (searchInput) {
+        searchInput.parentNode.appendChild(searchSuggestions);
+
+        let debounceTimer = null;
+        let pendingRequest = null;
+
+        searchInput.addEventListener('input', function() {
+            const query = this.value.trim();
+            clearTimeout(debounceTimer);
+
+            if (query.length < 2) {
+                searchSuggestions.style.display = 'none';
+                return;
+            }
+
+            // Esperar a que el usuario deje de escribir antes de consultar la API
+            debounceTimer = setTimeout(() => {
+                if (pendingRequest) {
+                    pendingRequest.abort();
+                }
+                pendingRequest = new AbortController();
+
+                fetch(`${offerListOptions.suggestUrl}?q=${encodeURIComponent(query)}`, {signal: pendingRequest.signal})
+                    .then(response => response.json())
+                    .then(data => {
+                        const suggestions = data.suggestions;
+                        if (suggestions.length > 0) {
+                            searchSuggestions.innerHTML = '';
+                            suggestions.forEach(suggestion => {
+                                const item = document.createElement('a');
+                                item.className = 'dropdown-item d-flex justify-content-between';
+                                item.href = `?search=${encodeURIComponent(suggestion.text)}`;
+                                item.textContent = suggestion.text;
+                                const count = document.createElement('span');
+                                count.className = 'badge bg-light text-muted ms-2';
+                                count.textContent = suggestion.count;
+                                item.appendChild(count);
+                                searchSuggestions.appendChild(item);
+                            });
+                            searchSuggestions.style.display = 'block';
+                        } else {
+                            searchSuggestions.style.display = 'none';
+                        }
+                    })
+                    .catch(() => {});
+            }, 200);
+        });
+
+        // Ocultar sugerencias al hacer clic fuera
+        document.addEventListener('click', function(e) {
+            if (!searchInput.contains(e.target) && !searchSuggestions.contains(e.target)) {
+                searchSuggestions.style.display = 'none';
+            }
+        });
+    }
+
+    // Contador de resultados
+    const resultCount = document.querySelector('.badge.bg-primary.fs-6');
+    if (resultCount && offers.length > 0) {
+        // Animación del contador
+        let count = 0;
+        const target = Number(offerListOptions.count);
+        const duration = 2000;
+        const increment = target / (duration / 16);
+
+        const timer = setInterval(() => {
+            count += increment;
+            if (count >= target) {
+                count = target;
+                clearInterval(timer);
+            }
+            resultCount.textContent = Math.floor(count) + ' ofertas disponibles';
+        }, 16);
+    }
+});
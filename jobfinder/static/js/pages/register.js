@@ -0,0 +1,74 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Mostrar/ocultar información adicional según el tipo de usuario
+    const candidateRadio = document.getElementById('candidate_type');
+    const companyRadio = document.getElementById('company_type');
+    const candidateInfo = document.getElementById('candidate-info');
+    const companyInfo = document.getElementById('company-info');
+
+    function toggleUserInfo() {
+        if (candidateRadio.checked) {
+            candidateInfo.style.display = 'block';
+            companyInfo.style.display = 'none';
+        } else {
+            candidateInfo.style.display = 'none';
+            companyInfo.style.display = 'block';
+        }
+    }
+
+    candidateRadio.addEventListener('change', toggleUserInfo);
+    companyRadio.addEventListener('change', toggleUserInfo);
+
+    // Toggle para mostrar/ocultar contraseña
+    document.querySelectorAll('.toggle-password').forEach(button => {
+        button.addEventListener('click', function() {
+            const input = this.closest('.input-group').querySelector('input');
+            const icon = this.querySelector('i');
+
+            if (input.type === 'password') {
+                input.type = 'text';
+                icon.classList.remove('fa-eye');
+                icon.classList.add('fa-eye-slash');
+            } else {
+                input.type = 'password';
+                icon.classList.remove('fa-eye-slash');
+                icon.classList.add('fa-eye');
+            }
+        });
+    });
+
+    // Validación en tiempo real
+    const password1 = document.getElementById('id_password1');
+    const password2 = document.getElementById('id_password2');
+
+    function validatePasswords() {
+        if (password1.value && password2.value) {
+            if (password1.value !== password2.value) {
+                password2.classList.add('is-invalid');
+                password2.classList.remove('is-valid');
+            } else {
+                password2.classList.remove('is-invalid');
+                password2.classList.add('is-valid');
+            }
+        }
+    }
+
+    password1.addEventListener('input', validatePasswords);
+    password2.addEventListener('input', validatePasswords);
+
+    // Efectos visuales en las opciones de tipo de usuario
+    document.querySelectorAll('.card-option .card').forEach(card => {
+        card.addEventListener('mouseenter', function() {
+            if (!this.closest('.form-check-input').checked) {
+                this.style.transform = 'translateY(-2px)';
+                this.style.boxShadow = '0 4px 15px rgba(0, 0, 0, 0.1)';
+            }
+        });
+
+        card.addEventListener('mouseleave', function() {
+            if (!this.closest('.form-check-input').checked) {
+                this.style.transform = 'translateY(0)';
+                this.style.boxShadow = 'var(--shadow-soft)';
+            }
+        });
+    });
+});